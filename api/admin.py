@@ -12,3 +12,5 @@ admin.site.register(models.AssignmentTemplate)
 admin.site.register(models.TaskTemplate)
 admin.site.register(models.AssignmentEntry)
 admin.site.register(models.TaskEntry)
+admin.site.register(models.ExportJob)
+admin.site.register(models.GradeResult)
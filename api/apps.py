@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # connect the signals that keep cached roles up to date
+        from api import roles  # noqa: F401
+        # connect the signals that check and count database connections
+        from api import db  # noqa: F401
+        # create the permission groups once the tables and permissions they need exist
+        from api.permissions import bootstrap_groups
+        post_migrate.connect(bootstrap_groups, sender=self)
@@ -0,0 +1,113 @@
+"""
+Measures the queries behind the hottest API access paths against a seeded
+term of data.
+
+Run with:
+
+    python manage.py benchmark_indexes [--iterations N] [--plans]
+
+The command seeds a throwaway test database, migrates it back to before the
+access path indexes, times every access path and records its query plan,
+then migrates forward and does the same again so the two can be compared.
+"""
+from django.conf import settings
+from django.db import connection
+
+from datetime import datetime, timedelta
+from pytz import timezone
+import random
+import time
+
+from api import models
+
+
+def labgroups_of_instructor(term, rng, now):
+    return models.LabGroup.objects.filter(term=term.term, instructor=rng.choice(term.instructors))
+
+
+def open_assignments_of_labgroup(term, rng, now):
+    return models.Assignment.objects.filter(labgroup=rng.choice(term.labgroups), open_date__lt=now, close_date__gt=now)
+
+
+def entry_of_student(term, rng, now):
+    entry_id, student_id, assignment_id, template_id = rng.choice(term.entries)
+    return models.AssignmentEntry.objects.filter(student=student_id, assignment=assignment_id)
+
+
+def task_entry_of_entry(term, rng, now):
+    entry_id, student_id, assignment_id, template_id = rng.choice(term.entries)
+    return models.TaskEntry.objects.filter(assignment_entry=entry_id,
+                                           task_template=rng.choice(term.task_templates[template_id]))
+
+
+def student_by_wwuid(term, rng, now):
+    return models.Student.objects.filter(wwuid=rng.choice(term.students)[2])
+
+
+def student_by_user(term, rng, now):
+    return models.Student.objects.filter(user=rng.choice(term.students)[1])
+
+
+def assignments_to_close(term, rng, now):
+    return models.Assignment.objects.filter(close_date__lte=now, close_date__gt=now - timedelta(minutes=1))
+
+
+# the name of every access path and the function building a query for it
+ACCESS_PATHS = (
+    ('labgroups of an instructor', labgroups_of_instructor),
+    ('open assignments of a labgroup', open_assignments_of_labgroup),
+    ('entry of a student', entry_of_student),
+    ('task entry of an entry', task_entry_of_entry),
+    ('student by wwuid', student_by_wwuid),
+    ('student by user', student_by_user),
+    ('assignments to close', assignments_to_close),
+)
+
+
+def percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def measure(term, iterations=200, seed=0):
+    """
+    Times every access path against a seeded term.
+
+    :param term: Term - the rows seeded by api.seed.seed_term
+    :param iterations: integer - the number of queries timed for every access path
+    :param seed: integer - the seed of the random parameters
+    :return: list - a (name, median ms, 95th percentile ms, query plan) tuple for every access path
+    """
+    now = datetime.now(timezone(settings.TIME_ZONE))
+    results = []
+    for name, query in ACCESS_PATHS:
+        rng = random.Random(seed)
+        plan = query(term, rng, now).explain()
+        # warm the caches of the database before timing
+        for _ in range(0, 5):
+            list(query(term, rng, now))
+        timings = []
+        for _ in range(0, iterations):
+            queryset = query(term, rng, now)
+            start = time.perf_counter()
+            list(queryset)
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((name, percentile(timings, 0.5), percentile(timings, 0.95), plan))
+    return results
+
+
+def report(before, after, plans=False):
+    """
+    Returns the timings before and after the indexes side by side, followed by the query plans.
+    """
+    lines = ['{:<32}{:>12}{:>12}{:>12}{:>12}{:>10}'.format('access path ({})'.format(connection.vendor),
+                                                           'before p50', 'before p95', 'after p50', 'after p95',
+                                                           'speedup')]
+    for (name, before_p50, before_p95, before_plan), (_, after_p50, after_p95, after_plan) in zip(before, after):
+        lines.append('{:<32}{:>10.3f}ms{:>10.3f}ms{:>10.3f}ms{:>10.3f}ms{:>9.1f}x'.format(
+            name, before_p50, before_p95, after_p50, after_p95, before_p50 / after_p50))
+    if plans:
+        for (name, _, _, before_plan), (_, _, _, after_plan) in zip(before, after):
+            lines.extend(['', name, '  before:', '    ' + before_plan.replace('\n', '\n    '),
+                          '  after:', '    ' + after_plan.replace('\n', '\n    ')])
+    return '\n'.join(lines)
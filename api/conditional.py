@@ -0,0 +1,52 @@
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+import hashlib
+
+
+def make_etag(request, version):
+    """
+    Returns a quoted ETag for a data version as rendered for a request. The
+    accepted renderer is part of the tag since JSON, CSV, and the browsable
+    API are different representations of the same data.
+
+    :param request: Request - the request being answered
+    :param version: string - the data version of the response
+    """
+    accepted = getattr(request, 'accepted_renderer', None)
+    stamp = '{}:{}'.format(version, accepted.format if accepted else '')
+    return quote_etag(hashlib.sha1(stamp.encode('utf-8')).hexdigest())
+
+
+def queryset_version(queryset, version_fields=('modified',)):
+    """
+    Returns a stamp that changes whenever a row is added to, removed from, or
+    modified in a queryset, computed with a single aggregate query.
+
+    :param queryset: QuerySet - the rows to stamp
+    :param version_fields: tuple - the modified timestamps the rows depend on
+    """
+    aggregates = {'count': Count('id', distinct=True)}
+    for i, field in enumerate(version_fields):
+        aggregates['modified_{}'.format(i)] = Max(field)
+    stats = queryset.order_by().aggregate(**aggregates)
+    return ':'.join(str(stats[key]) for key in sorted(stats))
+
+
+class ConditionalListMixin:
+    """
+    Answers list requests with 304 Not Modified when the listed rows have not
+    changed since the version the client already has.
+    """
+    version_fields = ('modified',)
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = make_etag(request, '{}:{}'.format(self.get_serializer_class().__name__,
+                                                 queryset_version(queryset, self.version_fields)))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super(ConditionalListMixin, self).get(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
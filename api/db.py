@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+import os
+import threading
+
+
+# how this worker process has used its database connections
+_stats = {
+    'requests': 0,
+    'connections_opened': 0,
+    'health_checks_failed': 0,
+}
+_stats_lock = threading.Lock()
+
+
+def count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def connection_stats():
+    """
+    Returns how often this worker process reused a database connection
+    instead of opening a new one.
+
+    With persistent connections every thread keeps its connection between
+    requests, so the reuse rate should approach 1. A rate near 0 means
+    connections are closed after every request, which is the case when
+    DJANGO_DB_CONN_MAX_AGE is 0.
+
+    :return: dictionary - the process id, requests handled, connections opened, failed health checks, and reuse rate
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['pid'] = os.getpid()
+    stats['conn_max_age'] = settings.DATABASES['default'].get('CONN_MAX_AGE', 0)
+    if stats['requests']:
+        stats['reuse_rate'] = round(max(0, 1 - stats['connections_opened'] / stats['requests']), 3)
+    else:
+        stats['reuse_rate'] = None
+    return stats
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    count('connections_opened')
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    """
+    Checks that every persistent connection still works before a request
+    reuses it, so a connection the database dropped while the worker sat idle
+    is reopened instead of failing the request.
+    """
+    count('requests')
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        # connections in a transaction belong to whoever opened it
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if not connection.is_usable():
+            count('health_checks_failed')
+            connection.close()
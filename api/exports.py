@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import gradebook, models
+
+from datetime import timedelta
+import glob
+import logging
+import os
+import tempfile
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the process wide thread pool that builds export artifacts.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS, thread_name_prefix='export')
+        return _executor
+
+
+def artifact_path(assignment_id, data_version):
+    """
+    Returns where the artifact of an assignment is cached on disk for a data version.
+    """
+    return os.path.join(settings.EXPORT_ROOT, 'assignment-{}-{}.csv'.format(assignment_id, data_version))
+
+
+def create_job(instructor, assignment):
+    """
+    Creates an export job for an assignment and queues it. Jobs whose artifact
+    is already cached finish immediately, and a job already queued for the
+    same data is reused.
+
+    :param instructor: Instructor - the instructor requesting the export
+    :param assignment: Assignment - the assignment to export
+    :return: ExportJob - the job building the export
+    """
+    data_version = gradebook.assignment_version(assignment)
+    fail_stale_jobs(models.ExportJob.objects.filter(instructor=instructor, assignment=assignment))
+    # reuse a job that is still building the same data
+    job = models.ExportJob.objects.filter(instructor=instructor,
+                                          assignment=assignment,
+                                          data_version=data_version,
+                                          status__in=(models.ExportJob.PENDING, models.ExportJob.RUNNING)).first()
+    if job is not None:
+        return job
+    # the artifact of unchanged data does not need to be built again
+    if os.path.exists(artifact_path(assignment.id, data_version)):
+        return models.ExportJob.objects.create(instructor=instructor,
+                                               assignment=assignment,
+                                               data_version=data_version,
+                                               status=models.ExportJob.DONE,
+                                               finished=timezone.now())
+    job = models.ExportJob.objects.create(instructor=instructor, assignment=assignment, data_version=data_version)
+    # only hand the job to the worker once it is visible to other connections
+    if settings.EXPORT_WORKERS > 0:
+        transaction.on_commit(lambda: get_executor().submit(run_job, job.id, True))
+    else:
+        run_job(job.id)
+        job.refresh_from_db()
+    return job
+
+
+def fail_stale_jobs(jobs):
+    """
+    Marks the pending and running jobs of a queryset failed once they are
+    older than EXPORT_JOB_TIMEOUT. A job is left pending or running for good
+    when the worker building it crashes or is restarted.
+
+    :param jobs: QuerySet - the export jobs to check
+    :return: integer - the number of jobs marked failed
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    return jobs.filter(status__in=(models.ExportJob.PENDING, models.ExportJob.RUNNING), created__lt=cutoff) \
+        .update(status=models.ExportJob.FAILED, finished=timezone.now())
+
+
+def run_job(job_id, threaded=False):
+    """
+    Builds the artifact of an export job and records the outcome.
+
+    :param job_id: integer - the id of the job to run
+    :param threaded: boolean - whether the job runs on a worker thread that owns its database connection
+    """
+    try:
+        models.ExportJob.objects.filter(id=job_id).update(status=models.ExportJob.RUNNING)
+        job = models.ExportJob.objects.select_related('assignment').get(id=job_id)
+        path = artifact_path(job.assignment_id, job.data_version)
+        if not os.path.exists(path):
+            build_artifact(job.assignment, path)
+        models.ExportJob.objects.filter(id=job_id).update(status=models.ExportJob.DONE, finished=timezone.now())
+    except Exception:
+        logger.exception('export job %s failed', job_id)
+        models.ExportJob.objects.filter(id=job_id).update(status=models.ExportJob.FAILED, finished=timezone.now())
+    finally:
+        if threaded:
+            connection.close()
+
+
+def build_artifact(assignment, path):
+    """
+    Writes the CSV of an assignment to path. The file is written under a
+    temporary name and moved into place so readers never see a partial file,
+    then the artifacts of the assignment's older data versions are deleted.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as artifact:
+            for line in gradebook.csv_lines(gradebook.assignment_columns(assignment),
+                                            gradebook.assignment_rows(assignment, stream=True)):
+                artifact.write(line)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    # downloads of jobs for an older version are answered with 410 Gone once it is deleted
+    for old_path in glob.glob(artifact_path(assignment.id, '*')):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,172 @@
+from django.db.models import Count, Max
+
+from api import models
+
+from collections import defaultdict, OrderedDict
+import csv
+import hashlib
+
+
+# number of rows fetched from the database at a time when streaming
+STREAM_CHUNK_SIZE = 500
+
+
+class Echo:
+    """
+    A file-like object that hands back whatever is written to it, so a csv
+    writer can produce one line at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def csv_header(columns):
+    """
+    Orders gradebook columns with the student column first and the problem
+    numbers after it.
+
+    :param columns: iterable - the column names of a gradebook row
+    :return: list - the ordered header
+    """
+    header = sorted(columns)
+    if 'student' in header:
+        header.insert(0, header.pop(header.index('student')))
+    return header
+
+
+def csv_lines(header, rows):
+    """
+    Yields the header and every row as encoded CSV lines.
+
+    :param header: list - the ordered column names
+    :param rows: iterable - the gradebook rows as dictionaries
+    """
+    writer = csv.DictWriter(Echo(), fieldnames=header, extrasaction='ignore')
+    yield writer.writerow(dict(zip(header, header))).encode('utf-8')
+    for row in rows:
+        yield writer.writerow(row).encode('utf-8')
+
+
+def assignment_columns(assignment):
+    """
+    Returns the gradebook header of an assignment based on its task templates.
+
+    :param assignment: Assignment - the assignment to build the header for
+    :return: list - the ordered header
+    """
+    problem_nums = models.TaskTemplate.objects \
+        .filter(assignment_template=assignment.assignment_template_id) \
+        .values_list('problem_num', flat=True)
+    return csv_header(['student'] + [str(problem_num) for problem_num in problem_nums])
+
+
+def assignment_rows(assignment, stream=False):
+    """
+    Yields one gradebook row per assignment entry of an assignment.
+
+    Every entry, its student, and its task entries are read in a single joined
+    query and pivoted in memory, so the number of queries does not grow with
+    the number of students or tasks. Each row maps 'student' to the student's
+    wwuid and every answered problem number to the raw input for it.
+
+    :param assignment: Assignment - the assignment to build the rows for
+    :param stream: boolean - read the result set through a cursor in chunks
+        instead of loading it all at once
+    """
+    entries = models.AssignmentEntry.objects.filter(assignment=assignment) \
+        .order_by('id', 'taskentry__id') \
+        .values_list('id', 'student__wwuid', 'taskentry__task_template__problem_num', 'taskentry__raw_input')
+    if stream:
+        entries = entries.iterator(chunk_size=STREAM_CHUNK_SIZE)
+    row = None
+    current_entry = None
+    for entry_id, wwuid, problem_num, raw_input in entries:
+        # a new entry starts a new row
+        if entry_id != current_entry:
+            if row is not None:
+                yield row
+            current_entry = entry_id
+            row = {
+                'student': wwuid,
+            }
+        # entries without any task entries only have the student column
+        if problem_num is not None:
+            row[str(problem_num)] = raw_input
+    if row is not None:
+        yield row
+
+
+def labgroup_gradebooks(labgroups):
+    """
+    Builds a wide gradebook for every labgroup with one column per task of
+    every assignment in the labgroup.
+
+    The assignments, their task templates, and every entry with its task
+    entries are each read with a single query no matter how many labgroups,
+    assignments, or students there are. Columns are named after the
+    assignment template and problem number, and assignments are ordered by
+    their open date.
+
+    :param labgroups: QuerySet - the labgroups to build the gradebooks for
+    :return: list - a (labgroup, header, rows) tuple for every labgroup
+    """
+    labgroups = list(labgroups)
+    assignments = list(models.Assignment.objects
+                       .filter(labgroup__in=labgroups)
+                       .select_related('assignment_template')
+                       .order_by('open_date', 'id'))
+    # get the problem numbers of every assignment template
+    problem_nums = defaultdict(list)
+    task_templates = models.TaskTemplate.objects \
+        .filter(assignment_template__in={assignment.assignment_template_id for assignment in assignments}) \
+        .order_by('problem_num') \
+        .values_list('assignment_template_id', 'problem_num')
+    for assignment_template_id, problem_num in task_templates:
+        problem_nums[assignment_template_id].append(problem_num)
+    # name the columns of every assignment, keeping templates assigned twice apart
+    headers = {labgroup.id: ['student'] for labgroup in labgroups}
+    prefixes = {}
+    used_prefixes = defaultdict(set)
+    for assignment in assignments:
+        prefix = assignment.assignment_template.name
+        if prefix in used_prefixes[assignment.labgroup_id]:
+            prefix = '{} #{}'.format(prefix, assignment.id)
+        used_prefixes[assignment.labgroup_id].add(prefix)
+        prefixes[assignment.id] = prefix
+        headers[assignment.labgroup_id].extend('{} {}'.format(prefix, problem_num)
+                                               for problem_num in problem_nums[assignment.assignment_template_id])
+    # pivot every task entry of every labgroup into one row per student
+    rows = {labgroup.id: OrderedDict() for labgroup in labgroups}
+    entries = models.AssignmentEntry.objects \
+        .filter(assignment__labgroup__in=labgroups) \
+        .order_by('student_id', 'assignment_id', 'taskentry__id') \
+        .values_list('assignment__labgroup_id', 'assignment_id', 'student_id', 'student__wwuid',
+                     'taskentry__task_template__problem_num', 'taskentry__raw_input')
+    for labgroup_id, assignment_id, student_id, wwuid, problem_num, raw_input in entries:
+        row = rows[labgroup_id].setdefault(student_id, {'student': wwuid})
+        if problem_num is not None:
+            row['{} {}'.format(prefixes[assignment_id], problem_num)] = raw_input
+    return [(labgroup, headers[labgroup.id], list(rows[labgroup.id].values())) for labgroup in labgroups]
+
+
+def assignment_version(assignment):
+    """
+    Returns a stamp that changes whenever the gradebook of an assignment
+    changes: its entries and their task entries, the wwuids of its students,
+    and the task templates that name its columns. It is computed with one
+    query for the task templates and one for the entries.
+
+    :param assignment: Assignment - the assignment to stamp
+    :return: string - the data version of the assignment
+    """
+    templates = models.TaskTemplate.objects \
+        .filter(assignment_template=assignment.assignment_template_id) \
+        .order_by('id') \
+        .values_list('id', 'problem_num')
+    entries = models.AssignmentEntry.objects \
+        .filter(assignment=assignment) \
+        .annotate(tasks=Count('taskentry'), tasks_modified=Max('taskentry__modified')) \
+        .order_by('id') \
+        .values_list('id', 'modified', 'student__wwuid', 'tasks', 'tasks_modified')
+    stamp = '{}:{}:{}:{}'.format(assignment.id, assignment.modified, list(templates), list(entries))
+    return hashlib.sha1(stamp.encode('utf-8')).hexdigest()
@@ -0,0 +1,170 @@
+from django.db import transaction
+
+import hashlib
+import json
+import math
+import numpy as np
+
+from api import models
+from equations.registry import registry
+
+
+# number of assignment entries graded together
+GRADE_BATCH_SIZE = 200
+
+# stored verdicts graded by another version are regraded, bump it whenever grading changes
+GRADER_VERSION = '2'
+
+
+def parse_answer(raw_input):
+    """
+    Returns the number in a task entry's raw input, or None if it is not a finite number.
+    """
+    try:
+        answer = float(raw_input.strip().replace(',', ''))
+    except (AttributeError, ValueError):
+        return None
+    return answer if math.isfinite(answer) else None
+
+
+def verdicts(answers, expected, check, numeric_accuracy):
+    """
+    Grades a column of answers against a column of expected values.
+
+    When the task template sets a numeric accuracy, an answer is correct if it
+    matches the expected value to that many decimal places. Otherwise the
+    registered check decides with its own tolerance.
+
+    :param answers: array - the student's answers, nan where there is none
+    :param expected: array - the values derived from the student's measurements
+    :param check: array - the result of the registered check for every row
+    :param numeric_accuracy: integer - the number of decimal places to grade to, or None
+    :return: list - True, False, or None when a row can not be graded
+    """
+    gradable = np.isfinite(answers) & np.isfinite(expected)
+    if numeric_accuracy is not None:
+        with np.errstate(invalid='ignore'):
+            check = np.abs(answers - expected) < 0.5 * 10.0 ** -numeric_accuracy
+    return [bool(correct) if ok else None for correct, ok in zip(check, gradable)]
+
+
+def grade_assignment(assignment, batch_size=GRADE_BATCH_SIZE):
+    """
+    Grades every task entry of an assignment whose task template supplies the
+    answer of a registered check, and records the verdicts.
+
+    Entries are processed batch_size at a time. Each batch reads its task
+    entries along with their stored verdicts in one query, and only the task
+    entries whose inputs changed since they were last graded are evaluated
+    and rewritten, so editing a single task only regrades that task.
+
+    :param assignment: Assignment - the assignment to grade
+    :param batch_size: integer - the number of assignment entries graded together
+    :return: integer - the number of task entries regraded
+    """
+    # a derived variable is computed from the measurements, never taken from a student's answer
+    templates = {template.id: template for template in models.TaskTemplate.objects.filter(
+        assignment_template=assignment.assignment_template_id, variable__isnull=False)
+        if template.variable not in registry.nodes}
+    if not templates:
+        return 0
+    checks = {check.answer: check for check in registry.checks}
+    graded_templates = {template.id: template for template in templates.values() if template.variable in checks}
+    # the answers and measurements every verdict of a template depends on
+    variables = {template.variable for template in templates.values()}
+    inputs = {}
+    for template_id, template in graded_templates.items():
+        check = checks[template.variable]
+        inputs[template_id] = sorted(variables & (registry.requirements(check.name) |
+                                                  registry.ancestors([check.name])))
+    entry_ids = list(models.AssignmentEntry.objects.filter(assignment=assignment)
+                     .order_by('id').values_list('id', flat=True))
+    graded = 0
+    for start in range(0, len(entry_ids), batch_size):
+        graded += grade_batch(entry_ids[start:start + batch_size], templates, graded_templates, checks, inputs)
+    return graded
+
+
+def grade_assignment_template(task_template):
+    """
+    Regrades every assignment of a task template's assignment template that
+    has already been graded, such as after the task template was edited.
+
+    :param task_template: TaskTemplate - the edited task template
+    :return: integer - the number of task entries regraded
+    """
+    assignments = models.Assignment.objects \
+        .filter(assignment_template=task_template.assignment_template_id,
+                assignmententry__taskentry__graderesult__isnull=False) \
+        .distinct()
+    return sum(grade_assignment(assignment) for assignment in assignments)
+
+
+def input_hash(template, raw_inputs, inputs):
+    """
+    Returns a stamp of everything a verdict depends on: the task template's
+    tolerance and the raw input of every value the answer is checked with.
+    """
+    stamp = [template.variable, template.numeric_accuracy] + [[name, raw_inputs.get(name)] for name in inputs]
+    return hashlib.sha1(json.dumps(stamp).encode('utf-8')).hexdigest()
+
+
+def grade_batch(entry_ids, templates, graded_templates, checks, inputs):
+    """
+    Regrades the stale task entries of a batch of assignment entries.
+    """
+    rows = {entry_id: row for row, entry_id in enumerate(entry_ids)}
+    task_entries = models.TaskEntry.objects \
+        .filter(assignment_entry__in=entry_ids) \
+        .order_by('id') \
+        .values_list('id', 'assignment_entry_id', 'task_template_id', 'raw_input',
+                     'graderesult__grader_version', 'graderesult__input_hash')
+    # build a column of every variable with one row per assignment entry, the latest task entry wins
+    columns = {template.variable: np.full(len(entry_ids), np.nan) for template in templates.values()}
+    raw_inputs = {entry_id: {} for entry_id in entry_ids}
+    graded_entries = {}
+    stored = {}
+    for task_entry_id, entry_id, template_id, raw_input, grader_version, stored_hash in task_entries:
+        if stored_hash is not None:
+            stored[task_entry_id] = (grader_version, stored_hash)
+        if template_id not in templates:
+            continue
+        answer = parse_answer(raw_input)
+        columns[templates[template_id].variable][rows[entry_id]] = np.nan if answer is None else answer
+        raw_inputs[entry_id][templates[template_id].variable] = raw_input
+        if template_id in graded_templates:
+            graded_entries[(entry_id, template_id)] = task_entry_id
+    # find the task entries whose inputs changed since they were last graded
+    stale = {}
+    for (entry_id, template_id), task_entry_id in graded_entries.items():
+        stamp = input_hash(graded_templates[template_id], raw_inputs[entry_id], inputs[template_id])
+        if stored.get(task_entry_id) != (GRADER_VERSION, stamp):
+            stale[(entry_id, template_id)] = stamp
+    # verdicts of task entries that are no longer graded are dropped
+    removed = set(stored) - set(graded_entries.values())
+    if not stale and not removed:
+        return 0
+    stale_templates = {template_id for entry_id, template_id in stale}
+    results = registry.evaluate(columns,
+                                targets=[checks[graded_templates[template_id].variable].name
+                                         for template_id in stale_templates],
+                                batch=True)
+    # grade the stale answers of every column
+    grades = []
+    for template_id in stale_templates:
+        template = graded_templates[template_id]
+        check = checks[template.variable]
+        expected = results.get(check.expected, np.full(len(entry_ids), np.nan))
+        correct = results.get(check.name, np.zeros(len(entry_ids), dtype=bool))
+        column = verdicts(columns[template.variable], expected, correct, template.numeric_accuracy)
+        for entry_id, row in rows.items():
+            if (entry_id, template_id) in stale:
+                grades.append(models.GradeResult(task_entry_id=graded_entries[(entry_id, template_id)],
+                                                 correct=column[row],
+                                                 expected=float(expected[row]) if np.isfinite(expected[row]) else None,
+                                                 grader_version=GRADER_VERSION,
+                                                 input_hash=stale[(entry_id, template_id)]))
+    with transaction.atomic():
+        models.GradeResult.objects.filter(task_entry__in=removed | {grade.task_entry_id for grade in grades}).delete()
+        models.GradeResult.objects.bulk_create(grades)
+    return len(grades)
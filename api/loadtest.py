@@ -0,0 +1,416 @@
+"""
+Replays realistic traffic mixes against the API and reports the latency and
+queries of every view, so a change can be compared against a saved baseline.
+
+Run with:
+
+    python manage.py load_test [--mix enroll autosave export] [--save baseline.json] [--compare baseline.json]
+
+By default a throwaway test database is seeded and the traffic is replayed
+through the Django test client in this process. Pass --url to replay it over
+HTTP against a running server, such as a local uwsgi, instead.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pytz import timezone
+import asyncio
+import io
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from api import metrics, models
+from api.seed import seed_term
+
+
+class Request:
+    """
+    A request to replay: who makes it, to which view, and with what data.
+    """
+    def __init__(self, user_id, method, view, kwargs=None, data=None):
+        self.user_id = user_id
+        self.method = method
+        self.view = view
+        self.path = reverse(view, kwargs=kwargs)
+        self.data = data
+
+
+class Sample:
+    """
+    The outcome of a replayed request.
+    """
+    def __init__(self, mix, view, status, ms, queries):
+        self.mix = mix
+        self.view = view
+        self.status = status
+        self.ms = ms
+        self.queries = queries
+
+
+class World:
+    """
+    The seeded rows the traffic is made from and the tokens its users authenticate with.
+    """
+    def __init__(self):
+        self.tokens = {}
+        self.enrollees = []
+        self.labgroups = []
+        self.open_entries = []
+        self.exports = []
+
+
+def build_world(courses=2, labgroups=5, students=20, assignments=10, tasks=10, enrollees=100, seed=0):
+    """
+    Seeds courses full of labgroups, students, and answers, along with users
+    who have yet to enroll, and gives every user a token.
+
+    :param courses: integer - the courses to seed, each with its own instructors and templates
+    :param enrollees: integer - the users who have not enrolled in a labgroup yet
+    :return: World - the seeded rows used to build traffic
+    """
+    world = World()
+    terms = [seed_term(terms=2, labgroups=labgroups, students=students, assignments=assignments, tasks=tasks,
+                       seed=seed + course) for course in range(0, courses)]
+    labgroup_ids = [labgroup_id for term in terms for labgroup_id in term.labgroups]
+    world.labgroups = list(models.LabGroup.objects.filter(id__in=labgroup_ids).values_list('id', 'enroll_key'))
+    # users who sign up at the start of the term
+    User.objects.bulk_create(User(username='seed{}-enrollee-{}'.format(seed, e), password='!')
+                             for e in range(0, enrollees))
+    world.enrollees = list(User.objects.filter(username__startswith='seed{}-enrollee-'.format(seed))
+                           .values_list('id', flat=True))
+    # the entries of the assignments open right now, with the tasks to answer
+    now = datetime.now(timezone(settings.TIME_ZONE))
+    task_templates = {}
+    for term in terms:
+        task_templates.update(term.task_templates)
+    world.open_entries = [(user_id, assignment_id, task_templates[template_id])
+                          for user_id, assignment_id, template_id in models.AssignmentEntry.objects
+                          .filter(assignment__labgroup__in=labgroup_ids, assignment__open_date__lte=now,
+                                  assignment__close_date__gt=now)
+                          .values_list('student__user_id', 'assignment_id', 'assignment__assignment_template_id')]
+    world.exports = list(models.Assignment.objects
+                         .filter(labgroup__in=labgroup_ids, open_date__lte=now)
+                         .values_list('labgroup__instructor__user_id', 'id', 'labgroup_id', 'labgroup__term'))
+    # tokens for everyone who makes a request
+    user_ids = set(world.enrollees)
+    user_ids.update(user_id for user_id, assignment_id, templates in world.open_entries)
+    user_ids.update(user_id for user_id, assignment_id, labgroup_id, term in world.exports)
+    Token.objects.bulk_create(Token(key=Token().generate_key(), user_id=user_id) for user_id in user_ids)
+    world.tokens = dict(Token.objects.filter(user__in=user_ids).values_list('user_id', 'key'))
+    return world
+
+
+def enroll_mix(world, rng, count):
+    """
+    The start of a term: new users checking their enrollment, enrolling, and listing their assignments.
+    """
+    requests = []
+    for user_id in world.enrollees[:count // 3]:
+        labgroup_id, enroll_key = rng.choice(world.labgroups)
+        requests.append(Request(user_id, 'GET', 'api:enroll'))
+        requests.append(Request(user_id, 'POST', 'api:enroll', data={'wwuid': '{:07d}'.format(user_id),
+                                                                     'labgroup': labgroup_id,
+                                                                     'enroll_key': enroll_key}))
+        requests.append(Request(user_id, 'GET', 'api:assignment-lc'))
+    return requests
+
+
+def autosave_mix(world, rng, count):
+    """
+    A lab session: students autosaving a few answers at a time and reloading their answers now and then.
+    """
+    requests = []
+    for _ in range(0, count):
+        user_id, assignment_id, templates = rng.choice(world.open_entries)
+        if rng.random() < 0.2:
+            requests.append(Request(user_id, 'GET', 'api:task-entry-lc', kwargs={'assignment': assignment_id}))
+        else:
+            answers = [{'task_template': template_id, 'raw_input': str(rng.random())}
+                       for template_id in rng.sample(templates, min(len(templates), rng.randint(1, 3)))]
+            requests.append(Request(user_id, 'POST', 'api:task-entry-batch', kwargs={'assignment': assignment_id},
+                                    data={'task_entries': answers}))
+    return requests
+
+
+def export_mix(world, rng, count):
+    """
+    The end of a term: instructors downloading assignment CSVs, labgroup CSVs, and term gradebooks.
+    """
+    requests = []
+    for _ in range(0, count):
+        user_id, assignment_id, labgroup_id, term = rng.choice(world.exports)
+        kind = rng.random()
+        if kind < 0.6:
+            requests.append(Request(user_id, 'GET', 'api:assignment-csv', kwargs={'pk': assignment_id}))
+        elif kind < 0.9:
+            requests.append(Request(user_id, 'GET', 'api:lab-group-csv', kwargs={'pk': labgroup_id}))
+        else:
+            requests.append(Request(user_id, 'GET', 'api:gradebook-zip', kwargs={'term': term}))
+    return requests
+
+
+# the traffic mixes by name, replayed in this order
+MIXES = OrderedDict((
+    ('enroll', enroll_mix),
+    ('autosave', autosave_mix),
+    ('export', export_mix),
+))
+
+
+def client_sender(world):
+    """
+    Returns a function sending a request through the test client, reporting its status and queries.
+    """
+    client = Client()
+
+    def send(request):
+        data = json.dumps(request.data) if request.data is not None else ''
+        response = client.generic(request.method, request.path, data, content_type='application/json',
+                                  HTTP_AUTHORIZATION='Bearer {}'.format(world.tokens[request.user_id]))
+        # read streamed responses through so the whole request is timed
+        if response.streaming:
+            b''.join(response.streaming_content)
+        records = metrics.recent()
+        return response.status_code, records[-1].queries if records else None
+    return send
+
+
+def http_sender(world, url):
+    """
+    Returns a function sending a request over HTTP to a running server, reporting its status.
+    """
+    def send(request):
+        data = json.dumps(request.data).encode('utf-8') if request.data is not None else None
+        http_request = urllib.request.Request(url.rstrip('/') + request.path, data=data, method=request.method)
+        http_request.add_header('Authorization', 'Bearer {}'.format(world.tokens[request.user_id]))
+        http_request.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(http_request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+    return send
+
+
+def wsgi_sender(application, world):
+    """
+    Returns a function sending a request straight to a WSGI application the
+    way a WSGI server such as uwsgi calls it, reporting its status.
+    """
+    def send(request):
+        body = json.dumps(request.data).encode('utf-8') if request.data is not None else b''
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': request.path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_HOST': 'testserver',
+            'HTTP_AUTHORIZATION': 'Bearer {}'.format(world.tokens[request.user_id]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split(' ', 1)[0]))
+        result = application(environ, start_response)
+        # read the response through so streamed responses are timed whole
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return statuses[0], None
+    return send
+
+
+async def asgi_send(application, world, request):
+    """
+    Sends a request straight to an ASGI application, reporting its status.
+    """
+    body = json.dumps(request.data).encode('utf-8') if request.data is not None else b''
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': request.method,
+        'scheme': 'http',
+        'path': request.path,
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'),
+                    (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('latin-1')),
+                    (b'authorization', 'Bearer {}'.format(world.tokens[request.user_id]).encode('latin-1'))],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    statuses = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def replay_connections(send, student_requests, export_requests):
+    """
+    Replays a lab session over concurrent connections: every student
+    connection sends its requests one after another while the export
+    connections keep downloading exports until the students are done.
+
+    :param send: coroutine function - sends a Request and returns its status
+    :param student_requests: list - the Requests of every student connection
+    :param export_requests: list - the Requests of every export connection
+    :return: tuple - the Samples of every request and the seconds the replay took
+    """
+    samples = []
+    students_done = []
+
+    async def timed(mix, request):
+        start = time.perf_counter()
+        status = await send(request)
+        samples.append(Sample(mix, request.view, status, (time.perf_counter() - start) * 1000, None))
+
+    async def student(requests):
+        for request in requests:
+            await timed('student', request)
+
+    async def exporter(requests):
+        i = 0
+        while not students_done:
+            await timed('export', requests[i % len(requests)])
+            i += 1
+
+    async def session():
+        exporters = [asyncio.ensure_future(exporter(requests)) for requests in export_requests]
+        await asyncio.gather(*[student(requests) for requests in student_requests])
+        students_done.append(True)
+        await asyncio.gather(*exporters)
+
+    start = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(session())
+    finally:
+        loop.close()
+    return samples, time.perf_counter() - start
+
+
+def replay(mix, requests, send, concurrency=1):
+    """
+    Sends every request of a mix and times it.
+
+    :param mix: string - the name of the mix
+    :param requests: list - the Requests to send
+    :param send: function - sends a Request and returns its status and query count
+    :param concurrency: integer - the number of requests in flight at once
+    :return: list - a Sample for every request
+    """
+    def timed(request):
+        start = time.perf_counter()
+        status, queries = send(request)
+        return Sample(mix, request.view, status, (time.perf_counter() - start) * 1000, queries)
+    if concurrency <= 1:
+        return [timed(request) for request in requests]
+    with ThreadPoolExecutor(concurrency) as executor:
+        return list(executor.map(timed, requests))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(samples):
+    """
+    Aggregates samples by mix and view.
+
+    :return: OrderedDict - the requests, errors, latency percentiles, and queries of every 'mix view'
+    """
+    groups = OrderedDict()
+    for sample in samples:
+        groups.setdefault('{} {}'.format(sample.mix, sample.view), []).append(sample)
+    summary = OrderedDict()
+    for name, group in groups.items():
+        timings = [sample.ms for sample in group]
+        queries = [sample.queries for sample in group if sample.queries is not None]
+        summary[name] = {
+            'requests': len(group),
+            'errors': sum(1 for sample in group if sample.status >= 400),
+            'p50': round(percentile(timings, 0.5), 3),
+            'p95': round(percentile(timings, 0.95), 3),
+            'p99': round(percentile(timings, 0.99), 3),
+            'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'queries_max': max(queries) if queries else None,
+        }
+    return summary
+
+
+def report(summary):
+    """
+    Returns a summary as a table.
+    """
+    lines = ['{:<40}{:>9}{:>8}{:>11}{:>11}{:>11}{:>10}{:>9}'.format('mix view', 'requests', 'errors', 'p50 ms',
+                                                                   'p95 ms', 'p99 ms', 'queries', 'max')]
+    for name, stats in summary.items():
+        lines.append('{:<40}{requests:>9}{errors:>8}{p50:>11.3f}{p95:>11.3f}{p99:>11.3f}{:>10}{:>9}'.format(
+            name, '-' if stats['queries_mean'] is None else stats['queries_mean'],
+            '-' if stats['queries_max'] is None else stats['queries_max'], **stats))
+    return '\n'.join(lines)
+
+
+def compare(baseline, summary, tolerance=0.25, floor=1.0):
+    """
+    Compares a summary to a saved baseline.
+
+    A view regresses when it makes more queries than it did, starts failing
+    requests, or its p95 grows by more than the tolerance and the floor.
+
+    :param baseline: dictionary - a summary saved from an earlier run
+    :param summary: dictionary - the summary of this run
+    :param tolerance: float - the fraction the p95 may grow by
+    :param floor: float - the milliseconds the p95 may always grow by, so quick views do not regress on noise
+    :return: list - a description of every regression
+    """
+    regressions = []
+    for name, stats in summary.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if stats['queries_max'] is not None and before['queries_max'] is not None \
+                and stats['queries_max'] > before['queries_max']:
+            regressions.append('{} makes {} queries, up from {}'.format(name, stats['queries_max'],
+                                                                       before['queries_max']))
+        if stats['errors'] > before['errors']:
+            regressions.append('{} failed {} requests, up from {}'.format(name, stats['errors'], before['errors']))
+        if stats['p95'] > before['p95'] * (1 + tolerance) + floor:
+            regressions.append('{} p95 is {:.3f}ms, up from {:.3f}ms'.format(name, stats['p95'], before['p95']))
+    return regressions
@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import random
+
+from api import loadtest
+from chem_lab_server.asgi_handler import ASGIHandler
+
+
+class Command(BaseCommand):
+    help = 'Compares how a lab session holds up next to slow exports served over WSGI and over ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=32, help='Concurrent student connections.')
+        parser.add_argument('--exports', type=int, default=4, help='Concurrent connections downloading exports.')
+        parser.add_argument('--requests', type=int, default=20, help='Requests sent by every student connection.')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Threads answering requests, processes * threads in uwsgi.ini.')
+        parser.add_argument('--student-threads', type=int, default=2,
+                            help='Threads of the total that other requests leave free for the student views over ASGI.')
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the data and the traffic.')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Replace an existing test database without asking.')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'], serialize=False)
+        try:
+            results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        lines = ['{:<8}{:>14}{:>13}{:>13}{:>13}{:>13}{:>13}'.format('mode', 'threads', 'student rps', 'student p50',
+                                                                 'student p95', 'student p99', 'export rps')]
+        for mode, threads, summary, seconds in results:
+            students = [sample for sample in summary if sample.mix == 'student']
+            exports = [sample for sample in summary if sample.mix == 'export']
+            timings = [sample.ms for sample in students]
+            lines.append('{:<8}{:>14}{:>13.1f}{:>11.1f}ms{:>11.1f}ms{:>11.1f}ms{:>13.1f}'.format(
+                mode, threads, len(students) / seconds, loadtest.percentile(timings, 0.5),
+                loadtest.percentile(timings, 0.95), loadtest.percentile(timings, 0.99), len(exports) / seconds))
+            failed = sum(1 for sample in summary if sample.status >= 400)
+            if failed:
+                lines.append('{:<8}{} requests failed'.format('', failed))
+        lines.append('wsgi calls the WSGI application on a pool of processes * threads threads in this process, '
+                     'the way uwsgi does in each of its processes. Use the load test with --url to measure a running '
+                     'uwsgi.')
+        self.stdout.write('\n'.join(lines))
+
+    def run(self, options):
+        world = loadtest.build_world(courses=2, labgroups=5, students=20, enrollees=0, seed=options['seed'])
+        rng = random.Random(options['seed'])
+        # students reloading their answers and enrollment, and instructors downloading exports
+        student_requests = []
+        for _ in range(0, options['connections']):
+            requests = []
+            for _ in range(0, options['requests']):
+                user_id, assignment_id, templates = rng.choice(world.open_entries)
+                if rng.random() < 0.8:
+                    requests.append(loadtest.Request(user_id, 'GET', 'api:task-entry-lc',
+                                                     kwargs={'assignment': assignment_id}))
+                else:
+                    requests.append(loadtest.Request(user_id, 'GET', 'api:enroll'))
+            student_requests.append(requests)
+        export_requests = [loadtest.export_mix(world, rng, 10) for _ in range(0, options['exports'])]
+        wsgi_application = get_wsgi_application()
+        results = []
+        # every request waits for one of the threads, which answers it whole, as in uwsgi
+        pool = ThreadPoolExecutor(options['threads'], thread_name_prefix='wsgi')
+        wsgi_send = loadtest.wsgi_sender(wsgi_application, world)
+
+        async def send(request):
+            status, _ = await asyncio.get_event_loop().run_in_executor(pool, wsgi_send, request)
+            return status
+        samples, seconds = loadtest.replay_connections(send, student_requests, export_requests)
+        pool.shutdown()
+        results.append(('wsgi', str(options['threads']), samples, seconds))
+        # the same number of threads, with some kept free for the student views
+        application = ASGIHandler(wsgi_application, options['threads'], options['student_threads'])
+        samples, seconds = loadtest.replay_connections(
+            lambda request: loadtest.asgi_send(application, world, request), student_requests, export_requests)
+        application.shutdown()
+        results.append(('asgi', '{} ({} kept)'.format(options['threads'], options['student_threads']),
+                        samples, seconds))
+        return results
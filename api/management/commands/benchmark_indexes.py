@@ -0,0 +1,34 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api import benchmark, seed
+
+
+class Command(BaseCommand):
+    help = 'Compares the API access path queries before and after their indexes on a seeded test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Queries timed for every access path.')
+        parser.add_argument('--before', default='0005_grade_result_version',
+                            help='The api migration to time the access paths at before the indexes.')
+        parser.add_argument('--labgroups', type=int, default=15, help='Labgroups seeded for every term.')
+        parser.add_argument('--students', type=int, default=24, help='Students seeded for every labgroup.')
+        parser.add_argument('--plans', action='store_true', help='Print the query plans as well.')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Replace an existing test database without asking.')
+
+    def handle(self, *args, **options):
+        # never seed the real database
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'], serialize=False)
+        try:
+            call_command('migrate', 'api', options['before'], verbosity=0)
+            term = seed.seed_term(labgroups=options['labgroups'], students=options['students'])
+            before = benchmark.measure(term, options['iterations'])
+            call_command('migrate', 'api', verbosity=0)
+            after = benchmark.measure(term, options['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(benchmark.report(before, after, options['plans']))
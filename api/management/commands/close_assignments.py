@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from datetime import datetime, timedelta
+from pytz import timezone
+import time
+
+from api.closing import close_assignments
+
+
+class Command(BaseCommand):
+    help = 'Submits the unsubmitted entries of assignments that have closed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep sweeping every this many seconds instead of sweeping once.')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        since = None
+        while True:
+            until = datetime.now(timezone(settings.TIME_ZONE))
+            submitted = close_assignments(until=until, since=since)
+            if submitted or options['verbosity'] > 1:
+                self.stdout.write('Submitted {} entries of closed assignments.'.format(submitted))
+            if interval <= 0:
+                return
+            # overlap the next sweep with this one so an entry started the moment an assignment closed is caught
+            since = until - timedelta(seconds=interval)
+            time.sleep(interval)
+            close_old_connections()
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+import json
+import random
+
+from api import loadtest
+
+
+class Command(BaseCommand):
+    help = 'Replays realistic traffic mixes against the API and reports the latency and queries of every view.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', nargs='+', choices=list(loadtest.MIXES), default=list(loadtest.MIXES),
+                            help='The traffic mixes to replay.')
+        parser.add_argument('--requests', type=int, default=300, help='Requests replayed for every mix.')
+        parser.add_argument('--courses', type=int, default=2, help='Courses seeded.')
+        parser.add_argument('--labgroups', type=int, default=5, help='Labgroups seeded for every course and term.')
+        parser.add_argument('--students', type=int, default=20, help='Students seeded for every labgroup.')
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the data and the traffic.')
+        parser.add_argument('--url', help='Replay over HTTP against the server at this URL. The server has to use '
+                                          'the database configured here, which is seeded, so make it a scratch one.')
+        parser.add_argument('--seed-database', action='store_true',
+                            help='Seed the configured database for --url without asking first.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Requests in flight at once over HTTP.')
+        parser.add_argument('--save', help='Save the results to this file as a baseline.')
+        parser.add_argument('--compare', help='Compare the results to the baseline in this file.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='The fraction a p95 may grow by before it is a regression.')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Replace an existing test database without asking, and never ask before seeding '
+                                 'the database for --url.')
+
+    def handle(self, *args, **options):
+        if options['url'] is not None:
+            # the server reads the configured database, so it is seeded in place
+            if not options['seed_database']:
+                if not options['interactive']:
+                    raise CommandError('Replaying against --url seeds the database {!r}. Pass --seed-database to '
+                                       'seed it without asking.'.format(connection.settings_dict['NAME']))
+                confirm = input('Replaying against --url seeds the database {!r} with load test data.\n'
+                                'Type \'yes\' to continue, or \'no\' to cancel: '
+                                .format(connection.settings_dict['NAME']))
+                if confirm != 'yes':
+                    raise CommandError('Load test cancelled.')
+            summary = self.run(options)
+        else:
+            # replay through the test client against a throwaway database
+            old_name = connection.settings_dict['NAME']
+            setup_test_environment()
+            connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'], serialize=False)
+            try:
+                summary = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+        self.stdout.write(loadtest.report(summary))
+        if options['save'] is not None:
+            with open(options['save'], 'w') as baseline_file:
+                json.dump(summary, baseline_file, indent=2)
+        if options['compare'] is not None:
+            with open(options['compare']) as baseline_file:
+                regressions = loadtest.compare(json.load(baseline_file), summary, options['tolerance'])
+            if regressions:
+                raise CommandError('Regressed against {}:\n{}'.format(options['compare'], '\n'.join(regressions)))
+            self.stdout.write('No regressions against {}.'.format(options['compare']))
+
+    def run(self, options):
+        world = loadtest.build_world(courses=options['courses'], labgroups=options['labgroups'],
+                                     students=options['students'], enrollees=options['requests'],
+                                     seed=options['seed'])
+        if options['url'] is not None:
+            send = loadtest.http_sender(world, options['url'])
+        else:
+            send = loadtest.client_sender(world)
+        rng = random.Random(options['seed'])
+        samples = []
+        for mix in options['mix']:
+            requests = loadtest.MIXES[mix](world, rng, options['requests'])
+            samples.extend(loadtest.replay(mix, requests, send, options['concurrency'] if options['url'] else 1))
+        return loadtest.summarize(samples)
@@ -0,0 +1,248 @@
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+from collections import deque
+from contextlib import contextmanager, ExitStack
+from datetime import datetime
+from pytz import timezone
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# the metrics of the most recent requests, oldest first
+_buffer = deque(maxlen=settings.METRICS_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+# the metrics of the request being handled by the current thread
+_local = threading.local()
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a view makes more queries than its budget allows and budgets are strict.
+    """
+
+
+class RequestMetrics:
+    """
+    What a single request cost: its queries, the time spent in the database,
+    in the serializers, and in the renderer, and the size of its response.
+    """
+    def __init__(self, method, path):
+        self.timestamp = datetime.now(timezone(settings.TIME_ZONE))
+        self.method = method
+        self.path = path
+        self.view = None
+        self.status = None
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.size = None
+
+    def as_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'method': self.method,
+            'path': self.path,
+            'view': self.view,
+            'status': self.status,
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 3),
+            'serialize_ms': round(self.serialize_ms, 3),
+            'render_ms': round(self.render_ms, 3),
+            'total_ms': round(self.total_ms, 3),
+            'size': self.size,
+        }
+
+
+def current():
+    """
+    Returns the metrics of the request being handled by this thread, or None outside of a request.
+    """
+    return getattr(_local, 'metrics', None)
+
+
+def recent():
+    """
+    Returns the metrics of the most recent requests, oldest first.
+    """
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def clear():
+    """
+    Forgets the metrics of every request.
+    """
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(records):
+    """
+    Aggregates request metrics by view.
+
+    :param records: list - the RequestMetrics to aggregate
+    :return: dictionary - the request count, query counts and latency percentiles of every view
+    """
+    views = {}
+    for record in records:
+        views.setdefault(record.view or record.path, []).append(record)
+    return {
+        view: {
+            'requests': len(records),
+            'queries_max': max(record.queries for record in records),
+            'queries_mean': round(sum(record.queries for record in records) / len(records), 2),
+            'db_ms_mean': round(sum(record.db_ms for record in records) / len(records), 3),
+            'serialize_ms_mean': round(sum(record.serialize_ms for record in records) / len(records), 3),
+            'render_ms_mean': round(sum(record.render_ms for record in records) / len(records), 3),
+            'total_ms_p50': round(percentile([record.total_ms for record in records], 0.5), 3),
+            'total_ms_p95': round(percentile([record.total_ms for record in records], 0.95), 3),
+            'budget': settings.QUERY_BUDGETS.get(view),
+        }
+        for view, records in views.items()
+    }
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    A database execute wrapper that adds every query and its duration to the current request's metrics.
+    """
+    metrics = current()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+def check_budget(metrics):
+    """
+    Logs a request that made more queries than its view's budget, and raises
+    QueryBudgetExceeded for it when QUERY_BUDGET_STRICT is set.
+    """
+    budget = settings.QUERY_BUDGETS.get(metrics.view)
+    if budget is None or metrics.queries <= budget:
+        return
+    message = '{} {} ({}) made {} queries, over its budget of {}'.format(metrics.method, metrics.path, metrics.view,
+                                                                       metrics.queries, budget)
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def measuring(metrics):
+    """
+    Adds the queries made by the current thread inside the block to a request's metrics.
+    """
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            yield
+    finally:
+        _local.metrics = None
+
+
+def record(metrics):
+    """
+    Keeps the metrics of a finished request for the metrics view and checks its query budget.
+    """
+    with _buffer_lock:
+        _buffer.append(metrics)
+    check_budget(metrics)
+
+
+class MetricsMiddleware:
+    """
+    Records the query count, database time, serializer time, render time,
+    total time, and response size of every request, labelled by the name of
+    the URL it resolved to, and keeps the most recent ones for the metrics
+    view.
+    Streamed responses read their rows while they are sent, so they are
+    recorded once the stream ends.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(request.method, request.path)
+        start = time.perf_counter()
+        with measuring(metrics):
+            response = self.get_response(request)
+        if request.resolver_match is not None:
+            metrics.view = request.resolver_match.view_name
+        metrics.status = response.status_code
+        if response.streaming:
+            response.streaming_content = self.stream(response.streaming_content, metrics, start)
+            return response
+        metrics.total_ms = (time.perf_counter() - start) * 1000
+        metrics.size = len(response.content)
+        record(metrics)
+        return response
+
+    def stream(self, content, metrics, start):
+        """
+        Yields the chunks of a streamed response, measuring the queries made
+        to produce each one, and records the request after the last chunk.
+        """
+        metrics.size = 0
+        chunks = iter(content)
+        try:
+            while True:
+                with measuring(metrics):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                metrics.size += len(chunk)
+                yield chunk
+        finally:
+            metrics.total_ms = (time.perf_counter() - start) * 1000
+            record(metrics)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    A JSON renderer that adds the time spent rendering to the current request's metrics.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics = current()
+            if metrics is not None:
+                metrics.render_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedSerializerMixin:
+    """
+    A serializer mixin that adds the time spent turning instances into data
+    to the current request's metrics, including the queries made to read
+    related rows. Nested serializers are timed as part of the outermost one.
+    """
+    def to_representation(self, instance):
+        metrics = current()
+        if metrics is None or getattr(_local, 'serializing', False):
+            return super().to_representation(instance)
+        _local.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            _local.serializing = False
+            metrics.serialize_ms += (time.perf_counter() - start) * 1000
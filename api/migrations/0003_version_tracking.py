@@ -0,0 +1,23 @@
+# Generated by Django 2.1.4 on 2026-10-18 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_export_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmenttemplate',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='labgroup',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.1.4 on 2026-10-18 18:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_version_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasktemplate',
+            name='variable',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.CreateModel(
+            name='GradeResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('correct', models.BooleanField(null=True)),
+                ('expected', models.FloatField(null=True)),
+                ('graded', models.DateTimeField(auto_now=True)),
+                ('task_entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.TaskEntry')),
+            ],
+            options={
+                'db_table': 'api_grade_result',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.1.4 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_grading'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graderesult',
+            name='grader_version',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='graderesult',
+            name='input_hash',
+            field=models.CharField(default='', max_length=40),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.1.4 on 2026-10-18 20:15
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_entries(apps, schema_editor):
+    """
+    Merges assignment entries a student started more than once into the
+    first one, keeping every task entry and the earliest submission.
+    """
+    AssignmentEntry = apps.get_model('api', 'AssignmentEntry')
+    TaskEntry = apps.get_model('api', 'TaskEntry')
+    duplicates = AssignmentEntry.objects.values('student', 'assignment') \
+        .annotate(entries=Count('id'), first=Min('id'), submitted=Min('submit_date')) \
+        .filter(entries__gt=1)
+    for duplicate in duplicates:
+        others = AssignmentEntry.objects.filter(student=duplicate['student'], assignment=duplicate['assignment']) \
+            .exclude(id=duplicate['first'])
+        TaskEntry.objects.filter(assignment_entry__in=others).update(assignment_entry=duplicate['first'])
+        AssignmentEntry.objects.filter(id=duplicate['first']).update(submit_date=duplicate['submitted'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_grade_result_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_entries, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='assignmententry',
+            unique_together={('student', 'assignment')},
+        ),
+    ]
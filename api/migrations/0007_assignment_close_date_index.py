@@ -0,0 +1,18 @@
+# Generated by Django 2.1.4 on 2026-10-18 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_assignment_entry_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignment',
+            name='close_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.4 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_assignment_close_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskentry',
+            index=models.Index(fields=['assignment_entry', 'task_template'], name='api_task_en_assignm_08d4f0_idx'),
+        ),
+    ]
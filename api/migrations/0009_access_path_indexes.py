@@ -0,0 +1,26 @@
+# Generated by Django 2.1.4 on 2026-10-18 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_task_entry_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='wwuid',
+            field=models.CharField(db_index=True, max_length=7),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['labgroup', 'open_date', 'close_date'], name='api_assignm_labgrou_f41a63_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labgroup',
+            index=models.Index(fields=['term', 'instructor'], name='api_labgrou_term_9f14ef_idx'),
+        ),
+    ]
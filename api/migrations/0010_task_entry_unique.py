@@ -0,0 +1,41 @@
+# Generated by Django 2.1.4 on 2026-10-18 23:40
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def merge_duplicate_task_entries(apps, schema_editor):
+    """
+    Merges task entries saved more than once for the same task of an
+    assignment entry into the latest one, which holds the answer graded and
+    exported, keeping the most attempts any of them recorded.
+    """
+    TaskEntry = apps.get_model('api', 'TaskEntry')
+    duplicates = TaskEntry.objects.values('assignment_entry', 'task_template') \
+        .annotate(entries=Count('id'), last=Max('id'), attempts=Max('attempts')) \
+        .filter(entries__gt=1)
+    for duplicate in duplicates:
+        TaskEntry.objects.filter(id=duplicate['last']).update(attempts=duplicate['attempts'])
+        TaskEntry.objects.filter(assignment_entry=duplicate['assignment_entry'],
+                                 task_template=duplicate['task_template']) \
+            .exclude(id=duplicate['last']) \
+            .delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_task_entries, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='taskentry',
+            unique_together={('assignment_entry', 'task_template')},
+        ),
+        migrations.RemoveIndex(
+            model_name='taskentry',
+            name='api_task_en_assignm_08d4f0_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.4 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignment',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
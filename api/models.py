@@ -27,10 +27,14 @@ class LabGroup(models.Model):
     group_name = models.CharField(max_length=20)
     term = models.CharField(max_length=10)
     enroll_key = models.CharField(max_length=20)
+    modified = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'api_labgroup'
         unique_together = ('course', 'group_name', 'term')
+        indexes = [
+            models.Index(fields=['term', 'instructor']),
+        ]
 
 
 class Student(models.Model):
@@ -39,7 +43,7 @@ class Student(models.Model):
     """
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     labgroup = models.ForeignKey(LabGroup, null=True, on_delete=models.CASCADE)
-    wwuid = models.CharField(max_length=7)
+    wwuid = models.CharField(max_length=7, db_index=True)
 
 
 class AssignmentTemplate(models.Model):
@@ -49,6 +53,7 @@ class AssignmentTemplate(models.Model):
     """
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
+    modified = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'api_assignment_template'
@@ -68,6 +73,7 @@ class TaskTemplate(models.Model):
     attempts_allowed = models.IntegerField(null=True)
     numeric_accuracy = models.IntegerField(null=True)
     numeric_only = models.BooleanField()
+    variable = models.CharField(max_length=50, null=True)
 
     class Meta:
         db_table = 'api_task_template'
@@ -82,7 +88,13 @@ class Assignment(models.Model):
     assignment_template = models.ForeignKey(AssignmentTemplate, on_delete=models.CASCADE)
     labgroup = models.ForeignKey(LabGroup, on_delete=models.CASCADE)
     open_date = models.DateTimeField()
-    close_date = models.DateTimeField()
+    close_date = models.DateTimeField(db_index=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['labgroup', 'open_date', 'close_date']),
+        ]
 
 
 class AssignmentEntry(models.Model):
@@ -94,9 +106,11 @@ class AssignmentEntry(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
     start_date = models.DateTimeField(auto_now_add=True)
     submit_date = models.DateTimeField(null=True)
+    modified = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'api_assignment_entry'
+        unique_together = ('student', 'assignment')
 
 
 class TaskEntry(models.Model):
@@ -108,6 +122,54 @@ class TaskEntry(models.Model):
     task_template = models.ForeignKey(TaskTemplate, on_delete=models.CASCADE)
     attempts = models.IntegerField()
     raw_input = models.TextField()
+    modified = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'api_task_entry'
+        unique_together = ('assignment_entry', 'task_template')
+
+
+class GradeResult(models.Model):
+    """
+    The GradeResult model represents the verdict of the grader on a TaskEntry.
+    A verdict of None means the entry could not be graded, such as when the
+    answer is not a number or a measurement it depends on is missing. The
+    grader version and input hash record what the verdict was computed from,
+    so it is only recomputed once one of them changes.
+    """
+    task_entry = models.OneToOneField(TaskEntry, on_delete=models.CASCADE)
+    correct = models.BooleanField(null=True)
+    expected = models.FloatField(null=True)
+    grader_version = models.CharField(max_length=20)
+    input_hash = models.CharField(max_length=40)
+    graded = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'api_grade_result'
+
+
+class ExportJob(models.Model):
+    """
+    The ExportJob model represents an assignment CSV being built in the
+    background for an instructor.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    data_version = models.CharField(max_length=40)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'api_export_job'
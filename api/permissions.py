@@ -1,46 +1,55 @@
 from django.contrib.auth.models import ContentType, Group, Permission
+from django.db import DEFAULT_DB_ALIAS
 from rest_framework.permissions import BasePermission, DjangoModelPermissions
 
 from api import models
+from api.roles import get_role
 
 import copy
 
 
+# the models each group is given every permission on
+GROUP_MODELS = {
+    'Instructor': (models.Course, models.LabGroup, models.Student, models.Assignment, models.AssignmentTemplate,
+                   models.TaskTemplate),
+    'Student': (models.AssignmentEntry, models.TaskEntry),
+}
+
+# the ids of the groups, looked up once per process
+_group_ids = {}
+
+
+def bootstrap_groups(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Creates the instructor and student groups along with their permissions,
+    and remembers their ids. Runs after every migrate so the groups exist
+    before the first request.
+    """
+    for name, group_models in GROUP_MODELS.items():
+        group, created = Group.objects.using(using).get_or_create(name=name)
+        content_types = ContentType.objects.db_manager(using).get_for_models(*group_models).values()
+        group.permissions.add(*Permission.objects.using(using).filter(content_type__in=content_types))
+        if using == DEFAULT_DB_ALIAS:
+            _group_ids[name] = group.id
+
+
+def get_group(name):
+    """
+    Returns a group by name, only querying for it the first time it is asked for in a process.
+    """
+    if name not in _group_ids:
+        _group_ids.update(Group.objects.filter(name__in=GROUP_MODELS).values_list('name', 'id'))
+    if name not in _group_ids:
+        bootstrap_groups()
+    return Group.from_db(DEFAULT_DB_ALIAS, ['id', 'name'], [_group_ids[name], name])
+
+
 def get_or_create_instructor_permissions():
-    # create the instructor group if it does not exist
-    group, created = Group.objects.get_or_create(name='Instructor')
-    if created:
-        # get permissions for all instructor models
-        content_types = [
-            ContentType.objects.get_for_model(models.Course),
-            ContentType.objects.get_for_model(models.LabGroup),
-            ContentType.objects.get_for_model(models.Student),
-            ContentType.objects.get_for_model(models.Assignment),
-            ContentType.objects.get_for_model(models.Assignment),
-            ContentType.objects.get_for_model(models.AssignmentTemplate),
-            ContentType.objects.get_for_model(models.TaskTemplate)
-        ]
-        for ct in content_types:
-            permissions = Permission.objects.filter(content_type=ct).all()
-            for p in permissions:
-                group.permissions.add(p)
-    return group
+    return get_group('Instructor')
 
 
 def get_or_create_student_permissions():
-    # create the student group if it does not exist
-    group, created = Group.objects.get_or_create(name='Student')
-    if created:
-        # add group permissions for all student models
-        content_types = [
-            ContentType.objects.get_for_model(models.AssignmentEntry),
-            ContentType.objects.get_for_model(models.TaskEntry),
-        ]
-        for ct in content_types:
-            permissions = Permission.objects.filter(content_type=ct).all()
-            for p in permissions:
-                group.permissions.add(p)
-    return group
+    return get_group('Student')
 
 
 class ViewDjangoModelPermissions(DjangoModelPermissions):
@@ -57,8 +66,8 @@ class IsStudentOrInstructor(BasePermission):
     Permission class to determine if the user is an instructor or a student.
     """
     def has_permission(self, request, view):
-        return models.Instructor.objects.filter(user=request.user).exists() or \
-               models.Student.objects.filter(user=request.user).exists()
+        role = get_role(request)
+        return role.is_instructor or role.is_student
 
 
 class IsInstructor(BasePermission):
@@ -66,7 +75,7 @@ class IsInstructor(BasePermission):
     Permission class to determine if the user is an instructor.
     """
     def has_permission(self, request, view):
-        return models.Instructor.objects.filter(user=request.user).exists()
+        return get_role(request).is_instructor
 
 
 class IsStudent(BasePermission):
@@ -75,4 +84,4 @@ class IsStudent(BasePermission):
     """
 
     def has_permission(self, request, view):
-        return models.Student.objects.filter(user=request.user).exists()
+        return get_role(request).is_student
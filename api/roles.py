@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api import models
+
+
+class Role:
+    """
+    The resolved role of a user: their instructor and student records, if
+    any, and the names of their groups.
+    """
+    def __init__(self, instructor=None, student=None, groups=()):
+        self.instructor = instructor
+        self.student = student
+        self.groups = frozenset(groups)
+
+    @property
+    def is_instructor(self):
+        return self.instructor is not None
+
+    @property
+    def is_student(self):
+        return self.student is not None
+
+    def in_group(self, name):
+        return name in self.groups
+
+
+def cache_key(user_id):
+    return 'api:role:{}'.format(user_id)
+
+
+def get_role(request):
+    """
+    Returns the role of the user making a request.
+
+    The role is resolved the first time it is asked for during a request and
+    reused by every permission and view after that. When ROLE_CACHE_TTL is
+    set, resolved roles are also kept in the cache shared by every worker
+    process for that many seconds, so most requests do not query for the
+    role at all.
+
+    :param request: Request - the request to get the role of
+    :return: Role - the role of the requesting user
+    """
+    # keep the role on the underlying request so it outlives the DRF request wrapper
+    http_request = getattr(request, '_request', request)
+    role = getattr(http_request, 'role', None)
+    if role is None:
+        role = resolve(request.user)
+        http_request.role = role
+    return role
+
+
+def resolve(user):
+    """
+    Returns the role of a user from the cache, or from the database when it is not cached.
+    """
+    if user is None or not user.is_authenticated:
+        return Role()
+    if settings.ROLE_CACHE_TTL <= 0:
+        return load(user)
+    role = cache.get(cache_key(user.id))
+    if role is None:
+        role = load(user)
+        cache.set(cache_key(user.id), role, settings.ROLE_CACHE_TTL)
+    return role
+
+
+def load(user):
+    """
+    Reads the role of a user from the database.
+    """
+    role = Role()
+    # read the instructor, student, and groups of the user in a single query
+    rows = User.objects.filter(id=user.id).values_list('instructor__id', 'instructor__wwuid',
+                                                       'student__id', 'student__labgroup_id', 'student__wwuid',
+                                                       'groups__name')
+    groups = set()
+    for instructor_id, instructor_wwuid, student_id, labgroup_id, student_wwuid, group in rows:
+        if instructor_id is not None:
+            role.instructor = models.Instructor(id=instructor_id, user_id=user.id, wwuid=instructor_wwuid)
+        if student_id is not None:
+            role.student = models.Student(id=student_id, user_id=user.id, labgroup_id=labgroup_id,
+                                          wwuid=student_wwuid)
+        if group is not None:
+            groups.add(group)
+    role.groups = frozenset(groups)
+    return role
+
+
+def invalidate(*user_ids):
+    """
+    Forgets the cached roles of users.
+    """
+    if settings.ROLE_CACHE_TTL <= 0:
+        return
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate(instance.id)
+
+
+@receiver(post_save, sender=models.Instructor)
+@receiver(post_delete, sender=models.Instructor)
+@receiver(post_save, sender=models.Student)
+@receiver(post_delete, sender=models.Student)
+def invalidate_member(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # users are added to a group either from the user or from the group
+    if not reverse:
+        invalidate(instance.id)
+    elif pk_set is not None:
+        invalidate(*pk_set)
+    elif settings.ROLE_CACHE_TTL > 0:
+        # a group was cleared, and its users are no longer known
+        cache.clear()
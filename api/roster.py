@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, CharField, Value, When
+
+from api import models, permissions, roles
+from api.serializers import RosterRowSerializer
+
+import csv
+import io
+
+
+def read_csv(roster_file):
+    """
+    Reads the rows of an uploaded roster CSV with a username and wwuid column.
+
+    :param roster_file: UploadedFile - the uploaded CSV
+    :return: list - the rows as dictionaries
+    """
+    return list(csv.DictReader(io.TextIOWrapper(roster_file, encoding='utf-8-sig')))
+
+
+def import_roster(labgroup, rows):
+    """
+    Enrolls every student of a roster in a labgroup.
+
+    Every row is validated before anything is written, and the roster is only
+    imported if all of them are valid. Users are looked up with one query,
+    students are created with a single insert, and the new students are added
+    to the student group with one insert into the membership table. Students
+    enrolled in another of the instructor's labgroups, or with another wwuid,
+    are moved with a single update that keeps their assignment entries, and
+    students already enrolled with the same wwuid are left alone. Students
+    enrolled in another instructor's labgroup are reported as row errors.
+
+    :param labgroup: LabGroup - the labgroup to enroll the students in
+    :param rows: list - a dictionary with a username and wwuid for every student
+    :return: tuple - the number of students enrolled and a list of row errors
+    """
+    # validate every row
+    errors = []
+    valid_rows = []
+    for row_num, row in enumerate(rows, 1):
+        serializer = RosterRowSerializer(data=row)
+        if serializer.is_valid():
+            valid_rows.append((row_num, serializer.validated_data))
+        else:
+            errors.append({'row': row_num, 'errors': serializer.errors})
+    # look up every user at once
+    user_ids = dict(User.objects
+                    .filter(username__in={data['username'] for row_num, data in valid_rows})
+                    .values_list('username', 'id'))
+    students = {}
+    row_nums = {}
+    for row_num, data in valid_rows:
+        if data['username'] not in user_ids:
+            errors.append({'row': row_num, 'errors': {'username': ['No user has this username.']}})
+        elif user_ids[data['username']] in students:
+            errors.append({'row': row_num, 'errors': {'username': ['This user is already in the roster.']}})
+        else:
+            students[user_ids[data['username']]] = data['wwuid']
+            row_nums[user_ids[data['username']]] = row_num
+    if errors:
+        return 0, sorted(errors, key=lambda error: error['row'])
+    with transaction.atomic():
+        # leave students who are already enrolled alone and move the rest
+        existing = (models.Student.objects
+                    .filter(user__in=students)
+                    .values_list('id', 'user_id', 'labgroup_id', 'labgroup__instructor_id', 'wwuid'))
+        moved = {}
+        moved_users = []
+        for student_id, user_id, labgroup_id, instructor_id, wwuid in existing:
+            if labgroup_id is not None and instructor_id != labgroup.instructor_id:
+                message = 'This student is enrolled in another instructor\'s labgroup.'
+                errors.append({'row': row_nums[user_id], 'errors': {'username': [message]}})
+            elif labgroup_id != labgroup.id or wwuid != students[user_id]:
+                moved[student_id] = students[user_id]
+                moved_users.append(user_id)
+            del students[user_id]
+        if errors:
+            return 0, sorted(errors, key=lambda error: error['row'])
+        # move students in place so their assignment entries are kept
+        if moved:
+            models.Student.objects.filter(id__in=moved).update(
+                labgroup=labgroup,
+                wwuid=Case(*[When(id=student_id, then=Value(wwuid)) for student_id, wwuid in moved.items()],
+                           output_field=CharField()))
+        models.Student.objects.bulk_create(models.Student(user_id=user_id, labgroup=labgroup, wwuid=wwuid)
+                                           for user_id, wwuid in students.items())
+        # add the new and moved students to the student group
+        enrolled = list(students) + moved_users
+        group = permissions.get_or_create_student_permissions()
+        membership = User.groups.through
+        members = set(membership.objects.filter(group_id=group.id, user_id__in=enrolled)
+                      .values_list('user_id', flat=True))
+        membership.objects.bulk_create(membership(group_id=group.id, user_id=user_id)
+                                       for user_id in enrolled if user_id not in members)
+    # bulk inserts and updates do not send the signals that forget cached roles
+    roles.invalidate(*enrolled)
+    return len(enrolled), []
@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+import threading
+
+
+# whether the request being handled by the current thread reads from the replica
+_local = threading.local()
+
+
+def sticky_key(user_id):
+    return 'api:replica-sticky:{}'.format(user_id)
+
+
+def read_from_replica(request):
+    """
+    Sends the reads of the rest of a request to the replica, unless the
+    request changes data or the user made a change too recently for the
+    replica to have caught up with it.
+
+    :param request: Request - the authenticated request
+    """
+    if settings.REPLICA_DATABASE is None or request.method not in SAFE_METHODS:
+        return
+    if request.user.is_authenticated and cache.get(sticky_key(request.user.id)):
+        return
+    _local.replica = True
+
+
+def read_from_primary():
+    """
+    Sends the reads of the current thread back to the primary.
+    """
+    _local.replica = False
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of views that opt in with ReplicaReadMixin to the replica
+    and everything else, writes included, to the primary.
+    """
+    def db_for_read(self, model, **hints):
+        if getattr(_local, 'replica', False):
+            return settings.REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # rows read from the replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its tables from the primary
+        if db == settings.REPLICA_DATABASE:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Reads the data of GET requests from the read replica once the user is
+    authenticated and allowed in. Authentication and permission checks read
+    from the primary, and users who just made a change keep reading from the
+    primary for REPLICA_STICKY_SECONDS so they never see stale data.
+    """
+    def initial(self, request, *args, **kwargs):
+        super(ReplicaReadMixin, self).initial(request, *args, **kwargs)
+        read_from_replica(request)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
+            # a streamed response reads its rows after the view returns
+            if response.streaming and getattr(_local, 'replica', False):
+                response.streaming_content = replica_reads(response.streaming_content)
+            return response
+        finally:
+            read_from_primary()
+
+
+def replica_reads(content):
+    """
+    Yields the chunks of streamed content while sending the reads made to
+    produce each one to the replica. The current thread goes back to the
+    primary between chunks, since the server may stream the response from
+    any thread while it handles other requests.
+
+    :param content: iterable - the chunks of the streamed content
+    """
+    content = iter(content)
+    while True:
+        _local.replica = True
+        try:
+            chunk = next(content)
+        except StopIteration:
+            return
+        finally:
+            read_from_primary()
+        yield chunk
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Keeps a user reading from the primary for REPLICA_STICKY_SECONDS after
+    every successful request that changed data. The mark is kept in the cache
+    every worker shares, so the user's next read stays on the primary
+    whichever worker answers it.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.REPLICA_DATABASE is not None and request.method not in SAFE_METHODS \
+                and response.status_code < 400:
+            # the REST framework sets the user it authenticated on the request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                cache.set(sticky_key(user.id), True, settings.REPLICA_STICKY_SECONDS)
+        return response
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from datetime import datetime, timedelta
+from pytz import timezone
+import random
+
+from api import models
+from api.permissions import get_group
+from api.views import get_current_term
+
+
+class Term:
+    """
+    The ids of the rows seeded for a term of labs, used to pick realistic
+    parameters when exercising the API.
+    """
+    def __init__(self, term):
+        self.term = term
+        self.instructors = []
+        self.labgroups = []
+        self.assignments = []
+        self.students = []
+        self.entries = []
+        self.task_templates = {}
+
+
+def past_terms(count):
+    """
+    Returns the current term followed by the names of the terms before it.
+    """
+    year = datetime.now().year
+    terms = [get_current_term()]
+    while len(terms) < count:
+        year -= 1
+        terms.extend('{}{}'.format(season, year) for season in ('FALL', 'SUMMER', 'SPRING', 'WINTER'))
+    return terms[:count]
+
+
+def seed_term(terms=4, labgroups=15, students=24, assignments=10, tasks=10, instructors=8, seed=0):
+    """
+    Fills the database with a realistic spread of labs: several terms of
+    labgroups taught by a handful of instructors, every student starting
+    every assignment of their labgroup and answering every task.
+
+    Rows are created with bulk inserts, so a full term takes seconds.
+    Users are put in the instructor and student groups and given unusable
+    passwords so no password is hashed.
+
+    :param terms: integer - the number of terms, the current one included
+    :param labgroups: integer - the labgroups of each term
+    :param students: integer - the students of each labgroup
+    :param assignments: integer - the assignment templates assigned to each labgroup
+    :param tasks: integer - the tasks of each assignment template
+    :param instructors: integer - the instructors teaching the labgroups
+    :param seed: integer - the seed of the random choices
+    :return: Term - the ids seeded for the current term
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone(settings.TIME_ZONE))
+    term_names = past_terms(terms)
+    current = Term(term_names[0])
+    with transaction.atomic():
+        # instructors and the course they teach
+        User.objects.bulk_create(User(username='seed{}-instructor-{}'.format(seed, i), password='!')
+                                 for i in range(0, instructors))
+        instructor_users = User.objects.filter(username__startswith='seed{}-instructor-'.format(seed)) \
+            .values_list('id', flat=True)
+        models.Instructor.objects.bulk_create(models.Instructor(user_id=user_id, wwuid='{:07d}'.format(user_id))
+                                              for user_id in instructor_users)
+        instructor_ids = list(models.Instructor.objects.filter(user__in=instructor_users)
+                              .values_list('id', flat=True))
+        User.groups.through.objects.bulk_create(User.groups.through(user_id=user_id,
+                                                                    group_id=get_group('Instructor').id)
+                                                for user_id in instructor_users)
+        course = models.Course.objects.create(name='CHEM 141 seed {}'.format(seed))
+        # assignment templates with their tasks
+        models.AssignmentTemplate.objects.bulk_create(models.AssignmentTemplate(course=course,
+                                                                                name='Lab {}'.format(a))
+                                                      for a in range(0, assignments))
+        template_ids = list(models.AssignmentTemplate.objects.filter(course=course).values_list('id', flat=True))
+        models.TaskTemplate.objects.bulk_create(models.TaskTemplate(assignment_template_id=template_id,
+                                                                    problem_num=problem_num,
+                                                                    prompt='problem {}'.format(problem_num),
+                                                                    numeric_only=False)
+                                                for template_id in template_ids
+                                                for problem_num in range(1, tasks + 1))
+        task_templates = {}
+        for template_id, task_template_id in models.TaskTemplate.objects \
+                .filter(assignment_template__in=template_ids).values_list('assignment_template_id', 'id'):
+            task_templates.setdefault(template_id, []).append(task_template_id)
+        # labgroups of every term, with the current term's assignments spread around now
+        models.LabGroup.objects.bulk_create(models.LabGroup(course=course,
+                                                            instructor_id=rng.choice(instructor_ids),
+                                                            group_name='Group {}'.format(g),
+                                                            term=term,
+                                                            enroll_key='key{}'.format(g))
+                                            for term in term_names for g in range(0, labgroups))
+        labgroup_terms = dict(models.LabGroup.objects.filter(course=course).values_list('id', 'term'))
+        new_assignments = []
+        for labgroup_id, term in labgroup_terms.items():
+            start = now - timedelta(days=120 * term_names.index(term) + 7 * (assignments // 2))
+            for week, template_id in enumerate(template_ids):
+                open_date = start + timedelta(days=7 * week)
+                new_assignments.append(models.Assignment(assignment_template_id=template_id,
+                                                         labgroup_id=labgroup_id,
+                                                         open_date=open_date,
+                                                         close_date=open_date + timedelta(days=7)))
+        models.Assignment.objects.bulk_create(new_assignments)
+        labgroup_assignments = {}
+        for labgroup_id, assignment_id, template_id in models.Assignment.objects \
+                .filter(labgroup__in=labgroup_terms).values_list('labgroup_id', 'id', 'assignment_template_id'):
+            labgroup_assignments.setdefault(labgroup_id, []).append((assignment_id, template_id))
+        # students who started every assignment and answered every task
+        User.objects.bulk_create(User(username='seed{}-student-{}-{}'.format(seed, labgroup_id, s), password='!')
+                                 for labgroup_id in labgroup_terms for s in range(0, students))
+        student_users = User.objects.filter(username__startswith='seed{}-student-'.format(seed)) \
+            .values_list('id', 'username')
+        models.Student.objects.bulk_create(models.Student(user_id=user_id,
+                                                          labgroup_id=int(username.split('-')[2]),
+                                                          wwuid='{:07d}'.format(user_id))
+                                           for user_id, username in student_users)
+        User.groups.through.objects.bulk_create(User.groups.through(user_id=user_id, group_id=get_group('Student').id)
+                                                for user_id, username in student_users)
+        student_labgroups = list(models.Student.objects.filter(labgroup__in=labgroup_terms)
+                                 .values_list('id', 'labgroup_id'))
+        models.AssignmentEntry.objects.bulk_create(models.AssignmentEntry(student_id=student_id,
+                                                                          assignment_id=assignment_id)
+                                                   for student_id, labgroup_id in student_labgroups
+                                                   for assignment_id, template_id
+                                                   in labgroup_assignments[labgroup_id])
+        entries = list(models.AssignmentEntry.objects.filter(assignment__labgroup__in=labgroup_terms)
+                       .values_list('id', 'assignment__assignment_template_id'))
+        for start in range(0, len(entries), 1000):
+            models.TaskEntry.objects.bulk_create(models.TaskEntry(assignment_entry_id=entry_id,
+                                                                  task_template_id=task_template_id,
+                                                                  attempts=1,
+                                                                  raw_input=str(rng.random()))
+                                                 for entry_id, template_id in entries[start:start + 1000]
+                                                 for task_template_id in task_templates[template_id])
+    # remember the current term's rows
+    current.instructors = instructor_ids
+    current.labgroups = [labgroup_id for labgroup_id, term in labgroup_terms.items() if term == current.term]
+    current.assignments = [assignment_id for labgroup_id in current.labgroups
+                           for assignment_id, template_id in labgroup_assignments[labgroup_id]]
+    current.students = list(models.Student.objects.filter(labgroup__in=current.labgroups)
+                            .values_list('id', 'user_id', 'wwuid', 'labgroup_id'))
+    current.entries = list(models.AssignmentEntry.objects.filter(assignment__in=current.assignments)
+                           .values_list('id', 'student_id', 'assignment_id', 'assignment__assignment_template_id'))
+    current.task_templates = task_templates
+    return current
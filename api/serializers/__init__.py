@@ -6,7 +6,9 @@ from .serializer_assignment import *
 from .serializer_assignment_entry import *
 from .serializer_assignment_template import *
 from .serializer_course import *
+from .serializer_export_job import *
 from .serializer_intructor import *
 from .serializer_labgroup import *
+from .serializer_roster import *
 from .serializer_task_entry import *
 from .serializer_task_template import *
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import Assignment
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for assignment.
     """
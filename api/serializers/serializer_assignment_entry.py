@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import AssignmentEntry
 
 
-class AssignmentEntrySerializer(serializers.ModelSerializer):
+class AssignmentEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for assignment entry.
     """
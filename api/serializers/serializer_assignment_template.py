@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import AssignmentTemplate
 
 
-class AssignmentTemplateSerializer(serializers.ModelSerializer):
+class AssignmentTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for assignment templates.
     """
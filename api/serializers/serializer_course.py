@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import Course
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for courses.
     """
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.serializers import StudentSerializer
 from register.serializers import UserSerializer
 
 
-class EnrollStatusSerializer(serializers.Serializer):
+class EnrollStatusSerializer(TimedSerializerMixin, serializers.Serializer):
     """
     The serializer for enroll status.
     """
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from api.metrics import TimedSerializerMixin
+from api.models import ExportJob
+
+
+class ExportJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The serializer for export jobs.
+    """
+    class Meta:
+        model = ExportJob
+        fields = (
+            'pk',
+            'assignment',
+            'status',
+            'data_version',
+            'created',
+            'finished',
+        )
+        read_only_fields = fields
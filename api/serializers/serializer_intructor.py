@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import Instructor
 
 
-class InstructorSerializer(serializers.ModelSerializer):
+class InstructorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for instructors.
     """
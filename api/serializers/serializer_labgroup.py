@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import LabGroup, Instructor
 
 
-class LabGroupBaseSerializer(serializers.ModelSerializer):
+class LabGroupBaseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The base serializer for labgroups.
     """
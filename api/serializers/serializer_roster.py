@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from api.models import Student
+
+
+class RosterRowSerializer(serializers.Serializer):
+    """
+    The serializer for one student of a roster import.
+    """
+    username = serializers.CharField(max_length=150)
+    wwuid = serializers.CharField(max_length=Student._meta.get_field('wwuid').max_length)
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
 from api.models import Student
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for students.
     """
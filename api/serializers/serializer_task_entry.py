@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from api.metrics import TimedSerializerMixin
 from api.models import TaskEntry
 
 
-class TaskEntrySerializer(serializers.ModelSerializer):
+class TaskEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Task Entries
     """
@@ -15,3 +16,12 @@ class TaskEntrySerializer(serializers.ModelSerializer):
             'attempts',
             'raw_input',
         )
+        read_only_fields = ('attempts',)
+
+
+class TaskEntryBatchSerializer(serializers.Serializer):
+    """
+    Serializer for one answer of a batch save.
+    """
+    task_template = serializers.IntegerField()
+    raw_input = serializers.CharField(allow_blank=True, trim_whitespace=False)
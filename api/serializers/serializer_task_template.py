@@ -1,10 +1,12 @@
 from rest_framework import serializers, status
 
 
+from api.metrics import TimedSerializerMixin
 from api.models import AssignmentTemplate, TaskTemplate
+from equations.registry import registry
 
 
-class TaskTemplateSerializer(serializers.ModelSerializer):
+class TaskTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The serializer for Template Tasks.
     """
@@ -15,6 +17,14 @@ class TaskTemplateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'detail': 'Not found.'}, code=status.HTTP_404_NOT_FOUND)
         return value
 
+    def validate_variable(self, value):
+        # only measurements and answers, a student's answer must never replace a value the equations derive
+        if value is not None and value not in registry.inputs:
+            if value in registry.nodes:
+                raise serializers.ValidationError('derived variable')
+            raise serializers.ValidationError('unknown variable')
+        return value
+
     class Meta:
         model = TaskTemplate
         fields = (
@@ -28,5 +38,6 @@ class TaskTemplateSerializer(serializers.ModelSerializer):
             'attempts_allowed',
             'numeric_accuracy',
             'numeric_only',
+            'variable',
         )
         read_only_fields = ('assignment_template',)
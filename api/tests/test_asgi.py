@@ -0,0 +1,145 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+import asyncio
+import threading
+import time
+
+from chem_lab_server.asgi_handler import ASGIHandler
+
+
+def request(application, method, path, body=b'', query_string=b'', headers=()):
+    """
+    Sends an http request to an ASGI application and returns the messages it sent back.
+    """
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'root_path': '',
+        'headers': list(headers),
+        'client': ('127.0.0.1', 1234),
+        'server': ('testserver', 80),
+    }
+    # the body arrives in two parts
+    received = [{'type': 'http.request', 'body': body[:2], 'more_body': True},
+                {'type': 'http.request', 'body': body[2:], 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+    return application(scope, receive, send), sent
+
+
+class ASGIHandlerTest(SimpleTestCase):
+    """
+    Test cases for serving the WSGI application over ASGI.
+    """
+
+    def run_requests(self, *coroutines):
+        async def run():
+            await asyncio.gather(*coroutines)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_request(self):
+        """
+        Tests that the request is translated to a WSGI environ and the streamed response is sent back in chunks.
+        """
+        environs = []
+
+        def echo(environ, start_response):
+            environs.append(dict(environ, body=environ['wsgi.input'].read()))
+            start_response('201 Created', [('Content-Type', 'text/plain')])
+            return [b'one', b'', b'two']
+        application = ASGIHandler(echo, threads=1, student_threads=0)
+        call, sent = request(application, 'POST', '/enroll', body=b'{"a": 1}', query_string=b'x=1',
+                             headers=[(b'content-type', b'application/json'), (b'x-forwarded-for', b'a'),
+                                      (b'x-forwarded-for', b'b'), (b'cookie', b'sessionid=1'),
+                                      (b'cookie', b'csrftoken=2')])
+        self.run_requests(call)
+        application.shutdown()
+        # test environ
+        environ = environs[0]
+        self.assertEqual(environ['REQUEST_METHOD'], 'POST')
+        self.assertEqual(environ['PATH_INFO'], '/enroll')
+        self.assertEqual(environ['QUERY_STRING'], 'x=1')
+        self.assertEqual(environ['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(environ['HTTP_X_FORWARDED_FOR'], 'a,b')
+        self.assertEqual(environ['HTTP_COOKIE'], 'sessionid=1; csrftoken=2')
+        self.assertEqual(environ['body'], b'{"a": 1}')
+        # test response
+        self.assertEqual(sent[0], {'type': 'http.response.start', 'status': 201,
+                                   'headers': [(b'content-type', b'text/plain')]})
+        self.assertEqual([message['body'] for message in sent[1:]], [b'one', b'two', b''])
+        self.assertFalse(sent[-1]['more_body'])
+
+    def test_student_request(self):
+        """
+        Tests that the methods views list in student_pool_methods are student requests.
+        """
+        application = ASGIHandler(None, threads=1, student_threads=0)
+        self.assertTrue(application.is_student_request({'method': 'GET', 'path': reverse('api:enroll')}))
+        self.assertFalse(application.is_student_request({'method': 'POST', 'path': reverse('api:enroll')}))
+        self.assertTrue(application.is_student_request({
+            'method': 'POST', 'path': reverse('api:task-entry-batch', kwargs={'assignment': 1})}))
+        self.assertFalse(application.is_student_request({
+            'method': 'GET', 'path': reverse('api:assignment-csv', kwargs={'pk': 1})}))
+        self.assertFalse(application.is_student_request({'method': 'GET', 'path': '/missing'}))
+        application.shutdown()
+
+    def test_student_threads(self):
+        """
+        Tests that other requests leave the student threads free.
+        """
+        lock = threading.Lock()
+        running = {'other': 0, 'most_other': 0}
+        order = []
+
+        def slow(environ, start_response):
+            student = environ['PATH_INFO'] == reverse('api:enroll')
+            with lock:
+                if not student:
+                    running['other'] += 1
+                    running['most_other'] = max(running['most_other'], running['other'])
+            time.sleep(0.05 if not student else 0)
+            with lock:
+                order.append('student' if student else 'other')
+                if not student:
+                    running['other'] -= 1
+            start_response('200 OK', [])
+            return [b'']
+        application = ASGIHandler(slow, threads=2, student_threads=1)
+        others = [request(application, 'GET', reverse('api:assignment-csv', kwargs={'pk': 1}))[0]
+                  for _ in range(0, 3)]
+        student = request(application, 'GET', reverse('api:enroll'))[0]
+        self.run_requests(*others, student)
+        application.shutdown()
+        # test threads
+        self.assertEqual(running['most_other'], 1)
+        self.assertEqual(order[0], 'student')
+
+    def test_lifespan(self):
+        """
+        Tests that the handler starts up and shuts down with the server.
+        """
+        application = ASGIHandler(None, threads=1, student_threads=0)
+        received = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            sent.append(message)
+        self.run_requests(application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, [{'type': 'lifespan.startup.complete'}, {'type': 'lifespan.shutdown.complete'}])
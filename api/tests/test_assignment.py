@@ -150,6 +150,33 @@ class AssignmentLCTest(APITestCase):
         self.assertEqual(datetime.strptime(response_body['assignments'][1]['close_date'], '%Y-%m-%dT%H:%M:%S.%fZ'),
                          assignments[1].close_date.replace(tzinfo=None))
 
+    def test_assignment_list_not_modified(self):
+        """
+        Tests that assignments are not sent again when the client has the current version.
+        """
+        current_time = datetime.now(timezone(settings.TIME_ZONE))
+        assignment = Assignment(assignment_template=self.template,
+                                labgroup=self.group,
+                                open_date=current_time,
+                                close_date=current_time + timedelta(days=1))
+        assignment.save()
+        # request
+        etag = self.client.get(reverse(self.view_name))['ETag']
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        # rename the template
+        self.template.name = 'new name'
+        self.template.save()
+        # request
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response_body['assignments'][0]['name'], 'new name')
+
     def test_assignment_list_instructor_does_not_own(self):
         """
         Tests that assignments are properly listed.
@@ -223,6 +250,31 @@ class AssignmentLCTest(APITestCase):
         self.assertEqual(datetime.strptime(response_body['assignments'][1]['close_date'], '%Y-%m-%dT%H:%M:%S.%fZ'),
                          assignments[1].close_date.replace(tzinfo=None))
 
+    def test_assignment_list_queries(self):
+        """
+        Tests that the number of queries does not grow with the number of assignments.
+        """
+        # login the student
+        self.client.logout()
+        self.client.login(username=self.student_username, password=self.password)
+        # add assignments of different templates to database
+        current_time = datetime.now(timezone(settings.TIME_ZONE))
+        for i in range(0, 5):
+            template = AssignmentTemplate(course=self.course, name='template {}'.format(i))
+            template.save()
+            Assignment(assignment_template=template,
+                       labgroup=self.group,
+                       open_date=current_time,
+                       close_date=current_time + timedelta(days=1)).save()
+        # request
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse(self.view_name))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response_body['assignments']), 5)
+        self.assertEqual(response_body['assignments'][4]['name'], 'template 4')
+
     def test_assignment_list_student_different_labgroup(self):
         """
         Tests that assignments are not listed if they are for a different labgroup.
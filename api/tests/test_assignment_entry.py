@@ -1,11 +1,13 @@
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
 from datetime import datetime, timedelta
 import json
+from unittest import mock
 from pytz import timezone
 
 from api.models import Course, Instructor, LabGroup, Assignment, AssignmentTemplate, AssignmentEntry, Student
@@ -147,6 +149,42 @@ class AssignmentEntryStartTest(APITestCase):
         # test response
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
 
+    def test_assignment_start_query_count(self):
+        """
+        Tests that starting an assignment reads the assignment and inserts the entry without checking for it first.
+        """
+        # request, the session, user, and role are loaded, then the assignment is read and the entry inserted in a savepoint
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # a second start fails on the unique constraint, rolls back its savepoint, and finds the entry it conflicts with
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(AssignmentEntry.objects.count(), 1)
+
+    def test_assignment_start_other_integrity_error(self):
+        """
+        Tests that starting an assignment only answers a conflict when the student already started it.
+        """
+        # a violation other than the unique constraint, such as a student deleted by another request
+        with mock.patch.object(AssignmentEntry, 'save', side_effect=IntegrityError):
+            # request
+            with self.assertRaises(IntegrityError):
+                self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        # test database
+        self.assertEqual(AssignmentEntry.objects.count(), 0)
+
+    def test_assignment_entry_unique(self):
+        """
+        Tests that a student can not have two entries for the same assignment.
+        """
+        AssignmentEntry(student=self.student, assignment=self.assignment).save()
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                AssignmentEntry(student=self.student, assignment=self.assignment).save()
+
     def test_assignment_does_not_exist(self):
         """
         Tests that nothing happens when the assignment does not exist.
@@ -267,6 +305,33 @@ class AssignmentEntryEntrySubmitTest(APITestCase):
         self.assertTrue('start_date' in response_body.keys())
         self.assertTrue('submit_date' in response_body.keys())
 
+    def test_assignment_entry_submit_query_count(self):
+        """
+        Tests that an assignment is submitted with one conditional update.
+        """
+        # request, the session, user, and role are loaded, then the entry is updated and read back
+        with self.assertNumQueries(5):
+            response = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # test database
+        assignment_entry = AssignmentEntry.objects.get(id=self.assignment_entry.id)
+        self.assertEqual(assignment_entry.modified, assignment_entry.submit_date)
+
+    def test_assignment_entry_submit_twice(self):
+        """
+        Tests that only the first of two submits changes the submit date.
+        """
+        first = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        second = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        # test database
+        self.assertEqual(json.loads(first.content.decode('utf-8'))['submit_date'],
+                         AssignmentEntry.objects.get(id=self.assignment_entry.id).submit_date
+                         .strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+
     def test_assignment_entry_does_not_exist(self):
         """
         Tests that nothing happens when the assignment does not exist.
@@ -79,6 +79,26 @@ class AssignmentTemplateLCTest(APITestCase):
         self.assertEqual(response_body['templates'][1]['course'], assignments[1].course.id)
         self.assertEqual(response_body['templates'][1]['name'], assignments[1].name)
 
+    def test_assignment_template_list_not_modified(self):
+        """
+        Tests that assignment templates are not sent again when the client has the current version.
+        """
+        template = AssignmentTemplate(name='test name 1', course=self.course)
+        template.save()
+        # request
+        etag = self.client.get(reverse(self.view_name))['ETag']
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # delete the template
+        template.delete()
+        # request
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_body['templates'], [])
+
     def test_assignment_template_list_student(self):
         """
         Tests that assignment templates are properly listed for students.
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from datetime import datetime, timedelta
+import io
+from pytz import timezone
+
+from api import models
+from api.closing import close_assignments
+from api.views import get_current_term
+
+
+class CloseAssignmentsTest(TestCase):
+    """
+    Test cases for submitting the entries of closed assignments.
+    """
+
+    def setUp(self):
+        self.now = datetime.now(timezone(settings.TIME_ZONE))
+        # populate the database
+        instructor_user = User.objects.create_user(username='instructor', password='test')
+        self.instructor = models.Instructor(user=instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroup = models.LabGroup(course=self.course,
+                                        instructor=self.instructor,
+                                        group_name='A',
+                                        term=get_current_term(),
+                                        enroll_key='ABC')
+        self.labgroup.save()
+        self.assignment_template = models.AssignmentTemplate(course=self.course, name='test template')
+        self.assignment_template.save()
+        self.students = []
+        for s in range(0, 3):
+            user = User.objects.create_user(username=str(s), password='test')
+            self.students.append(models.Student(labgroup=self.labgroup, user=user, wwuid=str(s) * 7))
+            self.students[-1].save()
+        # an assignment that closed a day ago and one still open
+        self.closed = self.add_assignment(self.now - timedelta(days=1))
+        self.open = self.add_assignment(self.now + timedelta(days=1))
+
+    def add_assignment(self, close_date):
+        assignment = models.Assignment(assignment_template=self.assignment_template,
+                                       labgroup=self.labgroup,
+                                       open_date=close_date - timedelta(days=2),
+                                       close_date=close_date)
+        assignment.save()
+        for student in self.students:
+            models.AssignmentEntry(student=student, assignment=assignment).save()
+        return assignment
+
+    def test_close_assignments(self):
+        """
+        Tests that unsubmitted entries of closed assignments are stamped with the close date.
+        """
+        submitted = self.now - timedelta(days=1, hours=1)
+        models.AssignmentEntry.objects.filter(student=self.students[0]).update(submit_date=submitted)
+        # sweep
+        with self.assertNumQueries(1):
+            self.assertEqual(close_assignments(), 2)
+        # test database
+        entries = models.AssignmentEntry.objects.filter(assignment=self.closed).order_by('student_id')
+        self.assertEqual([entry.submit_date for entry in entries], [submitted, self.closed.close_date,
+                                                                    self.closed.close_date])
+        self.assertEqual(models.AssignmentEntry.objects.filter(assignment=self.open, submit_date__isnull=True)
+                         .exclude(student=self.students[0]).count(), 2)
+        # nothing is left to close
+        self.assertEqual(close_assignments(), 0)
+
+    def test_close_assignments_since(self):
+        """
+        Tests that a sweep only closes assignments that closed after the previous one.
+        """
+        # the closed assignment was last changed before it closed
+        models.Assignment.objects.filter(id=self.closed.id).update(modified=self.now - timedelta(days=2))
+        self.assertEqual(close_assignments(until=self.now, since=self.now - timedelta(hours=1)), 0)
+        self.assertEqual(close_assignments(until=self.now, since=self.now - timedelta(days=2)), 3)
+
+    def test_close_assignments_closed_early(self):
+        """
+        Tests that a sweep closes an assignment whose close date was moved before the previous sweep.
+        """
+        models.Assignment.objects.filter(id=self.closed.id).update(modified=self.now - timedelta(days=2))
+        # the instructor closes the open assignment as of two hours ago
+        self.open.close_date = self.now - timedelta(hours=2)
+        self.open.save()
+        # sweep
+        self.assertEqual(close_assignments(until=datetime.now(timezone(settings.TIME_ZONE)),
+                                           since=self.now - timedelta(hours=1)), 3)
+        # test database
+        self.assertFalse(models.AssignmentEntry.objects.filter(assignment=self.open,
+                                                               submit_date__isnull=True).exists())
+        self.assertEqual(models.AssignmentEntry.objects.filter(assignment=self.closed,
+                                                               submit_date__isnull=True).count(), 3)
+
+    def test_close_assignments_command(self):
+        """
+        Tests that the command sweeps once when no interval is given.
+        """
+        out = io.StringIO()
+        call_command('close_assignments', stdout=out)
+        # test output
+        self.assertEqual(out.getvalue().strip(), 'Submitted 3 entries of closed assignments.')
+        # test database
+        self.assertFalse(models.AssignmentEntry.objects.filter(assignment=self.closed,
+                                                               submit_date__isnull=True).exists())
@@ -5,7 +5,9 @@ from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
 from datetime import datetime, timedelta
+import io
 from pytz import timezone
+import zipfile
 
 from api import models
 from api.views import get_current_term
@@ -68,6 +70,7 @@ class GenerateCSVTest(APITestCase):
                                  attempts=1,
                                  raw_input='{}-{}'.format(student.wwuid, str(tt.problem_num))).save()
 
+        self.students = students
         # retrieve the view
         self.view_name = 'api:assignment-csv'
 
@@ -85,6 +88,139 @@ class GenerateCSVTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.content.decode('utf-8'), csv)
 
+    def test_generate_csv_query_count(self):
+        """
+        Tests that the number of queries does not depend on the number of students or tasks.
+        """
+        with self.assertNumQueries(7):
+            self.client.get(reverse(self.view_name, args=[self.assignment.id]))
+        # add more tasks to the assignment
+        for task in range(4, 11):
+            self.task_templates.append(models.TaskTemplate(assignment_template=self.assignment_template,
+                                                           problem_num=task,
+                                                           summary='test summary',
+                                                           prompt='test prompt',
+                                                           numeric_only=False))
+            self.task_templates[-1].save()
+        # add more students who have answered every task
+        for s in range(3, 20):
+            user = User.objects.create_user(username='student{}'.format(s), password=self.password)
+            student = models.Student(labgroup=self.labgroup, user=user, wwuid=str(1000000 + s))
+            student.save()
+            assignment_entry = models.AssignmentEntry(student=student, assignment=self.assignment)
+            assignment_entry.save()
+            for tt in self.task_templates:
+                models.TaskEntry(assignment_entry=assignment_entry,
+                                 task_template=tt,
+                                 attempts=1,
+                                 raw_input='{}-{}'.format(student.wwuid, str(tt.problem_num))).save()
+        # request
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        rows = response.content.decode('utf-8').split('\r\n')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(rows), 22)
+
+    def test_generate_csv_entry_without_tasks(self):
+        """
+        Tests that students who started the assignment but answered nothing still get a row.
+        """
+        user = User.objects.create_user(username='student3', password=self.password)
+        student = models.Student(labgroup=self.labgroup, user=user, wwuid='4444444')
+        student.save()
+        models.AssignmentEntry(student=student, assignment=self.assignment).save()
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        csv = 'student,1,2,3\r\n' \
+              '1111111,1111111-1,1111111-2,1111111-3\r\n' \
+              '2222222,2222222-1,2222222-2,2222222-3\r\n' \
+              '3333333,3333333-1,3333333-2,3333333-3\r\n' \
+              '4444444,,,\r\n'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.decode('utf-8'), csv)
+
+    def test_generate_csv_not_modified(self):
+        """
+        Tests that a CSV is not generated again when the client has the current version.
+        """
+        etag = self.client.get(reverse(self.view_name, args=[self.assignment.id]))['ETag']
+        # request
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        # the streamed CSV is a different representation
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), {'stream': 'true'},
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # delete a task entry
+        models.TaskEntry.objects.filter(task_template=self.task_templates[0],
+                                        assignment_entry__student=self.students[0]).delete()
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_generate_csv_not_modified_columns(self):
+        """
+        Tests that a CSV is generated again when its columns or the wwuid of a student change.
+        """
+        etag = self.client.get(reverse(self.view_name, args=[self.assignment.id]))['ETag']
+        # add a task nobody answered
+        models.TaskTemplate(assignment_template=self.assignment_template,
+                            problem_num=4,
+                            prompt='test prompt',
+                            numeric_only=False).save()
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+        # change the wwuid of a student
+        models.Student.objects.filter(id=self.students[0].id).update(wwuid='9999999')
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('9999999,1111111-1', response.content.decode('utf-8'))
+
+    def test_generate_csv_stream(self):
+        """
+        Tests that a streamed CSV matches the regular CSV.
+        """
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), {'stream': 'true'})
+        # test response
+        csv = 'student,1,2,3\r\n' \
+              '1111111,1111111-1,1111111-2,1111111-3\r\n' \
+              '2222222,2222222-1,2222222-2,2222222-3\r\n' \
+              '3333333,3333333-1,3333333-2,3333333-3\r\n'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content).decode('utf-8'), csv)
+        self.assertTrue(response['Content-Disposition'].startswith('attachment;'))
+
+    def test_generate_csv_stream_missing_tasks(self):
+        """
+        Tests that a streamed CSV has a column for every task even if the first student skipped some.
+        """
+        models.TaskEntry.objects.filter(task_template=self.task_templates[1],
+                                        assignment_entry__student=self.students[0]).delete()
+        # request
+        response = self.client.get(reverse(self.view_name, args=[self.assignment.id]), {'stream': 'true'})
+        # test response
+        csv = 'student,1,2,3\r\n' \
+              '1111111,1111111-1,,1111111-3\r\n' \
+              '2222222,2222222-1,2222222-2,2222222-3\r\n' \
+              '3333333,3333333-1,3333333-2,3333333-3\r\n'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content).decode('utf-8'), csv)
+
     def test_instructor_not_owner(self):
         """
         Tests that a CSV is not generated if an instructor does not own the assignment.
@@ -100,3 +236,141 @@ class GenerateCSVTest(APITestCase):
         response = self.client.get(reverse(self.view_name, args=[self.assignment.id]))
         # test repsonse
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class GenerateGradebookTest(APITestCase):
+    """
+    Test cases for GET requests on LabGroupCSVView and GradebookZipView.
+    """
+
+    def setUp(self):
+        # create test users
+        self.instructor_username = 'instructor'
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username=self.instructor_username, password=self.password)
+        self.client.login(username=self.instructor_user, password=self.password)
+        # populate the database
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroups = []
+        for group_name in ('A', 'B'):
+            self.labgroups.append(models.LabGroup(course=self.course,
+                                                  instructor=self.instructor,
+                                                  group_name=group_name,
+                                                  term=get_current_term(),
+                                                  enroll_key='ABC'))
+            self.labgroups[-1].save()
+        self.students = []
+        for s in range(0, 4):
+            user = User.objects.create_user(username='student{}'.format(s), password=self.password)
+            self.students.append(models.Student(labgroup=self.labgroups[s % 2], user=user, wwuid=str(s + 1) * 7))
+            self.students[-1].save()
+        # create two assignments with two tasks each for every labgroup
+        self.assignments = []
+        for a, name in enumerate(('first', 'second')):
+            assignment_template = models.AssignmentTemplate(course=self.course, name=name)
+            assignment_template.save()
+            task_templates = []
+            for task in range(1, 3):
+                task_templates.append(models.TaskTemplate(assignment_template=assignment_template,
+                                                          problem_num=task,
+                                                          summary='test summary',
+                                                          prompt='test prompt',
+                                                          numeric_only=False))
+                task_templates[-1].save()
+            for labgroup in self.labgroups:
+                assignment = models.Assignment(assignment_template=assignment_template,
+                                               labgroup=labgroup,
+                                               open_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=a),
+                                               close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=a + 1))
+                assignment.save()
+                self.assignments.append(assignment)
+                for student in self.students:
+                    if student.labgroup != labgroup:
+                        continue
+                    assignment_entry = models.AssignmentEntry(student=student, assignment=assignment)
+                    assignment_entry.save()
+                    for tt in task_templates:
+                        models.TaskEntry(assignment_entry=assignment_entry,
+                                         task_template=tt,
+                                         attempts=1,
+                                         raw_input='{}-{}-{}'.format(student.wwuid, name, tt.problem_num)).save()
+
+    def test_generate_labgroup_csv(self):
+        """
+        Tests that a labgroup CSV has a column for every task of every assignment.
+        """
+        # request
+        response = self.client.get(reverse('api:lab-group-csv', args=[self.labgroups[0].id]))
+        # test response
+        csv = 'student,first 1,first 2,second 1,second 2\r\n' \
+              '1111111,1111111-first-1,1111111-first-2,1111111-second-1,1111111-second-2\r\n' \
+              '3333333,3333333-first-1,3333333-first-2,3333333-second-1,3333333-second-2\r\n'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.decode('utf-8'), csv)
+
+    def test_generate_labgroup_csv_query_count(self):
+        """
+        Tests that the number of queries does not depend on the number of assignments or students.
+        """
+        with self.assertNumQueries(7):
+            self.client.get(reverse('api:lab-group-csv', args=[self.labgroups[0].id]))
+        # move every student into the first labgroup and give them an extra assignment
+        models.Student.objects.update(labgroup=self.labgroups[0])
+        assignment = models.Assignment(assignment_template=self.assignments[0].assignment_template,
+                                       labgroup=self.labgroups[0],
+                                       open_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=3),
+                                       close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=4))
+        assignment.save()
+        for student in self.students:
+            models.AssignmentEntry(student=student, assignment=assignment).save()
+        # request
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('api:lab-group-csv', args=[self.labgroups[0].id]))
+        # test response
+        rows = response.content.decode('utf-8').split('\r\n')
+        self.assertEqual(rows[0], 'student,first 1,first 2,second 1,second 2,first #{0} 1,first #{0} 2'
+                         .format(assignment.id))
+        self.assertEqual(len(rows), 6)
+
+    def test_labgroup_csv_instructor_not_owner(self):
+        """
+        Tests that a labgroup CSV is not generated if an instructor does not own the labgroup.
+        """
+        # create new instructor
+        new_instructor_user = User.objects.create_user(username='new_instructor', password=self.password)
+        models.Instructor(user=new_instructor_user, wwuid='8888888').save()
+        self.client.logout()
+        self.client.login(username=new_instructor_user.username, password=self.password)
+        # request
+        response = self.client.get(reverse('api:lab-group-csv', args=[self.labgroups[0].id]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_generate_gradebook_zip(self):
+        """
+        Tests that a term zip has a CSV for every labgroup the instructor owns.
+        """
+        # request
+        response = self.client.get(reverse('api:gradebook-zip', args=[get_current_term()]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        self.assertEqual(archive.namelist(), ['test course-A-{}.csv'.format(get_current_term()),
+                                              'test course-B-{}.csv'.format(get_current_term())])
+        csv = 'student,first 1,first 2,second 1,second 2\r\n' \
+              '2222222,2222222-first-1,2222222-first-2,2222222-second-1,2222222-second-2\r\n' \
+              '4444444,4444444-first-1,4444444-first-2,4444444-second-1,4444444-second-2\r\n'
+        self.assertEqual(archive.read(archive.namelist()[1]).decode('utf-8'), csv)
+
+    def test_generate_gradebook_zip_other_term(self):
+        """
+        Tests that a term zip is empty for a term without labgroups.
+        """
+        # request
+        response = self.client.get(reverse('api:gradebook-zip', args=['FALL1999']))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(response.content)).namelist(), [])
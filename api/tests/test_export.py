@@ -0,0 +1,181 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from datetime import datetime, timedelta
+import json
+import os
+from pytz import timezone
+import shutil
+import tempfile
+from unittest import mock
+
+from api import models
+from api.views import get_current_term
+
+
+class ExportJobTest(APITestCase):
+    """
+    Test cases for creating, polling, and downloading export jobs.
+    """
+
+    def setUp(self):
+        # store artifacts in a temporary directory and build them in the request
+        self.export_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(EXPORT_ROOT=self.export_root, EXPORT_WORKERS=0)
+        self.settings_override.enable()
+        # create test users
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        # populate the database
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroup = models.LabGroup(course=self.course,
+                                        instructor=self.instructor,
+                                        group_name='A',
+                                        term=get_current_term(),
+                                        enroll_key='ABC')
+        self.labgroup.save()
+        self.assignment_template = models.AssignmentTemplate(course=self.course, name='test assignment template')
+        self.assignment_template.save()
+        self.task_template = models.TaskTemplate(assignment_template=self.assignment_template,
+                                                 problem_num=1,
+                                                 prompt='test prompt',
+                                                 numeric_only=False)
+        self.task_template.save()
+        self.assignment = models.Assignment(assignment_template=self.assignment_template,
+                                            labgroup=self.labgroup,
+                                            open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                            close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        self.assignment.save()
+        self.task_entries = []
+        for s in range(0, 2):
+            user = User.objects.create_user(username='student{}'.format(s), password=self.password)
+            student = models.Student(labgroup=self.labgroup, user=user, wwuid=str(s + 1) * 7)
+            student.save()
+            assignment_entry = models.AssignmentEntry(student=student, assignment=self.assignment)
+            assignment_entry.save()
+            self.task_entries.append(models.TaskEntry(assignment_entry=assignment_entry,
+                                                      task_template=self.task_template,
+                                                      attempts=1,
+                                                      raw_input='{}-1'.format(student.wwuid)))
+            self.task_entries[-1].save()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.export_root)
+
+    def test_export_job(self):
+        """
+        Tests that an export job builds the assignment CSV and serves it.
+        """
+        # create the job
+        response = self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response_body['assignment'], self.assignment.id)
+        self.assertEqual(response_body['status'], models.ExportJob.DONE)
+        # poll the job
+        response = self.client.get(reverse('api:export-job', args=[response_body['pk']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['status'], models.ExportJob.DONE)
+        # download the artifact
+        response = self.client.get(reverse('api:export-job-csv', args=[response_body['pk']]))
+        csv = 'student,1\r\n' \
+              '1111111,1111111-1\r\n' \
+              '2222222,2222222-1\r\n'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content).decode('utf-8'), csv)
+
+    def test_export_job_cached(self):
+        """
+        Tests that exporting unchanged data reuses the cached artifact.
+        """
+        first = json.loads(self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+                           .content.decode('utf-8'))
+        # request
+        with mock.patch('api.exports.build_artifact') as build_artifact:
+            response = self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertFalse(build_artifact.called)
+        self.assertEqual(response_body['status'], models.ExportJob.DONE)
+        self.assertEqual(response_body['data_version'], first['data_version'])
+
+    def test_export_job_data_changed(self):
+        """
+        Tests that changing a task entry builds a new artifact.
+        """
+        first = json.loads(self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+                           .content.decode('utf-8'))
+        # change an answer
+        self.task_entries[0].raw_input = 'changed'
+        self.task_entries[0].save()
+        # request
+        response = self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertNotEqual(response_body['data_version'], first['data_version'])
+        response = self.client.get(reverse('api:export-job-csv', args=[response_body['pk']]))
+        self.assertIn('1111111,changed', b''.join(response.streaming_content).decode('utf-8'))
+        # the artifact of the old data is deleted
+        response = self.client.get(reverse('api:export-job-csv', args=[first['pk']]))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(len(os.listdir(self.export_root)), 1)
+
+    def test_export_job_stale(self):
+        """
+        Tests that a job orphaned by a crashed worker is reported failed and never reused.
+        """
+        data_version = json.loads(self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+                                  .content.decode('utf-8'))['data_version']
+        shutil.rmtree(self.export_root)
+        stale = models.ExportJob.objects.create(instructor=self.instructor,
+                                                assignment=self.assignment,
+                                                data_version=data_version,
+                                                status=models.ExportJob.RUNNING)
+        models.ExportJob.objects.filter(id=stale.id).update(
+            created=datetime.now(timezone(settings.TIME_ZONE)) - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT + 1))
+        # request
+        response = self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertNotEqual(response_body['pk'], stale.id)
+        self.assertEqual(response_body['status'], models.ExportJob.DONE)
+        response = self.client.get(reverse('api:export-job', args=[stale.id]))
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['status'], models.ExportJob.FAILED)
+
+    def test_export_job_not_done(self):
+        """
+        Tests that an export job can not be downloaded before it is done.
+        """
+        job = models.ExportJob.objects.create(instructor=self.instructor, assignment=self.assignment, data_version='x')
+        # request
+        response = self.client.get(reverse('api:export-job-csv', args=[job.id]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_export_job_instructor_not_owner(self):
+        """
+        Tests that instructors can not export or download assignments they do not own.
+        """
+        job = json.loads(self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+                         .content.decode('utf-8'))
+        # log in as a new instructor
+        new_instructor_user = User.objects.create_user(username='new_instructor', password=self.password)
+        models.Instructor(user=new_instructor_user, wwuid='8888888').save()
+        self.client.logout()
+        self.client.login(username=new_instructor_user.username, password=self.password)
+        # test responses
+        response = self.client.post(reverse('api:assignment-export', args=[self.assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('api:export-job', args=[job['pk']]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('api:export-job-csv', args=[job['pk']]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
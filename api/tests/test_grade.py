@@ -0,0 +1,256 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from datetime import datetime, timedelta
+import json
+from pytz import timezone
+
+from api import grading, models, permissions
+from api.views import get_current_term
+from equations import equations
+
+
+class GradeAssignmentTest(APITestCase):
+    """
+    Test cases for grading assignments on AssignmentGradeView.
+    """
+
+    def setUp(self):
+        # create test users
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.instructor_user.groups.add(permissions.get_or_create_instructor_permissions())
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        # populate the database
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroup = models.LabGroup(course=self.course,
+                                        instructor=self.instructor,
+                                        group_name='A',
+                                        term=get_current_term(),
+                                        enroll_key='ABC')
+        self.labgroup.save()
+        self.assignment_template = models.AssignmentTemplate(course=self.course, name='atomic spectra')
+        self.assignment_template.save()
+        # two measurements and the wavelength calculated from them
+        self.task_templates = {}
+        for problem_num, variable in enumerate(('distance_along_white_board',
+                                                'distance_to_white_board',
+                                                'calculated_wavelength',
+                                                'energy'), 1):
+            self.task_templates[variable] = models.TaskTemplate(assignment_template=self.assignment_template,
+                                                                problem_num=problem_num,
+                                                                prompt=variable,
+                                                                numeric_only=True,
+                                                                variable=variable)
+            self.task_templates[variable].save()
+        self.assignment = models.Assignment(assignment_template=self.assignment_template,
+                                            labgroup=self.labgroup,
+                                            open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                            close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        self.assignment.save()
+        self.true_wavelength = equations.true_wavelength_equation(30.0, 40.0)
+        self.true_energy = equations.true_photon_energy(self.true_wavelength)
+        # retrieve the view
+        self.view_name = 'api:assignment-grade'
+
+    def add_entry(self, wwuid, answers):
+        """
+        Adds a student who answered the given variables to the assignment.
+        """
+        user = User.objects.create_user(username=wwuid, password=self.password)
+        student = models.Student(labgroup=self.labgroup, user=user, wwuid=wwuid)
+        student.save()
+        assignment_entry = models.AssignmentEntry(student=student, assignment=self.assignment)
+        assignment_entry.save()
+        task_entries = {}
+        for variable, raw_input in answers.items():
+            task_entries[variable] = models.TaskEntry(assignment_entry=assignment_entry,
+                                                      task_template=self.task_templates[variable],
+                                                      attempts=1,
+                                                      raw_input=raw_input)
+            task_entries[variable].save()
+        return task_entries
+
+    def grade(self, task_entry):
+        return models.GradeResult.objects.get(task_entry=task_entry)
+
+    def test_grade_assignment(self):
+        """
+        Tests that answers are graded against the values derived from each student's measurements.
+        """
+        correct = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                             'distance_to_white_board': '40',
+                                             'calculated_wavelength': str(self.true_wavelength + 0.5)})
+        incorrect = self.add_entry('2222222', {'distance_along_white_board': '30',
+                                               'distance_to_white_board': '40',
+                                               'calculated_wavelength': str(self.true_wavelength + 0.7)})
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_body['graded'], 2)
+        # test database
+        self.assertTrue(self.grade(correct['calculated_wavelength']).correct)
+        self.assertEqual(self.grade(correct['calculated_wavelength']).expected, self.true_wavelength)
+        self.assertFalse(self.grade(incorrect['calculated_wavelength']).correct)
+        # measurements are not graded
+        self.assertFalse(models.GradeResult.objects.filter(task_entry=correct['distance_along_white_board']).exists())
+
+    def test_grade_assignment_ungradable(self):
+        """
+        Tests that answers that are not numbers or lack measurements can not be graded.
+        """
+        not_a_number = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                                  'distance_to_white_board': '40',
+                                                  'calculated_wavelength': 'five hundred'})
+        missing_measurement = self.add_entry('2222222', {'distance_along_white_board': '30',
+                                                         'calculated_wavelength': '500'})
+        # grade
+        grading.grade_assignment(self.assignment)
+        # test database
+        self.assertIsNone(self.grade(not_a_number['calculated_wavelength']).correct)
+        self.assertIsNone(self.grade(missing_measurement['calculated_wavelength']).correct)
+        self.assertIsNone(self.grade(missing_measurement['calculated_wavelength']).expected)
+
+    def test_grade_assignment_numeric_accuracy(self):
+        """
+        Tests that the numeric accuracy of a task template replaces the tolerance of the check.
+        """
+        task_entries = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                                  'distance_to_white_board': '40',
+                                                  'calculated_wavelength': str(self.true_wavelength + 0.5)})
+        self.task_templates['calculated_wavelength'].numeric_accuracy = 0
+        self.task_templates['calculated_wavelength'].save()
+        # grade
+        grading.grade_assignment(self.assignment)
+        # test database
+        self.assertFalse(self.grade(task_entries['calculated_wavelength']).correct)
+        # answer to the nearest whole number
+        task_entries['calculated_wavelength'].raw_input = str(round(self.true_wavelength))
+        task_entries['calculated_wavelength'].save()
+        grading.grade_assignment(self.assignment)
+        self.assertTrue(self.grade(task_entries['calculated_wavelength']).correct)
+
+    def test_grade_assignment_batches(self):
+        """
+        Tests that grading in small batches gives the same verdicts and replaces earlier ones.
+        """
+        entries = []
+        for s in range(0, 5):
+            entries.append(self.add_entry(str(s) * 7, {'distance_along_white_board': '30',
+                                                       'distance_to_white_board': '40',
+                                                       'calculated_wavelength': str(self.true_wavelength + s * 0.2)}))
+        # grade twice
+        self.assertEqual(grading.grade_assignment(self.assignment, batch_size=2), 5)
+        models.GradeResult.objects.filter(task_entry=entries[0]['calculated_wavelength']).update(input_hash='')
+        self.assertEqual(grading.grade_assignment(self.assignment, batch_size=2), 1)
+        # test database
+        self.assertEqual(models.GradeResult.objects.count(), 5)
+        self.assertEqual([self.grade(entry['calculated_wavelength']).correct for entry in entries],
+                         [True, True, True, False, False])
+
+    def test_grade_assignment_incremental(self):
+        """
+        Tests that only answers whose inputs changed since they were graded are regraded.
+        """
+        task_entries = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                                  'distance_to_white_board': '40',
+                                                  'calculated_wavelength': str(self.true_wavelength),
+                                                  'energy': str(self.true_energy)})
+        self.assertEqual(grading.grade_assignment(self.assignment), 2)
+        energy_grade = self.grade(task_entries['energy'])
+        # nothing changed
+        self.assertEqual(grading.grade_assignment(self.assignment), 0)
+        # the answer changed
+        task_entries['calculated_wavelength'].raw_input = str(self.true_wavelength + 1)
+        task_entries['calculated_wavelength'].save()
+        self.assertEqual(grading.grade_assignment(self.assignment), 1)
+        self.assertFalse(self.grade(task_entries['calculated_wavelength']).correct)
+        self.assertEqual(self.grade(task_entries['energy']).id, energy_grade.id)
+        # a measurement both answers depend on changed
+        task_entries['distance_to_white_board'].raw_input = '41'
+        task_entries['distance_to_white_board'].save()
+        self.assertEqual(grading.grade_assignment(self.assignment), 2)
+        self.assertEqual(self.grade(task_entries['energy']).grader_version, grading.GRADER_VERSION)
+
+    def test_grade_assignment_derived_variable(self):
+        """
+        Tests that an answer to a derived variable never replaces the value derived from the measurements.
+        """
+        self.task_templates['true_wavelength'] = models.TaskTemplate(assignment_template=self.assignment_template,
+                                                                     problem_num=5,
+                                                                     prompt='true_wavelength',
+                                                                     numeric_only=True,
+                                                                     variable='true_wavelength')
+        self.task_templates['true_wavelength'].save()
+        task_entries = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                                  'distance_to_white_board': '40',
+                                                  'true_wavelength': '1000',
+                                                  'energy': str(equations.true_photon_energy(1000.0))})
+        # test grade
+        self.assertEqual(grading.grade_assignment(self.assignment), 1)
+        self.assertFalse(self.grade(task_entries['energy']).correct)
+        self.assertEqual(self.grade(task_entries['energy']).expected, self.true_energy)
+
+    def test_grade_assignment_grader_version(self):
+        """
+        Tests that answers graded by another version of the grader are regraded.
+        """
+        self.add_entry('1111111', {'distance_along_white_board': '30',
+                                   'distance_to_white_board': '40',
+                                   'calculated_wavelength': str(self.true_wavelength)})
+        grading.grade_assignment(self.assignment)
+        models.GradeResult.objects.update(grader_version='0')
+        # test regrade
+        self.assertEqual(grading.grade_assignment(self.assignment), 1)
+        self.assertEqual(models.GradeResult.objects.get().grader_version, grading.GRADER_VERSION)
+
+    def test_grade_assignment_template_edited(self):
+        """
+        Tests that editing the accuracy of a task only regrades the answers to that task.
+        """
+        task_entries = self.add_entry('1111111', {'distance_along_white_board': '30',
+                                                  'distance_to_white_board': '40',
+                                                  'calculated_wavelength': str(self.true_wavelength + 0.5),
+                                                  'energy': str(self.true_energy)})
+        grading.grade_assignment(self.assignment)
+        wavelength_grade = self.grade(task_entries['calculated_wavelength'])
+        energy_grade = self.grade(task_entries['energy'])
+        self.assertTrue(wavelength_grade.correct)
+        # request
+        task_template = self.task_templates['calculated_wavelength']
+        request_body = {
+            'problem_num': task_template.problem_num,
+            'prompt': task_template.prompt,
+            'numeric_only': True,
+            'numeric_accuracy': 0,
+            'variable': task_template.variable,
+        }
+        response = self.client.put(reverse('api:task-template-rud', args=[self.assignment_template.id,
+                                                                          task_template.id]), request_body)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # test database
+        self.assertFalse(self.grade(task_entries['calculated_wavelength']).correct)
+        self.assertNotEqual(self.grade(task_entries['calculated_wavelength']).id, wavelength_grade.id)
+        self.assertEqual(self.grade(task_entries['energy']).id, energy_grade.id)
+
+    def test_grade_assignment_instructor_not_owner(self):
+        """
+        Tests that an assignment is not graded if an instructor does not own it.
+        """
+        new_instructor_user = User.objects.create_user(username='new_instructor', password=self.password)
+        models.Instructor(user=new_instructor_user, wwuid='8888888').save()
+        self.client.logout()
+        self.client.login(username=new_instructor_user.username, password=self.password)
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.assignment.id]))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
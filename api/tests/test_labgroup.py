@@ -63,6 +63,31 @@ class LabGroupLCTest(APITestCase):
         self.assertEqual(response_body['term'], request_body['term'])
         self.assertEqual(response_body['enroll_key'], request_body['enroll_key'])
 
+    def test_labgroup_list_not_modified(self):
+        """
+        Tests that labgroups are not sent again when the client has the current version.
+        """
+        labgroup = LabGroup(course=self.course,
+                            instructor=self.instructor,
+                            group_name='test name 1',
+                            term=get_current_term(),
+                            enroll_key='test key 1')
+        labgroup.save()
+        # request
+        etag = self.client.get(reverse(self.view_name))['ETag']
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # change the enroll key
+        labgroup.enroll_key = 'test key 2'
+        labgroup.save()
+        # request
+        response = self.client.get(reverse(self.view_name), HTTP_IF_NONE_MATCH=etag)
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_body['labgroups'][0]['enroll_key'], 'test key 2')
+
     def test_labgroup_create_different_instructor(self):
         """
         Tests that a labgroup is not created if the instructor passed in is not the instructors making the request.
@@ -0,0 +1,84 @@
+from django.core import signals
+from django.core.management import CommandError, call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections
+from django.test import TestCase
+
+import random
+from unittest import mock
+
+from api import loadtest, models
+
+
+class LoadTestTest(TestCase):
+    """
+    Test cases for replaying traffic mixes and comparing them to a baseline.
+    """
+
+    def test_replay(self):
+        """
+        Tests that every mix is replayed through the test client without errors.
+        """
+        world = loadtest.build_world(courses=1, labgroups=2, students=2, assignments=2, tasks=2, enrollees=3)
+        send = loadtest.client_sender(world)
+        rng = random.Random(0)
+        samples = []
+        for mix, requests in loadtest.MIXES.items():
+            samples.extend(loadtest.replay(mix, requests(world, rng, 9), send))
+        summary = loadtest.summarize(samples)
+        # test summary
+        self.assertEqual(sum(stats['requests'] for stats in summary.values()), len(samples))
+        self.assertEqual(sum(stats['errors'] for stats in summary.values()), 0)
+        self.assertEqual(summary['enroll api:enroll']['requests'], 6)
+        for stats in summary.values():
+            self.assertLessEqual(stats['p50'], stats['p99'])
+            self.assertGreater(stats['queries_max'], 0)
+        self.assertEqual(loadtest.compare(summary, summary), [])
+
+    def test_replay_wsgi(self):
+        """
+        Tests that a mix is replayed straight through the WSGI application without errors.
+        """
+        world = loadtest.build_world(courses=1, labgroups=2, students=2, assignments=2, tasks=2, enrollees=0)
+        send = loadtest.wsgi_sender(get_wsgi_application(), world)
+        # keep the test database connection open across requests, as the test client does
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        try:
+            samples = loadtest.replay('autosave', loadtest.autosave_mix(world, random.Random(0), 6), send)
+        finally:
+            signals.request_started.connect(close_old_connections)
+            signals.request_finished.connect(close_old_connections)
+        # test samples
+        self.assertEqual(len(samples), 6)
+        self.assertTrue(all(sample.status < 400 for sample in samples))
+
+    def test_compare(self):
+        """
+        Tests that more queries, more errors, and a slower p95 are regressions.
+        """
+        baseline = {'autosave api:task-entry-batch': {'requests': 10, 'errors': 0, 'p50': 5.0, 'p95': 10.0,
+                                                      'p99': 12.0, 'queries_mean': 7.0, 'queries_max': 8}}
+        summary = {'autosave api:task-entry-batch': {'requests': 10, 'errors': 1, 'p50': 5.0, 'p95': 20.0,
+                                                     'p99': 22.0, 'queries_mean': 8.0, 'queries_max': 9},
+                   'export api:assignment-csv': {'requests': 10, 'errors': 0, 'p50': 5.0, 'p95': 10.0,
+                                                 'p99': 12.0, 'queries_mean': 4.0, 'queries_max': 5}}
+        regressions = loadtest.compare(baseline, summary)
+        self.assertEqual(len(regressions), 3)
+        # a p95 within the tolerance is not a regression
+        summary['autosave api:task-entry-batch'].update(errors=0, p95=13.0, queries_max=8)
+        self.assertEqual(loadtest.compare(baseline, summary), [])
+
+    def test_url_requires_confirmation(self):
+        """
+        Tests that the database is not seeded for a server unless the user agrees to it.
+        """
+        # without asking
+        with self.assertRaises(CommandError):
+            call_command('load_test', url='http://localhost:8000', interactive=False)
+        # declined
+        with mock.patch('builtins.input', return_value='no'):
+            with self.assertRaises(CommandError):
+                call_command('load_test', url='http://localhost:8000')
+        # test database
+        self.assertFalse(models.Course.objects.exists())
@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from datetime import datetime, timedelta
+from pytz import timezone
+
+from api import db, metrics, models
+from api.views import get_current_term
+
+
+class MetricsTest(APITestCase):
+    """
+    Test cases for recording the metrics of requests, enforcing query budgets, and checking database connections.
+    """
+
+    def setUp(self):
+        metrics.clear()
+        # create test users
+        self.password = 'test'
+        self.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com',
+                                                        password=self.password)
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroup = models.LabGroup(course=self.course,
+                                        instructor=self.instructor,
+                                        group_name='A',
+                                        term=get_current_term(),
+                                        enroll_key='ABC')
+        self.labgroup.save()
+
+    def test_request_recorded(self):
+        """
+        Tests that a request is recorded with its view name, queries, and response size.
+        """
+        self.client.login(username=self.admin_user.username, password=self.password)
+        metrics.clear()
+        # request
+        response = self.client.get(reverse('api:course-lc'))
+        # test metrics
+        records = metrics.recent()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].view, 'api:course-lc')
+        self.assertEqual(records[0].method, 'GET')
+        self.assertEqual(records[0].status, status.HTTP_200_OK)
+        self.assertGreater(records[0].queries, 0)
+        self.assertEqual(records[0].size, len(response.content))
+        self.assertGreater(records[0].serialize_ms, 0)
+        self.assertGreater(records[0].render_ms, 0)
+        self.assertGreaterEqual(records[0].total_ms, records[0].db_ms)
+        self.assertGreaterEqual(records[0].total_ms, records[0].serialize_ms + records[0].render_ms)
+
+    def test_streamed_request_recorded(self):
+        """
+        Tests that a streamed response is recorded once the stream ends, with the queries made while streaming.
+        """
+        assignment_template = models.AssignmentTemplate(course=self.course, name='test assignment template')
+        assignment_template.save()
+        models.TaskTemplate(assignment_template=assignment_template, problem_num=1, prompt='test prompt',
+                            numeric_only=False).save()
+        assignment = models.Assignment(assignment_template=assignment_template,
+                                       labgroup=self.labgroup,
+                                       open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                       close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        assignment.save()
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        metrics.clear()
+        # request
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:assignment-csv', args=[assignment.id]), {'stream': 'true'})
+            # test metrics
+            self.assertEqual(metrics.recent(), [])
+            content = b''.join(response.streaming_content)
+        records = metrics.recent()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].view, 'api:assignment-csv')
+        self.assertEqual(records[0].queries, len(queries))
+        self.assertEqual(records[0].size, len(content))
+
+    def test_metrics_view(self):
+        """
+        Tests that an admin can list the recorded metrics, filtered by view.
+        """
+        self.client.login(username=self.admin_user.username, password=self.password)
+        self.client.get(reverse('api:course-lc'))
+        self.client.get(reverse('api:course-lc'))
+        # request
+        response = self.client.get(reverse('api:metrics'), {'view': 'api:course-lc'})
+        response_body = response.json()
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response_body['requests']), 2)
+        self.assertEqual(response_body['views']['api:course-lc']['requests'], 2)
+        self.assertGreater(response_body['views']['api:course-lc']['serialize_ms_mean'], 0)
+        self.assertGreater(response_body['requests'][0]['serialize_ms'], 0)
+
+    def test_metrics_view_not_admin(self):
+        """
+        Tests that only admins can list the recorded metrics.
+        """
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        # request
+        response = self.client.get(reverse('api:metrics'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(QUERY_BUDGETS={'api:course-lc': 1}, QUERY_BUDGET_STRICT=True)
+    def test_budget_exceeded_strict(self):
+        """
+        Tests that a request over its view's query budget fails when budgets are strict.
+        """
+        self.client.login(username=self.admin_user.username, password=self.password)
+        # request
+        with self.assertRaises(metrics.QueryBudgetExceeded):
+            self.client.get(reverse('api:course-lc'))
+
+    @override_settings(QUERY_BUDGETS={'api:course-lc': 1}, QUERY_BUDGET_STRICT=False)
+    def test_budget_exceeded_logged(self):
+        """
+        Tests that a request over its view's query budget is logged when budgets are not strict.
+        """
+        self.client.login(username=self.admin_user.username, password=self.password)
+        # request
+        with self.assertLogs('api.metrics', level='WARNING') as logs:
+            response = self.client.get(reverse('api:course-lc'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('api:course-lc', logs.output[0])
+
+    def test_connection_stats(self):
+        """
+        Tests that the metrics view reports the connection reuse of the worker.
+        """
+        self.client.login(username=self.admin_user.username, password=self.password)
+        requests = db.connection_stats()['requests']
+        # request
+        response = self.client.get(reverse('api:metrics'))
+        response_body = response.json()
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_body['connections']['requests'], requests + 1)
+        self.assertIn('reuse_rate', response_body['connections'])
+
+    @override_settings(DB_HEALTH_CHECKS=True)
+    def test_connection_health_check(self):
+        """
+        Tests that an unusable persistent connection is closed before a request reuses it.
+        """
+        broken = mock.Mock(connection=object(), in_atomic_block=False, **{'is_usable.return_value': False})
+        working = mock.Mock(connection=object(), in_atomic_block=False, **{'is_usable.return_value': True})
+        failed = db.connection_stats()['health_checks_failed']
+        with mock.patch('api.db.connections') as connections:
+            connections.all.return_value = [broken, working]
+            db.check_connections(sender=None)
+        # test connections
+        broken.close.assert_called_once_with()
+        working.close.assert_not_called()
+        self.assertEqual(db.connection_stats()['health_checks_failed'], failed + 1)
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import Group
+from rest_framework.test import APITestCase
+
+from api import models, permissions
+
+
+class GroupBootstrapTest(APITestCase):
+    """
+    Test cases for the instructor and student groups created after migrating.
+    """
+
+    def test_groups_bootstrapped(self):
+        """
+        Tests that both groups exist with every permission on their models.
+        """
+        for name, group_models in permissions.GROUP_MODELS.items():
+            group = Group.objects.get(name=name)
+            model_names = set(group.permissions.values_list('content_type__model', flat=True))
+            self.assertEqual(model_names, {model._meta.model_name for model in group_models})
+            # add, change, delete, and view
+            self.assertEqual(group.permissions.count(), 4 * len(group_models))
+
+    def test_bootstrap_groups_idempotent(self):
+        """
+        Tests that bootstrapping twice does not duplicate groups or permissions.
+        """
+        permission_count = Group.permissions.through.objects.count()
+        permissions.bootstrap_groups()
+        self.assertEqual(Group.objects.filter(name__in=permissions.GROUP_MODELS).count(), 2)
+        self.assertEqual(Group.permissions.through.objects.count(), permission_count)
+
+    def test_get_group_cached(self):
+        """
+        Tests that groups are not queried for once their ids are known.
+        """
+        permissions.get_or_create_student_permissions()
+        with self.assertNumQueries(0):
+            instructor_group = permissions.get_or_create_instructor_permissions()
+            student_group = permissions.get_or_create_student_permissions()
+        self.assertEqual(instructor_group.id, Group.objects.get(name='Instructor').id)
+        self.assertEqual(student_group.id, Group.objects.get(name='Student').id)
+        self.assertTrue(student_group.permissions.filter(content_type__model=models.TaskEntry._meta.model_name)
+                        .exists())
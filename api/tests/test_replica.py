@@ -0,0 +1,187 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from datetime import datetime, timedelta
+from pytz import timezone
+from unittest import mock
+
+from api import permissions, routers
+from api.models import Assignment, AssignmentEntry, AssignmentTemplate, Course, Instructor, LabGroup, Student
+from api.views import get_current_term
+
+
+# the replica is the test database itself, and reads are told apart by whether they were routed to the replica;
+# the budgets are kept without a replica, since marking a user sticky writes to the database cache
+@override_settings(REPLICA_DATABASE=DEFAULT_DB_ALIAS, QUERY_BUDGETS={})
+class ReplicaTest(APITestCase):
+    """
+    Test cases for reading the list and export views from the replica.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # create test user with permissions
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.instructor_user.groups.add(permissions.get_or_create_instructor_permissions())
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        # populate the database
+        self.instructor = Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = Course(name='test course')
+        self.course.save()
+        self.labgroup = LabGroup(course=self.course,
+                                 instructor=self.instructor,
+                                 group_name='A',
+                                 term=get_current_term(),
+                                 enroll_key='ABC')
+        self.labgroup.save()
+
+    def routed_reads(self, request):
+        """
+        Makes a request and returns its response along with the models read from the replica and the primary.
+        """
+        replica = []
+        primary = []
+        db_for_read = routers.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            (replica if getattr(routers._local, 'replica', False) else primary).append(model)
+            return db_for_read(router, model, **hints)
+        with mock.patch.object(routers.ReplicaRouter, 'db_for_read', record):
+            response = request()
+        return response, replica, primary
+
+    def test_list_reads_from_replica(self):
+        """
+        Tests that a list is read from the replica while authentication reads from the primary.
+        """
+        # request
+        response, replica, primary = self.routed_reads(lambda: self.client.get(reverse('api:lab-group-lc')))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['labgroups'][0]['pk'], self.labgroup.id)
+        # test routing
+        self.assertIn(LabGroup, replica)
+        self.assertIn(User, primary)
+        self.assertNotIn(LabGroup, primary)
+
+    def test_streamed_csv_reads_from_replica(self):
+        """
+        Tests that the rows of a streamed CSV are read from the replica while the response is streamed.
+        """
+        assignment_template = AssignmentTemplate(course=self.course, name='test assignment template')
+        assignment_template.save()
+        assignment = Assignment(assignment_template=assignment_template,
+                                labgroup=self.labgroup,
+                                open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        assignment.save()
+        student_user = User.objects.create_user(username='student', password=self.password)
+        student = Student(labgroup=self.labgroup, user=student_user, wwuid='1111111')
+        student.save()
+        AssignmentEntry(student=student, assignment=assignment).save()
+        # request, consuming the streamed content the way the server would after the view returns
+        url = reverse('api:assignment-csv', args=[assignment.id])
+        content, replica, primary = self.routed_reads(
+            lambda: b''.join(self.client.get(url, {'stream': 'true'}).streaming_content))
+        # test response
+        self.assertIn(b'1111111', content)
+        # test routing
+        self.assertIn(AssignmentEntry, replica)
+        self.assertNotIn(AssignmentEntry, primary)
+        self.assertFalse(getattr(routers._local, 'replica', False))
+
+    def test_create_reads_from_primary(self):
+        """
+        Tests that a request changing data never reads from the replica.
+        """
+        request_body = {
+            'course': self.course.id,
+            'instructor': self.instructor.id,
+            'group_name': 'B',
+            'term': get_current_term(),
+            'enroll_key': 'DEF',
+        }
+        # request
+        response, replica, primary = self.routed_reads(lambda: self.client.post(reverse('api:lab-group-lc'),
+                                                                               request_body))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # test routing
+        self.assertEqual(replica, [])
+
+    def test_sticky_after_write(self):
+        """
+        Tests that a user reads from the primary right after changing data, and from the replica after that.
+        """
+        request_body = {
+            'course': self.course.id,
+            'instructor': self.instructor.id,
+            'group_name': 'B',
+            'term': get_current_term(),
+            'enroll_key': 'DEF',
+        }
+        self.client.post(reverse('api:lab-group-lc'), request_body)
+        # request
+        response, replica, primary = self.routed_reads(lambda: self.client.get(reverse('api:lab-group-lc')))
+        # test response
+        self.assertEqual(len(response.json()['labgroups']), 2)
+        # test routing
+        self.assertEqual(replica, [])
+        # the replica has caught up once the user is no longer sticky
+        cache.delete(routers.sticky_key(self.instructor_user.id))
+        response, replica, primary = self.routed_reads(lambda: self.client.get(reverse('api:lab-group-lc')))
+        self.assertIn(LabGroup, replica)
+
+    def test_sticky_across_workers(self):
+        """
+        Tests that a user reads from the primary after changing data even when another worker answers the read.
+        """
+        request_body = {
+            'course': self.course.id,
+            'instructor': self.instructor.id,
+            'group_name': 'B',
+            'term': get_current_term(),
+            'enroll_key': 'DEF',
+        }
+        self.client.post(reverse('api:lab-group-lc'), request_body)
+        # another worker process has its own cache connections
+        caches._caches.caches = {}
+        # request
+        response, replica, primary = self.routed_reads(lambda: self.client.get(reverse('api:lab-group-lc')))
+        # test response
+        self.assertEqual(len(response.json()['labgroups']), 2)
+        # test routing
+        self.assertEqual(replica, [])
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica(self):
+        """
+        Tests that everything is read from the primary when there is no replica.
+        """
+        # request
+        response, replica, primary = self.routed_reads(lambda: self.client.get(reverse('api:lab-group-lc')))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # test routing
+        self.assertEqual(replica, [])
+        self.assertIn(LabGroup, primary)
+
+    @override_settings(REPLICA_DATABASE='replica')
+    def test_router(self):
+        """
+        Tests that rows read from the replica are written to the primary and the replica is never migrated.
+        """
+        router = routers.ReplicaRouter()
+        self.labgroup._state.db = 'replica'
+        self.assertEqual(router.db_for_write(LabGroup, instance=self.labgroup), DEFAULT_DB_ALIAS)
+        self.assertTrue(router.allow_relation(self.labgroup, self.course))
+        self.assertFalse(router.allow_migrate('replica', 'api'))
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, 'api'))
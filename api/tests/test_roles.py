@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from api import models, permissions, roles
+from api.views import get_current_term
+
+
+@override_settings(ROLE_CACHE_TTL=60, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RoleTest(APITestCase):
+    """
+    Test cases for resolving and caching the roles of users.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # create test users
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.instructor_user.groups.add(permissions.get_or_create_instructor_permissions())
+        self.student_user = User.objects.create_user(username='student', password=self.password)
+        # populate the database
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroups = []
+        for group_name in ('A', 'B'):
+            self.labgroups.append(models.LabGroup(course=self.course,
+                                                  instructor=self.instructor,
+                                                  group_name=group_name,
+                                                  term=get_current_term(),
+                                                  enroll_key=group_name))
+            self.labgroups[-1].save()
+
+    def test_resolve(self):
+        """
+        Tests that a role is resolved with one query and cached after that.
+        """
+        with self.assertNumQueries(1):
+            role = roles.resolve(self.instructor_user)
+        self.assertEqual(role.instructor.id, self.instructor.id)
+        self.assertIsNone(role.student)
+        self.assertTrue(role.in_group('Instructor'))
+        self.assertFalse(role.in_group('Student'))
+        with self.assertNumQueries(0):
+            self.assertTrue(roles.resolve(self.instructor_user).is_instructor)
+
+    def test_resolve_enroll(self):
+        """
+        Tests that enrolling replaces the cached role of a student.
+        """
+        self.assertFalse(roles.resolve(self.student_user).is_student)
+        self.client.login(username=self.student_user.username, password=self.password)
+        # enroll in both labgroups
+        for labgroup in self.labgroups:
+            request_body = {
+                'wwuid': '7654321',
+                'labgroup': labgroup.id,
+                'enroll_key': labgroup.enroll_key,
+            }
+            response = self.client.post(reverse('api:enroll'), request_body)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            # test role
+            role = roles.resolve(self.student_user)
+            self.assertEqual(role.student.labgroup_id, labgroup.id)
+            self.assertTrue(role.in_group('Student'))
+
+    def test_resolve_instructor_created(self):
+        """
+        Tests that creating an instructor replaces the cached role of the user.
+        """
+        self.assertFalse(roles.resolve(self.student_user).is_instructor)
+        models.Instructor(user=self.student_user, wwuid='7654321').save()
+        self.assertTrue(roles.resolve(self.student_user).is_instructor)
+
+    def test_get_role_once_per_request(self):
+        """
+        Tests that the role of a request is only resolved once.
+        """
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        cache.clear()
+        # request, the role is read once between loading the user and listing the labgroups
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('api:lab-group-lc'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from datetime import datetime, timedelta
+import json
+from pytz import timezone
+
+from api import models, permissions
+from api.views import get_current_term
+
+
+class LabGroupRosterTest(APITestCase):
+    """
+    Test cases for importing rosters on LabGroupRosterView.
+    """
+
+    def setUp(self):
+        # create test users
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.instructor_user.groups.add(permissions.get_or_create_instructor_permissions())
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        self.users = [User.objects.create_user(username='student{}'.format(s), password=self.password)
+                      for s in range(0, 5)]
+        # populate the database
+        self.instructor = models.Instructor(user=self.instructor_user, wwuid='1234567')
+        self.instructor.save()
+        self.course = models.Course(name='test course')
+        self.course.save()
+        self.labgroups = []
+        for group_name in ('A', 'B'):
+            self.labgroups.append(models.LabGroup(course=self.course,
+                                                  instructor=self.instructor,
+                                                  group_name=group_name,
+                                                  term=get_current_term(),
+                                                  enroll_key=group_name))
+            self.labgroups[-1].save()
+        self.roster = [{'username': user.username, 'wwuid': str(1000000 + s)} for s, user in enumerate(self.users)]
+        # retrieve the view
+        self.view_name = 'api:lab-group-roster'
+
+    def test_roster_import_json(self):
+        """
+        Tests that every student of a JSON roster is enrolled.
+        """
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]),
+                                    json.dumps({'students': self.roster}),
+                                    content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response_body['enrolled'], 5)
+        # test database
+        students = models.Student.objects.filter(labgroup=self.labgroups[0]).order_by('wwuid')
+        self.assertEqual([student.user_id for student in students], [user.id for user in self.users])
+        self.assertEqual([student.wwuid for student in students], [row['wwuid'] for row in self.roster])
+        student_group = Group.objects.get(name='Student')
+        self.assertEqual(student_group.user_set.count(), 5)
+
+    def test_roster_import_csv(self):
+        """
+        Tests that every student of a CSV roster is enrolled.
+        """
+        lines = ['username,wwuid'] + ['{username},{wwuid}'.format(**row) for row in self.roster]
+        roster_file = SimpleUploadedFile('roster.csv', '\r\n'.join(lines).encode('utf-8'), content_type='text/csv')
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]), {'roster': roster_file})
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response_body['enrolled'], 5)
+        # test database
+        self.assertEqual(models.Student.objects.filter(labgroup=self.labgroups[0]).count(), 5)
+
+    def test_roster_import_query_count(self):
+        """
+        Tests that the number of queries does not depend on the number of students.
+        """
+        more_users = [User.objects.create_user(username='other{}'.format(s), password=self.password)
+                      for s in range(0, 20)]
+        url = reverse(self.view_name, args=[self.labgroups[0].id])
+        # request, the student group is looked up by the first one
+        self.client.post(url, json.dumps(self.roster[:1]), content_type='application/json')
+        with self.assertNumQueries(11):
+            self.client.post(url, json.dumps(self.roster[1:]), content_type='application/json')
+        roster = [{'username': user.username, 'wwuid': str(2000000 + s)} for s, user in enumerate(more_users)]
+        with self.assertNumQueries(11):
+            response = self.client.post(url, json.dumps(roster), content_type='application/json')
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['enrolled'], 20)
+
+    def test_roster_import_move_students(self):
+        """
+        Tests that students enrolled elsewhere are moved and enrolled students are left alone.
+        """
+        unchanged = models.Student(user=self.users[0], labgroup=self.labgroups[0], wwuid=self.roster[0]['wwuid'])
+        unchanged.save()
+        moved = models.Student(user=self.users[1], labgroup=self.labgroups[1], wwuid=self.roster[1]['wwuid'])
+        moved.save()
+        renumbered = models.Student(user=self.users[2], labgroup=self.labgroups[0], wwuid='7777777')
+        renumbered.save()
+        # the moved student has already started an assignment
+        assignment_template = models.AssignmentTemplate(course=self.course, name='Assignment')
+        assignment_template.save()
+        assignment = models.Assignment(assignment_template=assignment_template,
+                                       labgroup=self.labgroups[1],
+                                       open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                       close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        assignment.save()
+        models.AssignmentEntry(student=moved, assignment=assignment).save()
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]),
+                                    json.dumps(self.roster),
+                                    content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response_body['enrolled'], 4)
+        # test database
+        self.assertEqual(models.Student.objects.get(user=self.users[0]).id, unchanged.id)
+        self.assertEqual(models.Student.objects.get(user=self.users[1]).id, moved.id)
+        self.assertEqual(models.Student.objects.get(user=self.users[1]).labgroup_id, self.labgroups[0].id)
+        self.assertEqual(models.Student.objects.get(user=self.users[2]).id, renumbered.id)
+        self.assertEqual(models.Student.objects.get(user=self.users[2]).wwuid, self.roster[2]['wwuid'])
+        self.assertEqual(models.Student.objects.count(), 5)
+        self.assertTrue(models.AssignmentEntry.objects.filter(student=moved).exists())
+
+    def test_roster_import_other_instructors_student(self):
+        """
+        Tests that students enrolled in another instructor's labgroup are reported instead of moved.
+        """
+        other_instructor_user = User.objects.create_user(username='other_instructor', password=self.password)
+        other_instructor = models.Instructor(user=other_instructor_user, wwuid='8888888')
+        other_instructor.save()
+        other_labgroup = models.LabGroup(course=self.course,
+                                         instructor=other_instructor,
+                                         group_name='C',
+                                         term=get_current_term(),
+                                         enroll_key='C')
+        other_labgroup.save()
+        models.Student(user=self.users[3], labgroup=other_labgroup, wwuid=self.roster[3]['wwuid']).save()
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]),
+                                    json.dumps(self.roster),
+                                    content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response_body['errors']], [4])
+        self.assertIn('username', response_body['errors'][0]['errors'])
+        # test database
+        self.assertEqual(models.Student.objects.get(user=self.users[3]).labgroup_id, other_labgroup.id)
+        self.assertEqual(models.Student.objects.count(), 1)
+
+    def test_roster_import_row_errors(self):
+        """
+        Tests that nothing is imported when any row is invalid and that every invalid row is reported.
+        """
+        self.roster[1]['wwuid'] = '123456789'
+        self.roster[2]['username'] = 'nobody'
+        self.roster[3] = dict(self.roster[0])
+        del self.roster[4]['wwuid']
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]),
+                                    json.dumps({'students': self.roster}),
+                                    content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response_body['errors']], [2, 3, 4, 5])
+        self.assertIn('wwuid', response_body['errors'][0]['errors'])
+        self.assertIn('username', response_body['errors'][1]['errors'])
+        self.assertIn('username', response_body['errors'][2]['errors'])
+        self.assertIn('wwuid', response_body['errors'][3]['errors'])
+        # test database
+        self.assertFalse(models.Student.objects.exists())
+
+    def test_roster_import_instructor_not_owner(self):
+        """
+        Tests that a roster is not imported into a labgroup the instructor does not own.
+        """
+        new_instructor_user = User.objects.create_user(username='new_instructor', password=self.password)
+        models.Instructor(user=new_instructor_user, wwuid='8888888').save()
+        self.client.logout()
+        self.client.login(username=new_instructor_user.username, password=self.password)
+        # request
+        response = self.client.post(reverse(self.view_name, args=[self.labgroups[0].id]),
+                                    json.dumps(self.roster),
+                                    content_type='application/json')
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(models.Student.objects.exists())
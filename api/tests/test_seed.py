@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from api import benchmark, models
+from api.seed import seed_term
+from api.views import get_current_term
+
+
+class SeedTermTest(TestCase):
+    """
+    Test cases for seeding a term of data and timing the access paths against it.
+    """
+
+    def test_seed_term(self):
+        """
+        Tests that every labgroup, student, entry, and task entry is seeded.
+        """
+        term = seed_term(terms=2, labgroups=2, students=3, assignments=2, tasks=2, instructors=2)
+        # test the current term
+        self.assertEqual(term.term, get_current_term())
+        self.assertEqual(len(term.instructors), 2)
+        self.assertEqual(len(term.labgroups), 2)
+        self.assertEqual(len(term.assignments), 4)
+        self.assertEqual(len(term.students), 6)
+        self.assertEqual(len(term.entries), 12)
+        # test database
+        self.assertEqual(models.LabGroup.objects.count(), 4)
+        self.assertEqual(models.Student.objects.count(), 12)
+        self.assertEqual(models.AssignmentEntry.objects.count(), 24)
+        self.assertEqual(models.TaskEntry.objects.count(), 48)
+
+    def test_measure(self):
+        """
+        Tests that every access path is timed and explained.
+        """
+        term = seed_term(terms=1, labgroups=1, students=2, assignments=1, tasks=1, instructors=1)
+        results = benchmark.measure(term, iterations=2)
+        self.assertEqual([name for name, p50, p95, plan in results],
+                         [name for name, query in benchmark.ACCESS_PATHS])
+        for name, p50, p95, plan in results:
+            self.assertLessEqual(p50, p95)
+            self.assertTrue(plan)
+        self.assertIn('speedup', benchmark.report(results, results, plans=True))
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from api import permissions
 from rest_framework.reverse import reverse
@@ -68,15 +70,35 @@ class TaskEntryLCTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response_body['task_template'], request_body['task_template'])
         self.assertEqual(response_body['assignment_entry'], request_body['assignment_entry'])
-        self.assertEqual(response_body['attempts'], request_body['attempts'])
+        self.assertEqual(response_body['attempts'], 1)
         self.assertEqual(response_body['raw_input'], request_body['raw_input'])
         # test database
         task = TaskEntry.objects.get(id=response_body['pk'])
         self.assertEqual(task.assignment_entry.id, request_body['assignment_entry'])
         self.assertEqual(task.task_template.id, request_body['task_template'])
-        self.assertEqual(task.attempts, request_body['attempts'])
+        self.assertEqual(task.attempts, 1)
         self.assertEqual(task.raw_input, request_body['raw_input'])
 
+    def test_task_entry_create_twice(self):
+        """
+        Tests that a task is only answered once by every assignment entry.
+        """
+        TaskEntry(assignment_entry=self.assignment_entry,
+                  task_template=self.task_template,
+                  attempts=1,
+                  raw_input='input').save()
+        # request
+        request_body = {
+            'task_template': self.task_template.id,
+            'assignment_entry': self.assignment_entry.id,
+            'raw_input': 'other input',
+        }
+        response = self.client.post(reverse(self.view_name, args=[self.assignment.id]), request_body)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # test database
+        self.assertEqual(TaskEntry.objects.get().raw_input, 'input')
+
     def test_task_entry_list(self):
         """
         Tests that Task Entries are properly listed.
@@ -101,6 +123,11 @@ class TaskEntryLCTest(APITestCase):
                                attempts=3,
                                raw_input='other input')
         other_task.save()
+        task_template_2 = TaskTemplate(assignment_template=self.template,
+                                       problem_num=2,
+                                       prompt='prompt',
+                                       numeric_only=False)
+        task_template_2.save()
         # add task entries to database
         task_1 = TaskEntry(assignment_entry=self.assignment_entry,
                            task_template=self.task_template,
@@ -108,7 +135,7 @@ class TaskEntryLCTest(APITestCase):
                            raw_input='input 1')
         task_1.save()
         task_2 = TaskEntry(assignment_entry=self.assignment_entry,
-                           task_template=self.task_template,
+                           task_template=task_template_2,
                            attempts=4,
                            raw_input='input 2')
         task_2.save()
@@ -129,6 +156,34 @@ class TaskEntryLCTest(APITestCase):
         self.assertEqual(response_body['task_entry'][1]['attempts'], task_2.attempts)
         self.assertEqual(response_body['task_entry'][1]['raw_input'], task_2.raw_input)
 
+    def test_task_entry_list_other_students(self):
+        """
+        Tests that only the task entries of the requesting student are listed with a single query.
+        """
+        task = TaskEntry(assignment_entry=self.assignment_entry,
+                         task_template=self.task_template,
+                         attempts=1,
+                         raw_input='input')
+        task.save()
+        # other students who have started the same assignment
+        for s in range(0, 3):
+            user = User.objects.create_user(username='other{}'.format(s), password=self.password)
+            student = Student(user=user, labgroup=self.lab_group, wwuid=str(s) * 7)
+            student.save()
+            assignment_entry = AssignmentEntry(student=student, assignment=self.assignment)
+            assignment_entry.save()
+            TaskEntry(assignment_entry=assignment_entry,
+                      task_template=self.task_template,
+                      attempts=1,
+                      raw_input='other input').save()
+        # request, the session, user, and role are loaded before the task entries are read
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse(self.view_name, args=[self.assignment.id]))
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task_entry['pk'] for task_entry in response_body['task_entry']], [task.id])
+
 
 class TaskEntryRUDTest(APITestCase):
     """
@@ -168,12 +223,15 @@ class TaskEntryRUDTest(APITestCase):
                                             prompt='prompt',
                                             numeric_only=False)
         self.task_template_2.save()
+        self.task_template_3 = TaskTemplate(assignment_template=self.template,
+                                            problem_num=3,
+                                            prompt='prompt',
+                                            numeric_only=False)
+        self.task_template_3.save()
         self.student = Student(user=self.student_user, labgroup=self.lab_group, wwuid='12345')
         self.student.save()
         self.assignment_entry = AssignmentEntry(student=self.student, assignment=self.assignment)
         self.assignment_entry.save()
-        self.assignment_entry_2 = AssignmentEntry(student=self.student, assignment=self.assignment)
-        self.assignment_entry_2.save()
         # add tasks to the database
         self.task_1 = TaskEntry(assignment_entry=self.assignment_entry,
                                 task_template=self.task_template,
@@ -181,12 +239,12 @@ class TaskEntryRUDTest(APITestCase):
                                 raw_input='input 1')
         self.task_1.save()
         self.task_2 = TaskEntry(assignment_entry=self.assignment_entry,
-                                task_template=self.task_template,
+                                task_template=self.task_template_2,
                                 attempts=2,
                                 raw_input='input 2')
         self.task_2.save()
         self.task_3 = TaskEntry(assignment_entry=self.assignment_entry,
-                                task_template=self.task_template,
+                                task_template=self.task_template_3,
                                 attempts=3,
                                 raw_input='input 3')
         self.task_3.save()
@@ -214,7 +272,7 @@ class TaskEntryRUDTest(APITestCase):
         """
         # modify values
         request_body = {
-            'task_template': self.task_template.id,
+            'task_template': self.task_template_2.id,
             'assignment_entry': self.assignment_entry.id,
             'attempts': 10,
             'raw_input': 'new input',
@@ -227,16 +285,80 @@ class TaskEntryRUDTest(APITestCase):
         self.assertEqual(response_body['pk'], self.task_2.id)
         self.assertEqual(response_body['task_template'], request_body['task_template'])
         self.assertEqual(response_body['assignment_entry'], request_body['assignment_entry'])
-        self.assertEqual(response_body['attempts'], request_body['attempts'])
+        self.assertEqual(response_body['attempts'], self.task_2.attempts + 1)
         self.assertEqual(response_body['raw_input'], request_body['raw_input'])
         # test database
         task_change = TaskEntry.objects.get(id=self.task_2.id)
         self.assertEqual(task_change.id, self.task_2.id)
         self.assertEqual(task_change.task_template.id, request_body['task_template'])
         self.assertEqual(task_change.assignment_entry.id, request_body['assignment_entry'])
-        self.assertEqual(task_change.attempts, request_body['attempts'])
+        self.assertEqual(task_change.attempts, self.task_2.attempts + 1)
         self.assertEqual(task_change.raw_input, request_body['raw_input'])
 
+    def test_task_entry_update_attempts_allowed(self):
+        """
+        Tests that a task entry is not updated once every allowed attempt has been used.
+        """
+        self.task_template_2.attempts_allowed = 3
+        self.task_template_2.save()
+        request_body = {
+            'task_template': self.task_template_2.id,
+            'assignment_entry': self.assignment_entry.id,
+            'raw_input': 'new input',
+        }
+        # the second task entry has one attempt left
+        response = self.client.put(reverse(self.view_name, args=[self.task_template.id, self.task_2.id]), request_body)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # request
+        request_body['raw_input'] = 'newer input'
+        response = self.client.put(reverse(self.view_name, args=[self.task_template.id, self.task_2.id]), request_body)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        # test database
+        task_change = TaskEntry.objects.get(id=self.task_2.id)
+        self.assertEqual(task_change.attempts, 3)
+        self.assertEqual(task_change.raw_input, 'new input')
+
+    def test_task_entry_update_unchanged(self):
+        """
+        Tests that saving the same answer again does not use an attempt, even once every attempt has been used.
+        """
+        self.task_template_2.attempts_allowed = 2
+        self.task_template_2.save()
+        request_body = {
+            'task_template': self.task_template_2.id,
+            'assignment_entry': self.assignment_entry.id,
+            'raw_input': self.task_2.raw_input,
+        }
+        # request
+        response = self.client.put(reverse(self.view_name, args=[self.task_template.id, self.task_2.id]), request_body)
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_body['attempts'], self.task_2.attempts)
+        # test database
+        task_change = TaskEntry.objects.get(id=self.task_2.id)
+        self.assertEqual(task_change.attempts, self.task_2.attempts)
+        self.assertEqual(task_change.raw_input, self.task_2.raw_input)
+
+    def test_task_entry_update_single_query(self):
+        """
+        Tests that an attempt is recorded with a single conditional update.
+        """
+        request_body = {
+            'task_template': self.task_template.id,
+            'assignment_entry': self.assignment_entry.id,
+            'raw_input': 'new input',
+        }
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(reverse(self.view_name, args=[self.task_template.id, self.task_1.id]), request_body)
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        quote_name = connection.ops.quote_name
+        self.assertIn('{attempts} = ({table}.{attempts} + 1)'.format(attempts=quote_name('attempts'),
+                                                                     table=quote_name(TaskEntry._meta.db_table)),
+                      updates[0])
+
     def test_task_entry_destroy(self):
         """
         Tests that a task entry is properly destroyed.
@@ -250,3 +372,150 @@ class TaskEntryRUDTest(APITestCase):
         self.assertTrue(self.task_3 in task_entries)
         # test response
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class TaskEntryBatchTest(APITestCase):
+    """
+    Test cases for saving many task entries at once on TaskEntryBatchView.
+    """
+
+    def setUp(self):
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        self.student_user = User.objects.create_user(username='student', password=self.password)
+        self.student_user.groups.add(permissions.get_or_create_student_permissions())
+        self.client.login(username='student', password=self.password)
+        # populate test database
+        self.instructor = Instructor(user=self.instructor_user, wwuid='9994141')
+        self.instructor.save()
+        self.course = Course(name='Bounty Hunting 101')
+        self.course.save()
+        self.lab_group = LabGroup(course=self.course, instructor=self.instructor, term='before', enroll_key='4')
+        self.lab_group.save()
+        self.template = AssignmentTemplate(course=self.course, name='Royalty Kidnapping Section A')
+        self.template.save()
+        self.assignment = Assignment(assignment_template=self.template,
+                                     labgroup=self.lab_group,
+                                     open_date=datetime.now(timezone(settings.TIME_ZONE)),
+                                     close_date=datetime.now(timezone(settings.TIME_ZONE)) + timedelta(days=1))
+        self.assignment.save()
+        self.task_templates = []
+        for problem_num in range(1, 6):
+            self.task_templates.append(TaskTemplate(assignment_template=self.template,
+                                                    problem_num=problem_num,
+                                                    prompt='prompt',
+                                                    numeric_only=False))
+            self.task_templates[-1].save()
+        self.student = Student(user=self.student_user, labgroup=self.lab_group, wwuid='12345')
+        self.student.save()
+        self.assignment_entry = AssignmentEntry(student=self.student, assignment=self.assignment)
+        self.assignment_entry.save()
+        # retrieve the view
+        self.view_name = 'api:task-entry-batch'
+
+    def save(self, answers):
+        request_body = [{'task_template': tt.id, 'raw_input': raw_input} for tt, raw_input in answers]
+        return self.client.post(reverse(self.view_name, args=[self.assignment.id]),
+                                json.dumps(request_body),
+                                content_type='application/json')
+
+    def test_task_entry_batch(self):
+        """
+        Tests that new answers are inserted and changed answers are updated with another attempt.
+        """
+        self.save([(tt, 'first') for tt in self.task_templates[:3]])
+        # request
+        response = self.save([(self.task_templates[0], 'first'),
+                              (self.task_templates[1], 'second'),
+                              (self.task_templates[3], 'first')])
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(task['task_template'], task['raw_input'], task['attempts'])
+                          for task in response_body['task_entry']],
+                         [(self.task_templates[0].id, 'first', 1),
+                          (self.task_templates[1].id, 'second', 2),
+                          (self.task_templates[3].id, 'first', 1)])
+        # test database
+        self.assertEqual(TaskEntry.objects.filter(assignment_entry=self.assignment_entry).count(), 4)
+        self.assertEqual(TaskEntry.objects.get(task_template=self.task_templates[2]).raw_input, 'first')
+
+    def test_task_entry_batch_query_count(self):
+        """
+        Tests that the number of queries does not depend on the number of answers.
+        """
+        self.save([(self.task_templates[0], 'first')])
+        # request, the entry is locked and the tasks read before one update and one insert
+        with self.assertNumQueries(11):
+            self.save([(tt, 'second') for tt in self.task_templates[:2]])
+        with self.assertNumQueries(11):
+            self.save([(tt, 'third') for tt in self.task_templates])
+        self.assertEqual(list(TaskEntry.objects.order_by('id').values_list('attempts', flat=True)),
+                         [3, 2, 1, 1, 1])
+
+    def test_task_entry_batch_attempts_allowed(self):
+        """
+        Tests that a batch changing an answer which used every allowed attempt is refused for that row.
+        """
+        self.task_templates[0].attempts_allowed = 1
+        self.task_templates[0].save()
+        self.save([(tt, 'first') for tt in self.task_templates[:2]])
+        # request
+        response = self.save([(self.task_templates[1], 'second'), (self.task_templates[0], 'second')])
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual([error['row'] for error in response_body['errors']], [2])
+        self.assertIn('raw_input', response_body['errors'][0]['errors'])
+        # test database
+        self.assertEqual(list(TaskEntry.objects.order_by('id').values_list('raw_input', 'attempts')),
+                         [('first', 1), ('first', 1)])
+        # an unchanged answer does not take an attempt
+        response = self.save([(self.task_templates[0], 'first'), (self.task_templates[1], 'second')])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(TaskEntry.objects.order_by('id').values_list('raw_input', 'attempts')),
+                         [('first', 1), ('second', 2)])
+
+    def test_task_entry_batch_errors(self):
+        """
+        Tests that nothing is saved when any answer is invalid.
+        """
+        other_template = AssignmentTemplate(course=self.course, name='other template')
+        other_template.save()
+        other_task = TaskTemplate(assignment_template=other_template, problem_num=1, prompt='prompt',
+                                  numeric_only=False)
+        other_task.save()
+        # request
+        response = self.save([(self.task_templates[0], 'first'), (other_task, 'second')])
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response_body['errors']], [2])
+        # duplicate tasks
+        response = self.save([(self.task_templates[0], 'first'), (self.task_templates[0], 'second')])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # test database
+        self.assertFalse(TaskEntry.objects.exists())
+
+    def test_task_entry_batch_submitted(self):
+        """
+        Tests that answers are not saved once the assignment has been submitted.
+        """
+        self.assignment_entry.submit_date = datetime.now(timezone(settings.TIME_ZONE))
+        self.assignment_entry.save()
+        # request
+        response = self.save([(self.task_templates[0], 'first')])
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # test database
+        self.assertFalse(TaskEntry.objects.exists())
+
+    def test_task_entry_batch_not_started(self):
+        """
+        Tests that answers are not saved for an assignment that has not been started.
+        """
+        self.assignment_entry.delete()
+        # request
+        response = self.save([(self.task_templates[0], 'first')])
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -77,6 +77,42 @@ class TaskTemplateLCTest(APITestCase):
         self.assertEqual(response_body['numeric_accuracy'], request_body['numeric_accuracy'])
         self.assertEqual(response_body['numeric_only'], request_body['numeric_only'])
 
+    def test_task_template_create_unknown_variable(self):
+        """
+        Tests that a task template is not created with a variable the equations do not know.
+        """
+        # request
+        request_body = {
+            'problem_num': 1,
+            'prompt': 'test prompt',
+            'numeric_only': True,
+            'variable': 'not_a_variable',
+        }
+        response = self.client.post(reverse(viewname=self.view_name, args=[self.assignment_template.id]), request_body)
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # test database
+        self.assertFalse(TaskTemplate.objects.exists())
+
+    def test_task_template_create_derived_variable(self):
+        """
+        Tests that a task template is not created with a variable the equations derive from the measurements.
+        """
+        # request
+        request_body = {
+            'problem_num': 1,
+            'prompt': 'test prompt',
+            'numeric_only': True,
+            'variable': 'true_ph',
+        }
+        response = self.client.post(reverse(viewname=self.view_name, args=[self.assignment_template.id]), request_body)
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('variable', response_body)
+        # test database
+        self.assertFalse(TaskTemplate.objects.exists())
+
     def test_task_template_create_include_template_key(self):
         """
         Tests that a task template is properly created even when 'assignment_template' is included in the request body.
@@ -11,6 +11,12 @@ urlpatterns = [
     url(r'^assignment/(?P<pk>\d+).csv$',
         views.AssignmentCSVView.as_view(),
         name='assignment-csv'),
+    url(r'^assignment/(?P<pk>\d+)/export$',
+        views.ExportJobCreateView.as_view(),
+        name='assignment-export'),
+    url(r'^assignment/(?P<pk>\d+)/grade$',
+        views.AssignmentGradeView.as_view(),
+        name='assignment-grade'),
     url(r'^assignment/(?P<assignment>\d+)/entry$',
         views.AssignmentEntryView.as_view(),
         name='assignment-entry'),
@@ -23,6 +29,9 @@ urlpatterns = [
     url(r'^assignment/(?P<assignment>\d+)/task$',
         views.TaskEntryLCView.as_view(),
         name='task-entry-lc'),
+    url(r'^assignment/(?P<assignment>\d+)/task/batch$',
+        views.TaskEntryBatchView.as_view(),
+        name='task-entry-batch'),
     url(r'^assignment/(?P<assignment>\d+)/task/(?P<pk>\d+)$',
         views.TaskEntryRUDView.as_view(),
         name='task-entry-rud'),
@@ -35,6 +44,15 @@ urlpatterns = [
     url(r'^enroll$',
         views.EnrollView.as_view(),
         name='enroll'),
+    url(r'^export/(?P<pk>\d+)$',
+        views.ExportJobView.as_view(),
+        name='export-job'),
+    url(r'^export/(?P<pk>\d+).csv$',
+        views.ExportJobDownloadView.as_view(),
+        name='export-job-csv'),
+    url(r'^gradebook/(?P<term>[A-Z]+[0-9]{4}).zip$',
+        views.GradebookZipView.as_view(),
+        name='gradebook-zip'),
     url(r'^instructor$',
         views.InstructorLCView.as_view(),
         name='instructor-lc'),
@@ -47,6 +65,15 @@ urlpatterns = [
     url(r'^labgroup/(?P<pk>\d+)$',
         views.LabGroupRUDView.as_view(),
         name='lab-group-rud'),
+    url(r'^labgroup/(?P<pk>\d+).csv$',
+        views.LabGroupCSVView.as_view(),
+        name='lab-group-csv'),
+    url(r'^labgroup/(?P<pk>\d+)/roster$',
+        views.LabGroupRosterView.as_view(),
+        name='lab-group-roster'),
+    url(r'^metrics$',
+        views.MetricsView.as_view(),
+        name='metrics'),
     url(r'^student$',
         views.StudentLCView.as_view(),
         name='student-lc'),
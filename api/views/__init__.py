@@ -4,8 +4,12 @@ from .view_assignment_template import *
 from .view_course import *
 from .view_csv import *
 from .view_enroll import *
+from .view_export import *
+from .view_grade import *
 from .view_instructor import *
 from .view_labgroup import *
+from .view_metrics import *
+from .view_roster import *
 from .view_student import *
 from .view_task_entry import *
 from .view_task_template import *
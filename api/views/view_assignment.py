@@ -2,27 +2,31 @@ from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIV
 from rest_framework.permissions import DjangoModelPermissions
 
 from api import serializers
-from api.models import Assignment, Instructor, LabGroup, Student
+from api.conditional import ConditionalListMixin
+from api.models import Assignment
 from api.permissions import IsStudentOrInstructor
+from api.roles import get_role
+from api.routers import ReplicaReadMixin
 
 
-class AssignmentLCView(ListCreateAPIView):
+class AssignmentLCView(ReplicaReadMixin, ConditionalListMixin, ListCreateAPIView):
     """
     The list create view for assignment.
     """
     lookup_field = 'pk'
     serializer_class = serializers.AssignmentSerializer
     permission_classes = (DjangoModelPermissions, IsStudentOrInstructor)
+    version_fields = ('modified', 'assignment_template__modified')
 
     def get_queryset(self):
         # get student'l labgroup's assignments
-        if self.request.user.groups.filter(name='Student').exists():
-            return Assignment.objects.filter(labgroup=Student.objects.get(user=self.request.user).labgroup)
+        role = get_role(self.request)
+        # the template is read along with each assignment for its name
+        if role.in_group('Student'):
+            return Assignment.objects.filter(labgroup=role.student.labgroup_id).select_related('assignment_template')
         # get all assignments for every labgroup instructor owns
         else:
-            instructor = Instructor.objects.get(user=self.request.user)
-            labgroups = LabGroup.objects.filter(instructor=instructor).all()
-            return Assignment.objects.filter(labgroup__in=labgroups)
+            return Assignment.objects.filter(labgroup__instructor=role.instructor).select_related('assignment_template')
 
     def list(self, request, *args, **kwargs):
         response = super(AssignmentLCView, self).list(request, *args, **kwargs)
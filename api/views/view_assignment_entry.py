@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.response import Response
@@ -9,7 +10,8 @@ from pytz import timezone
 
 from api import serializers
 from api.permissions import IsStudent
-from api.models import AssignmentEntry, Assignment, Student
+from api.models import AssignmentEntry, Assignment
+from api.roles import get_role
 from api.serializers import AssignmentEntrySerializer
 
 
@@ -22,7 +24,7 @@ class AssignmentEntryView(RetrieveAPIView):
     serializer_class = AssignmentEntrySerializer
 
     def get_queryset(self):
-        student = Student.objects.get(user=self.request.user)
+        student = get_role(self.request).student
         return AssignmentEntry.objects.filter(student=student, assignment=self.kwargs['assignment']).all()
 
 
@@ -31,9 +33,11 @@ class AssignmentEntryStartView(APIView):
     The create view for assignment entries.
     """
     permission_classes = (IsStudent,)
+    # answered by the student threads when served over ASGI
+    student_pool_methods = ('POST',)
 
     def post(self, request, *args, **kwargs):
-        student = Student.objects.get(user=request.user)
+        student = get_role(request).student
         # check if assignment exists and get it
         try:
             assignment = Assignment.objects.get(id=kwargs['assignment'])
@@ -44,13 +48,18 @@ class AssignmentEntryStartView(APIView):
         if assignment.open_date > current_time or assignment.close_date < current_time:
             return Response(status=status.HTTP_403_FORBIDDEN)
         # check if student is in the assignments labgroup
-        if student.labgroup is None or assignment.labgroup.id is not student.labgroup.id:
+        if student.labgroup_id is None or assignment.labgroup_id != student.labgroup_id:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        # check if student has already started the assignment
-        if AssignmentEntry.objects.filter(student=student, assignment=assignment).exists():
-            return Response(status=status.HTTP_409_CONFLICT)
+        # start the assignment, the unique constraint turns away a student who already started it
         assignment_entry = AssignmentEntry(student=student, assignment=assignment)
-        assignment_entry.save()
+        try:
+            with transaction.atomic():
+                assignment_entry.save(force_insert=True)
+        except IntegrityError:
+            # only a conflict when the student already started it, any other violation is an error
+            if AssignmentEntry.objects.filter(student=student, assignment=assignment).exists():
+                return Response(status=status.HTTP_409_CONFLICT)
+            raise
         # response
         serialized_assignment_entry = serializers.AssignmentEntrySerializer(assignment_entry)
         return Response(serialized_assignment_entry.data, status=status.HTTP_201_CREATED)
@@ -61,30 +70,37 @@ class AssignmentEntrySubmitView(APIView):
     The submit view for assignment entries.
     """
     permission_classes = (IsStudent,)
+    # answered by the student threads when served over ASGI
+    student_pool_methods = ('POST',)
 
     def post(self, request, *args, **kwargs):
+        student = get_role(request).student
+        current_time = datetime.now(timezone(settings.TIME_ZONE))
+        # submit the entry only if it has not been submitted and the assignment is open
+        open_assignment = Assignment.objects.filter(id=kwargs['assignment'],
+                                                    open_date__lte=current_time,
+                                                    close_date__gte=current_time)
+        submitted = AssignmentEntry.objects \
+            .filter(student=student, assignment__in=open_assignment, submit_date__isnull=True) \
+            .update(submit_date=current_time, modified=current_time)
+        if not submitted:
+            return self.rejected(student, kwargs['assignment'], current_time)
+        # response
+        assignment_entry = AssignmentEntry.objects.get(student=student, assignment=kwargs['assignment'])
+        serialized_assignment_entry = serializers.AssignmentEntrySerializer(assignment_entry)
+        return Response(serialized_assignment_entry.data, status=status.HTTP_200_OK)
+
+    def rejected(self, student, assignment_id, current_time):
+        """
+        Returns the response explaining why an entry could not be submitted.
+        """
         # check if assignment exists
         try:
-            assignment = Assignment.objects.get(id=kwargs['assignment'])
+            assignment = Assignment.objects.get(id=assignment_id)
         except Assignment.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        # get student
-        student = Student.objects.get(user=request.user)
         # check if assignment is open
-        current_time = datetime.now(timezone(settings.TIME_ZONE))
         if assignment.open_date > current_time or assignment.close_date < current_time:
             return Response(status=status.HTTP_403_FORBIDDEN)
-        # check if assignment has been started
-        try:
-            assignment_entry = AssignmentEntry.objects.get(assignment=assignment, student=student)
-        except AssignmentEntry.DoesNotExist:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-        # check if the assignment has already been submitted
-        if assignment_entry.submit_date is not None:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-        # set the submit date
-        assignment_entry.submit_date = datetime.now(timezone(settings.TIME_ZONE))
-        assignment_entry.save()
-        # response
-        serialized_assignment_entry = serializers.AssignmentEntrySerializer(assignment_entry)
-        return Response(serialized_assignment_entry.data, status=status.HTTP_200_OK)
+        # the assignment has not been started or has already been submitted
+        return Response(status=status.HTTP_400_BAD_REQUEST)
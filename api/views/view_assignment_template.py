@@ -6,11 +6,14 @@ from datetime import datetime
 from pytz import timezone
 
 from api import serializers
-from api.models import AssignmentTemplate, Assignment, Student
+from api.conditional import ConditionalListMixin
+from api.models import AssignmentTemplate, Assignment
 from api.permissions import IsStudentOrInstructor
+from api.roles import get_role
+from api.routers import ReplicaReadMixin
 
 
-class AssignmentTemplateLCView(ListCreateAPIView):
+class AssignmentTemplateLCView(ReplicaReadMixin, ConditionalListMixin, ListCreateAPIView):
     """
     The list create view for AssignmentTemplates.
     """
@@ -19,9 +22,10 @@ class AssignmentTemplateLCView(ListCreateAPIView):
     permission_classes = (DjangoModelPermissions, IsStudentOrInstructor)
 
     def get_queryset(self):
-        if self.request.user.groups.filter(name='Student').exists():
+        role = get_role(self.request)
+        if role.in_group('Student'):
             # get student
-            student = Student.objects.get(user=self.request.user)
+            student = role.student
             # get all assignments open to the user
             current_time = datetime.now(timezone(settings.TIME_ZONE))
             assignments = Assignment.objects.filter(labgroup=student.labgroup,
@@ -1,3 +1,5 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
@@ -6,9 +8,14 @@ from rest_framework.views import APIView
 
 from rest_framework_csv import renderers
 
-from api import models
+from api import gradebook, models
 from api.authentication import TokenAuthentication
+from api.conditional import make_etag
 from api.permissions import IsInstructor
+from api.routers import ReplicaReadMixin
+
+import io
+import zipfile
 
 
 class AssignmentRenderer(renderers.CSVRenderer):
@@ -17,12 +24,11 @@ class AssignmentRenderer(renderers.CSVRenderer):
     """
     def render(self, data, media_type=None, renderer_context={}, writer_opts=None):
         if data and 'student' in data[0].keys():
-            self.header = sorted(data[0].keys())
-            self.header.insert(0, self.header.pop(self.header.index('student')))
+            self.header = gradebook.csv_header(data[0].keys())
         return super().render(data, media_type, renderer_context, writer_opts)
 
 
-class AssignmentCSVView(APIView):
+class AssignmentCSVView(ReplicaReadMixin, APIView):
     """
     The GET view for generating a CSV formatted version of an assignment.
     """
@@ -32,34 +38,91 @@ class AssignmentCSVView(APIView):
 
     def get(self, request, *args, **kwargs):
         """
-        Generate a CSV version of an assignment.
+        Generate a CSV version of an assignment. Pass stream=true to stream the rows as they are read.
         """
-        # get assignment from URI
+        # get assignment from URI along with everything needed to check ownership and name the file
         try:
-            assignment = models.Assignment.objects.get(id=kwargs['pk'])
+            assignment = models.Assignment.objects \
+                .select_related('assignment_template', 'labgroup__instructor') \
+                .get(id=kwargs['pk'])
         except models.Assignment.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
         # check if instructor owns the assignment
-        instructor = models.Instructor.objects.get(user=request.user)
-        if assignment.labgroup.instructor != instructor:
+        if assignment.labgroup.instructor.user_id != request.user.id:
             return Response(status=status.HTTP_403_FORBIDDEN)
+        # answer with 304 if the client already has this version of the assignment
+        stream = request.query_params.get('stream') == 'true'
+        etag = make_etag(request, '{}:{}'.format(gradebook.assignment_version(assignment), stream))
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            return response
+        # stream the CSV straight from the database cursor
+        if stream:
+            lines = gradebook.csv_lines(gradebook.assignment_columns(assignment),
+                                        gradebook.assignment_rows(assignment, stream=True))
+            response = StreamingHttpResponse(lines, content_type='text/csv; charset=utf-8')
         # retrieve all assignment entries and build the CSV
-        assignment_entries = models.AssignmentEntry.objects.filter(assignment=assignment).all()
-        assignment_csv = []
-        for entry in assignment_entries:
-            task_entries = models.TaskEntry.objects.filter(assignment_entry=entry).all()
-            row = {
-                'student': entry.student.wwuid
-            }
-            # build all columns for the student
-            for task in task_entries:
-                row[str(task.task_template.problem_num)] = task.raw_input
-            assignment_csv.append(row)
-        # build the response
-        response = Response(assignment_csv)
+        else:
+            assignment_csv = list(gradebook.assignment_rows(assignment))
+            response = Response(assignment_csv)
         # dynamically create file name in response
         response['Content-Disposition'] = 'attachment; filename="{}-{}-{}.csv"'.\
             format(assignment.assignment_template.name,
                    assignment.labgroup.group_name,
                    assignment.labgroup.term)
+        response['ETag'] = etag
+        return response
+
+
+class LabGroupCSVView(ReplicaReadMixin, APIView):
+    """
+    The GET view for generating a CSV gradebook of every assignment in a labgroup.
+    """
+    authentication_classes = (SessionAuthentication, TokenAuthentication)
+    permission_classes = (IsInstructor,)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Generate a CSV with one row per student and one column per task of every assignment in a labgroup.
+        """
+        # get labgroup from URI
+        try:
+            labgroup = models.LabGroup.objects.select_related('instructor').get(id=kwargs['pk'])
+        except models.LabGroup.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        # check if instructor owns the labgroup
+        if labgroup.instructor.user_id != request.user.id:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        # build the CSV
+        [(labgroup, header, rows)] = gradebook.labgroup_gradebooks([labgroup])
+        response = HttpResponse(b''.join(gradebook.csv_lines(header, rows)), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="{}-{}.csv"'.format(labgroup.group_name,
+                                                                                    labgroup.term)
+        return response
+
+
+class GradebookZipView(ReplicaReadMixin, APIView):
+    """
+    The GET view for generating a zip of CSV gradebooks for every labgroup an instructor owns in a term.
+    """
+    authentication_classes = (SessionAuthentication, TokenAuthentication)
+    permission_classes = (IsInstructor,)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Generate a zip with one labgroup CSV for each of the instructor's labgroups in a term.
+        """
+        labgroups = models.LabGroup.objects \
+            .filter(instructor__user=request.user, term=kwargs['term']) \
+            .select_related('course') \
+            .order_by('course__name', 'group_name')
+        # write every labgroup CSV into the zip
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for labgroup, header, rows in gradebook.labgroup_gradebooks(labgroups):
+                archive.writestr('{}-{}-{}.csv'.format(labgroup.course.name, labgroup.group_name, labgroup.term),
+                                 b''.join(gradebook.csv_lines(header, rows)))
+        response = HttpResponse(buffer.getvalue(), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="{}.zip"'.format(kwargs['term'])
         return response
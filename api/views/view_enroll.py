@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 
 from api.models import Student, LabGroup
 from api import permissions
+from api.roles import get_role
 from api.serializers import StudentSerializer, EnrollStatusSerializer
 
 
@@ -13,16 +14,15 @@ class EnrollView(APIView):
     The POST view for enrolling in a LabGroup.
     """
     permission_classes = (IsAuthenticated,)
+    # answered by the student threads when served over ASGI
+    student_pool_methods = ('GET',)
 
     def get(self, request):
         """
         Retrieve the enrollment status of the current user.
         """
         # get the student if they exist
-        try:
-            student = Student.objects.get(user=request.user.id)
-        except Student.DoesNotExist:
-            student = None
+        student = get_role(request).student
         # compile the data to be serialized
         data = {
             'user': request.user,
@@ -0,0 +1,82 @@
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api import exports, models, serializers
+from api.authentication import TokenAuthentication
+from api.permissions import IsInstructor
+
+
+class ExportJobCreateView(APIView):
+    """
+    The POST view for exporting an assignment CSV in the background.
+    """
+    permission_classes = (IsInstructor,)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Queue an export job for an assignment.
+        """
+        # get assignment from URI
+        try:
+            assignment = models.Assignment.objects.select_related('labgroup__instructor').get(id=kwargs['pk'])
+        except models.Assignment.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        # check if instructor owns the assignment
+        if assignment.labgroup.instructor.user_id != request.user.id:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        job = exports.create_job(assignment.labgroup.instructor, assignment)
+        serializer = serializers.ExportJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobView(RetrieveAPIView):
+    """
+    The retrieve view for polling the status of an export job.
+    """
+    lookup_field = 'pk'
+    serializer_class = serializers.ExportJobSerializer
+    permission_classes = (IsInstructor,)
+
+    def get_queryset(self):
+        return models.ExportJob.objects.filter(instructor__user=self.request.user)
+
+    def get_object(self):
+        # a job orphaned by a crashed worker is reported failed instead of pending forever
+        exports.fail_stale_jobs(self.get_queryset().filter(pk=self.kwargs['pk']))
+        return super(ExportJobView, self).get_object()
+
+
+class ExportJobDownloadView(APIView):
+    """
+    The GET view for downloading the CSV built by an export job.
+    """
+    authentication_classes = (SessionAuthentication, TokenAuthentication)
+    permission_classes = (IsInstructor,)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Download the artifact of a finished export job.
+        """
+        try:
+            job = models.ExportJob.objects \
+                .select_related('assignment__assignment_template', 'assignment__labgroup') \
+                .get(id=kwargs['pk'], instructor__user=request.user)
+        except models.ExportJob.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        # the artifact only exists once the job is done
+        if job.status != models.ExportJob.DONE:
+            return Response(status=status.HTTP_409_CONFLICT)
+        try:
+            artifact = open(exports.artifact_path(job.assignment_id, job.data_version), 'rb')
+        except FileNotFoundError:
+            return Response(status=status.HTTP_410_GONE)
+        response = FileResponse(artifact, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="{}-{}-{}.csv"'.\
+            format(job.assignment.assignment_template.name,
+                   job.assignment.labgroup.group_name,
+                   job.assignment.labgroup.term)
+        return response
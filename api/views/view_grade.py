@@ -0,0 +1,28 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api import grading, models
+from api.permissions import IsInstructor
+
+
+class AssignmentGradeView(APIView):
+    """
+    The POST view for grading every task entry of an assignment.
+    """
+    permission_classes = (IsInstructor,)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Regrade an assignment.
+        """
+        # get assignment from URI
+        try:
+            assignment = models.Assignment.objects.select_related('labgroup__instructor').get(id=kwargs['pk'])
+        except models.Assignment.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        # check if instructor owns the assignment
+        if assignment.labgroup.instructor.user_id != request.user.id:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        graded = grading.grade_assignment(assignment)
+        return Response({'graded': graded}, status=status.HTTP_200_OK)
@@ -2,12 +2,15 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 
 from api import serializers
-from api.models import LabGroup, Instructor
+from api.conditional import ConditionalListMixin
+from api.models import LabGroup
+from api.roles import get_role
+from api.routers import ReplicaReadMixin
 
 from datetime import date
 
 
-class LabGroupLCView(ListCreateAPIView):
+class LabGroupLCView(ReplicaReadMixin, ConditionalListMixin, ListCreateAPIView):
     """
     The list create view for labgroups.
     """
@@ -17,15 +20,15 @@ class LabGroupLCView(ListCreateAPIView):
 
     def get_serializer_class(self):
         # only return the enroll_key if the user is an instructor
-        if self.request.user.groups.filter(name='Instructor').exists():
+        if get_role(self.request).in_group('Instructor'):
             return serializers.LabGroupFullSerializer
         return serializers.LabGroupPartialSerializer
 
     def get_queryset(self):
         # only return labgroups that belong to the querying instructor
-        if self.request.user.groups.filter(name='Instructor').exists():
-            instructor = Instructor.objects.get(user = self.request.user.id)
-            return LabGroup.objects.filter(term=get_current_term(), instructor=instructor.id)
+        role = get_role(self.request)
+        if role.in_group('Instructor'):
+            return LabGroup.objects.filter(term=get_current_term(), instructor=role.instructor.id)
         return LabGroup.objects.filter(term=get_current_term())
 
     def list(self, request, *args, **kwargs):
@@ -43,7 +46,7 @@ class LabGroupRUDView(RetrieveUpdateDestroyAPIView):
     lookup_field = 'pk'
 
     def get_serializer_class(self):
-        if self.request.user.groups.filter(name='Instructor').exists():
+        if get_role(self.request).in_group('Instructor'):
             return serializers.LabGroupFullSerializer
         return serializers.LabGroupPartialSerializer
 
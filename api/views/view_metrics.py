@@ -0,0 +1,29 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api import db, metrics
+
+
+class MetricsView(APIView):
+    """
+    The GET view for the query counts and latencies of the most recent requests.
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        """
+        List the metrics of recent requests along with a summary of every view and
+        the connection reuse of the worker process answering.
+        """
+        records = metrics.recent()
+        # only list the requests to one view if asked to
+        view = request.query_params.get('view')
+        if view is not None:
+            records = [record for record in records if record.view == view]
+        return Response({
+            'views': metrics.summarize(records),
+            'requests': [record.as_dict() for record in records],
+            'connections': db.connection_stats(),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,42 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api import models, roster
+from api.permissions import IsInstructor
+
+
+class LabGroupRosterView(APIView):
+    """
+    The POST view for enrolling a roster of students in a labgroup.
+    """
+    permission_classes = (IsInstructor,)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Import a roster uploaded as a CSV file or as a JSON list of students.
+        """
+        # get labgroup from URI
+        try:
+            labgroup = models.LabGroup.objects.select_related('instructor').get(id=kwargs['pk'])
+        except models.LabGroup.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        # check if instructor owns the labgroup
+        if labgroup.instructor.user_id != request.user.id:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        # read the roster
+        if 'roster' in request.FILES:
+            try:
+                rows = roster.read_csv(request.FILES['roster'])
+            except (UnicodeDecodeError, ValueError):
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            rows = request.data.get('students')
+        if not isinstance(rows, list):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        enrolled, errors = roster.import_roster(labgroup, rows)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'enrolled': enrolled}, status=status.HTTP_201_CREATED)
@@ -1,9 +1,34 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework import status
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from datetime import datetime
+from pytz import timezone
 
 from api import serializers
-from api.models import TaskEntry, Assignment, AssignmentEntry
+from api.models import TaskEntry, TaskTemplate, AssignmentEntry
 from api.permissions import IsStudent
+from api.roles import get_role
+
+
+# the attempts a task entry may record when its task template does not limit them
+UNLIMITED_ATTEMPTS = 2 ** 31 - 1
+
+
+def has_attempts_left():
+    """
+    Returns a filter for task entries that have not used every attempt their
+    task template allows. The limit is read with a subquery so that an
+    update filtered by it is a single UPDATE on every database.
+    """
+    attempts_allowed = TaskTemplate.objects.filter(id=OuterRef('task_template_id')).values('attempts_allowed')[:1]
+    return Q(attempts__lt=Coalesce(Subquery(attempts_allowed), Value(UNLIMITED_ATTEMPTS)))
 
 
 class TaskEntryLCView(ListCreateAPIView):
@@ -13,9 +38,13 @@ class TaskEntryLCView(ListCreateAPIView):
     permission_classes = (DjangoModelPermissions, IsStudent)
     serializer_class = serializers.TaskEntrySerializer
     lookup_field = 'pk'
+    # answered by the student threads when served over ASGI
+    student_pool_methods = ('GET', 'POST')
 
     def get_queryset(self):
-        return TaskEntry.objects.filter(assignment_entry=AssignmentEntry.objects.get(assignment=self.kwargs['assignment']))
+        # the task entries of the requesting student's entry, found through a join
+        return TaskEntry.objects.filter(assignment_entry__student=get_role(self.request).student,
+                                        assignment_entry__assignment=self.kwargs['assignment']).order_by('id')
 
     def list(self, request, *args, **kwargs):
         response = super(TaskEntryLCView, self).list(request, *args, **kwargs)
@@ -24,6 +53,10 @@ class TaskEntryLCView(ListCreateAPIView):
         }
         return response
 
+    def perform_create(self, serializer):
+        # the first answer is the first attempt
+        serializer.save(attempts=1)
+
 
 class TaskEntryRUDView(RetrieveUpdateDestroyAPIView):
     """
@@ -35,3 +68,103 @@ class TaskEntryRUDView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         return TaskEntry.objects.all()
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        task_entry = self.get_object()
+        serializer = self.get_serializer(task_entry, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        current_time = datetime.now(timezone(settings.TIME_ZONE))
+        raw_input = serializer.validated_data.get('raw_input', task_entry.raw_input)
+        # record a changed answer as an attempt only if the task allows another one
+        recorded = TaskEntry.objects.filter(has_attempts_left(), id=task_entry.id).exclude(raw_input=raw_input) \
+            .update(attempts=F('attempts') + 1, modified=current_time, **serializer.validated_data)
+        # saving the same answer again, such as when the frontend autosaves, does not use an attempt
+        if not recorded:
+            recorded = TaskEntry.objects.filter(id=task_entry.id, raw_input=raw_input) \
+                .update(modified=current_time, **serializer.validated_data)
+        if not recorded:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        task_entry.refresh_from_db()
+        return Response(self.get_serializer(task_entry).data)
+
+
+class TaskEntryBatchView(APIView):
+    """
+    The batch save view for task entries.
+    """
+    permission_classes = (IsStudent,)
+    # answered by the student threads when served over ASGI
+    student_pool_methods = ('POST',)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Save the answers to many tasks of an assignment at once.
+        """
+        rows = request.data if isinstance(request.data, list) else request.data.get('task_entries')
+        if not isinstance(rows, list):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        # validate every answer
+        answers = {}
+        errors = []
+        for row_num, row in enumerate(rows, 1):
+            serializer = serializers.TaskEntryBatchSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({'row': row_num, 'errors': serializer.errors})
+            elif serializer.validated_data['task_template'] in answers:
+                errors.append({'row': row_num, 'errors': {'task_template': ['This task is already in the batch.']}})
+            else:
+                answers[serializer.validated_data['task_template']] = serializer.validated_data['raw_input']
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        current_time = datetime.now(timezone(settings.TIME_ZONE))
+        with transaction.atomic():
+            # lock the entry so batches from the same student are saved one at a time
+            try:
+                assignment_entry = AssignmentEntry.objects.select_for_update().select_related('assignment') \
+                    .get(student=get_role(request).student, assignment=kwargs['assignment'])
+            except AssignmentEntry.DoesNotExist:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            assignment = assignment_entry.assignment
+            if assignment.open_date > current_time or assignment.close_date < current_time:
+                return Response(status=status.HTTP_403_FORBIDDEN)
+            if assignment_entry.submit_date is not None:
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+            # every task has to belong to the assignment
+            templates = set(TaskTemplate.objects
+                            .filter(id__in=answers, assignment_template=assignment.assignment_template_id)
+                            .values_list('id', flat=True))
+            errors = [{'row': row_num, 'errors': {'task_template': ['This task is not part of the assignment.']}}
+                      for row_num, template_id in enumerate(answers, 1) if template_id not in templates]
+            if errors:
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            task_entries = TaskEntry.objects.filter(assignment_entry=assignment_entry, task_template__in=answers)
+            # a changed answer takes another attempt, so nothing is saved if any of them has none left
+            rows = {template_id: row_num for row_num, template_id in enumerate(answers, 1)}
+            existing = set()
+            for template_id, raw_input, attempts, attempts_allowed in \
+                    task_entries.values_list('task_template_id', 'raw_input', 'attempts',
+                                             'task_template__attempts_allowed'):
+                existing.add(template_id)
+                if raw_input != answers[template_id] and attempts_allowed is not None \
+                        and attempts >= attempts_allowed:
+                    errors.append({'row': rows[template_id],
+                                   'errors': {'raw_input': ['Every allowed attempt has been used.']}})
+            if errors:
+                return Response({'errors': sorted(errors, key=lambda error: error['row'])},
+                                status=status.HTTP_403_FORBIDDEN)
+            # update the changed answers that were saved before, counting an attempt for each
+            if existing:
+                raw_input = Case(*[When(task_template=template_id, then=Value(answers[template_id]))
+                                   for template_id in existing], default=F('raw_input'))
+                task_entries.filter(has_attempts_left()).exclude(raw_input=raw_input) \
+                    .update(raw_input=raw_input, attempts=F('attempts') + 1, modified=current_time)
+            # insert the answers saved for the first time
+            TaskEntry.objects.bulk_create(TaskEntry(assignment_entry=assignment_entry,
+                                                    task_template_id=template_id,
+                                                    attempts=1,
+                                                    raw_input=raw_input)
+                                          for template_id, raw_input in answers.items() if template_id not in existing)
+        # response
+        serialized_task_entries = serializers.TaskEntrySerializer(task_entries.order_by('id'), many=True)
+        return Response({'task_entry': serialized_task_entries.data}, status=status.HTTP_200_OK)
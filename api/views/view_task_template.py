@@ -3,12 +3,13 @@ from rest_framework.permissions import DjangoModelPermissions
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
-from api import serializers
+from api import grading, serializers
 from api.models import AssignmentTemplate, TaskTemplate
 from api.permissions import IsStudentOrInstructor
+from api.routers import ReplicaReadMixin
 
 
-class TaskTemplateLCView(ListCreateAPIView):
+class TaskTemplateLCView(ReplicaReadMixin, ListCreateAPIView):
     """
     The list create view for TaskTemplates.
     """
@@ -54,3 +55,10 @@ class TaskTemplateRUDView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         return TaskTemplate.objects.all()
+
+    def perform_update(self, serializer):
+        tolerance = (serializer.instance.variable, serializer.instance.numeric_accuracy)
+        task_template = serializer.save()
+        # regrade the answers to this task if how they are graded changed
+        if (task_template.variable, task_template.numeric_accuracy) != tolerance:
+            grading.grade_assignment_template(task_template)
@@ -0,0 +1,24 @@
+"""
+ASGI config for chem_lab_server project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with any ASGI server, for example:
+
+    uvicorn chem_lab_server.asgi:application
+
+Django 2 only speaks WSGI, so the ASGI server holds every connection open on
+its event loop while the Django application runs on a bounded thread pool.
+Some of its threads are kept for the student views of a lab session, those
+listing the request method in ``student_pool_methods``, so slow exports can
+never take every thread.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from chem_lab_server.asgi_handler import ASGIHandler
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chem_lab_server.settings")
+
+application = ASGIHandler(get_wsgi_application())
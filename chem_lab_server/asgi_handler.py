@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import io
+import sys
+
+
+class ASGIHandler:
+    """
+    Serves a WSGI application over ASGI. The request body is read on the
+    event loop, then the application runs on a worker thread and sends its
+    response back to the loop one chunk at a time, so streamed responses
+    stay streamed.
+
+    Student requests may run on any thread of the pool, while other requests
+    are held back on the loop once they would take the threads kept for
+    students.
+    """
+    def __init__(self, wsgi_application, threads=None, student_threads=None):
+        self.wsgi_application = wsgi_application
+        threads = settings.ASGI_THREADS if threads is None else threads
+        student_threads = settings.ASGI_STUDENT_THREADS if student_threads is None else student_threads
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='asgi')
+        # other requests never take the threads kept for students, who can use every thread
+        self.other_threads = max(1, threads - student_threads)
+        self.other_requests = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError('Cannot serve {} connections.'.format(scope['type']))
+        body = io.BytesIO()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        loop = asyncio.get_event_loop()
+        if self.is_student_request(scope):
+            await loop.run_in_executor(self.executor, self.run, self.environ(scope, body), loop, send)
+            return
+        if self.other_requests is None:
+            self.other_requests = asyncio.Semaphore(self.other_threads)
+        async with self.other_requests:
+            await loop.run_in_executor(self.executor, self.run, self.environ(scope, body), loop, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # let the requests being answered finish
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, self.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def is_student_request(self, scope):
+        """
+        Returns whether a request is answered by a view that lists its method in student_pool_methods.
+        """
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return False
+        view_class = getattr(match.func, 'view_class', None)
+        return scope['method'] in getattr(view_class, 'student_pool_methods', ())
+
+    def environ(self, scope, body):
+        """
+        Returns the WSGI environ of an ASGI http request.
+        """
+        script_name = scope.get('root_path', '').encode('utf-8').decode('latin-1')
+        path_info = scope['path'].encode('utf-8').decode('latin-1')
+        if path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': script_name,
+            'PATH_INFO': path_info,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+            'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', ()):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_{}'.format(name)
+            # repeated headers are joined into one, cookies the way a single cookie header lists them
+            if name in environ:
+                value = '{}{}{}'.format(environ[name], '; ' if name == 'HTTP_COOKIE' else ',', value)
+            environ[name] = value
+        return environ
+
+    def run(self, environ, loop, send):
+        """
+        Runs the WSGI application on a worker thread and sends its response through the event loop.
+        """
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start.update({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+
+        response = self.wsgi_application(environ, start_response)
+        try:
+            started = False
+            for chunk in response:
+                if not chunk:
+                    continue
+                if not started:
+                    send_message(response_start)
+                    started = True
+                send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                send_message(response_start)
+            send_message({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            # closing the response is what tells Django the request finished
+            if hasattr(response, 'close'):
+                response.close()
+
@@ -8,8 +8,25 @@
 # MYSQL_PASSWORD - MySQL password. Defaults to 'root'.
 # MYSQL_HOST - MySQL host. Defaults to '127.0.0.1'.
 # MYSQL_PORT - MySQL port. Defaults to '8889'.
+# MYSQL_REPLICA_HOST - MySQL host of a read replica for the list and export views. Defaults to no replica.
+# MYSQL_REPLICA_PORT - MySQL port of the read replica. Defaults to MYSQL_PORT.
+# DJANGO_REPLICA_STICKY_SECONDS - Seconds a user keeps reading from the primary after changing data, which has to cover the replication lag. Defaults to 10.
+# DJANGO_DB_CONN_MAX_AGE - Seconds a worker thread keeps its database connection open between requests. Use 0 to open a new connection for every request and -1 to keep connections open indefinitely. Defaults to 60.
+# DJANGO_DB_HEALTH_CHECKS - Use 0 to reuse persistent connections without checking them first. Defaults to 1.
+# DJANGO_EXPORT_ROOT - Directory for cached export artifacts, which must be writable by the user the server runs as. Only the latest artifact of each assignment is kept. Defaults to 'exports' in the project directory, which the Docker image creates for its django user.
+# DJANGO_EXPORT_WORKERS - Number of threads building export artifacts. Use 0 to build them in the request. Defaults to 2.
+# DJANGO_EXPORT_JOB_TIMEOUT - Seconds after which an export job still pending or running is marked failed, such as when its worker was restarted. Defaults to 600.
+# DJANGO_CACHE_BACKEND - Cache backend shared by every worker process, holding replica stickiness and, when DJANGO_ROLE_CACHE_TTL is set, resolved roles. Use 'django.core.cache.backends.memcached.MemcachedCache' to keep it out of the database. Defaults to the database cache.
+# DJANGO_CACHE_LOCATION - Location of the cache, the table of the database cache or 'host:port' for memcached. Defaults to 'api_cache'.
+# DJANGO_ROLE_CACHE_TTL - Seconds a user's resolved role is cached between requests. Only worth setting with memcached, reading the database cache costs as much as resolving the role. Defaults to 0, resolving it once per request.
+# DJANGO_PASSWORD_HASH_WORKERS - Processes hashing passwords for bulk registration. Use 1 to hash them in the request. Defaults to the number of CPUs.
+# DJANGO_ASGI_THREADS - Threads answering requests when served over ASGI. Defaults to 4.
+# DJANGO_ASGI_STUDENT_THREADS - Of the ASGI threads, how many other requests leave free for the student lab session views. Use 0 to keep none. Defaults to 2.
+# DJANGO_METRICS_BUFFER_SIZE - Number of recent requests whose metrics are kept for the metrics view. Defaults to 1000.
+# DJANGO_QUERY_BUDGET_STRICT - Use 1 to fail requests that go over their query budget instead of logging them. Defaults to 1 when running tests.
 
 import os
+import sys
 import datetime
 
 
@@ -32,10 +49,52 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'dev')
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ROOT_URLCONF = 'chem_lab_server.urls'
 WSGI_APPLICATION = 'chem_lab_server.wsgi.application'
+ASGI_THREADS = int(os.getenv('DJANGO_ASGI_THREADS', 4))
+ASGI_STUDENT_THREADS = int(os.getenv('DJANGO_ASGI_STUDENT_THREADS', 2))
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 STATIC_URL = '/static/'
 CORS_ORIGIN_ALLOW_ALL = True
 
+# exports
+EXPORT_ROOT = os.getenv('DJANGO_EXPORT_ROOT', os.path.join(BASE_DIR, 'exports'))
+EXPORT_WORKERS = int(os.getenv('DJANGO_EXPORT_WORKERS', 2))
+EXPORT_JOB_TIMEOUT = int(os.getenv('DJANGO_EXPORT_JOB_TIMEOUT', 600))
+
+# cache, which every uwsgi worker has to share so a change seen by one worker is seen by all of them
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'api_cache'),
+    }
+}
+
+# roles
+ROLE_CACHE_TTL = int(os.getenv('DJANGO_ROLE_CACHE_TTL', 0))
+
+# registration
+PASSWORD_HASH_WORKERS = int(os.getenv('DJANGO_PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+
+# request metrics
+METRICS_BUFFER_SIZE = int(os.getenv('DJANGO_METRICS_BUFFER_SIZE', 1000))
+QUERY_BUDGET_STRICT = os.getenv('DJANGO_QUERY_BUDGET_STRICT', '1' if sys.argv[1:2] == ['test'] else '0') == '1'
+# the most queries a request to each view may make
+QUERY_BUDGETS = {
+    'api:assignment-csv': 8,
+    'api:assignment-entry-start': 9,
+    'api:assignment-entry-submit': 5,
+    'api:assignment-lc': 10,
+    'api:enroll': 11,
+    'api:gradebook-zip': 7,
+    'api:lab-group-csv': 7,
+    'api:lab-group-lc': 10,
+    'api:lab-group-roster': 14,
+    'api:task-entry-batch': 11,
+    'api:task-entry-lc': 9,
+    'api:task-entry-rud': 11,
+    'api:template-lc': 7,
+    'register:register-bulk': 7,
+}
+
 # time and language
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -44,6 +103,8 @@ USE_L10N = True
 USE_TZ = True
 
 # databases
+DB_CONN_MAX_AGE = int(os.getenv('DJANGO_DB_CONN_MAX_AGE', 60))
+DB_HEALTH_CHECKS = os.getenv('DJANGO_DB_HEALTH_CHECKS', '1') == '1'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.mysql',
@@ -55,12 +116,23 @@ DATABASES = {
         'OPTIONS': {
             'sql_mode': 'traditional',
         },
+        # every uwsgi worker thread keeps one connection, so the server holds up to processes * threads of them
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE if DB_CONN_MAX_AGE >= 0 else None,
         'TEST': {
             'CHARSET': 'utf8mb4',
             'COLLATION': 'utf8mb4_unicode_ci',
         },
     },
 }
+if os.getenv('MYSQL_REPLICA_HOST'):
+    DATABASES['replica'] = dict(DATABASES['default'],
+                                HOST=os.getenv('MYSQL_REPLICA_HOST'),
+                                PORT=os.getenv('MYSQL_REPLICA_PORT', DATABASES['default']['PORT']),
+                                TEST={'MIRROR': 'default'})
+# reads of the list and export views go to the replica when there is one
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+REPLICA_STICKY_SECONDS = int(os.getenv('DJANGO_REPLICA_STICKY_SECONDS', 10))
 
 # django setup
 INSTALLED_APPS = [
@@ -76,6 +148,8 @@ INSTALLED_APPS = [
     'api',
 ]
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.routers.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -115,6 +189,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
         'rest_framework.permissions.DjangoModelPermissions',
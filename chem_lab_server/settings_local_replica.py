@@ -0,0 +1,31 @@
+# Local settings for trying out the read replica without setting up MySQL replication. The primary is a SQLite
+# database and the replica is a read-only connection to the same file, so any write routed to the replica fails.
+#
+# python manage.py migrate --settings=chem_lab_server.settings_local_replica
+# python manage.py runserver --settings=chem_lab_server.settings_local_replica
+#
+#
+# --Environment Variables--
+# DJANGO_SQLITE_PATH - Path of the SQLite database. Defaults to 'db.sqlite3' in the project directory.
+
+from chem_lab_server.settings import *  # noqa: F401,F403
+
+
+SQLITE_PATH = os.getenv('DJANGO_SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3'))
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': SQLITE_PATH,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'file:{}?mode=ro'.format(SQLITE_PATH),
+        'OPTIONS': {
+            'uri': True,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+REPLICA_DATABASE = 'replica'
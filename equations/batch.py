@@ -0,0 +1,143 @@
+"""
+NumPy backed batch variants of the lab equations.
+
+Every function takes the same parameters as its scalar counterpart in
+equations.equations, but each parameter may be a scalar, a list, or an array
+of measurements, one per row. The results are arrays holding exactly what the
+scalar function returns for each row, evaluated in the same order of
+operations. Rows that would raise ZeroDivisionError in the scalar function
+produce inf or nan instead, and every check is False for those rows.
+"""
+import functools
+
+import numpy as np
+
+
+def vectorized(func):
+    """
+    Converts every argument of func to a float array and silences the floating
+    point warnings numpy raises for rows that divide by zero.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        args = [np.asarray(arg, dtype=np.float64) for arg in args]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return func(*args)
+    return wrapper
+
+
+@vectorized
+def true_ph(barometric_pressure, water_vapor_pressure, height_of_liquid_column):
+    """
+    :param barometric_pressure: array - the barometric pressures
+    :param water_vapor_pressure: array - the water vapor pressures
+    :param height_of_liquid_column: array - the heights of the liquid columns
+    """
+    return barometric_pressure - water_vapor_pressure - (height_of_liquid_column / 13.6)
+
+
+@vectorized
+def true_moles(true_ph, initial_mensicus_level, final_mensicus_level, room_temperature):
+    """
+    :param true_ph: array - the true phs
+    :param initial_mensicus_level: array - the initial meniscus levels
+    :param final_mensicus_level: array - the final meniscus levels
+    :param room_temperature: array - the temperatures of the rooms in celsius
+    """
+    return 0.000016034 * true_ph * (initial_mensicus_level - final_mensicus_level) / (273.15 + room_temperature)
+
+
+@vectorized
+def true_avag(average_current, total_time, true_moles):
+    return 3121000000000000000 * average_current * total_time / true_moles
+
+
+@vectorized
+def avag_check(avagt, true_avag, electrons_per_mole):
+    return np.abs(electrons_per_mole - true_avag) < 4500000000000000000000
+
+
+@vectorized
+def ph_check(phydrogent, hydrogen_pressure, true_ph):
+    return np.abs(hydrogen_pressure - true_ph) < 0.24
+
+
+@vectorized
+def mole_check(moles_hydrogen, true_moles):
+    return np.abs(moles_hydrogen - true_moles) < 0.0000022
+
+
+@vectorized
+def true_ka(a_acid, a_buffer, a_base):
+    return 0.0000977 * (a_acid - a_buffer) / a_buffer - a_base
+
+
+@vectorized
+def ka_check(ka, true_ka):
+    return np.abs(ka - true_ka) < 0.00002
+
+
+@vectorized
+def mgTi(mg_reaction_initiation_time, mg_slope_before_addition, mg_intercept_before_addition):
+    return mg_reaction_initiation_time * mg_slope_before_addition + mg_intercept_before_addition
+
+
+@vectorized
+def calorimeter_constant_lab(reaction_initiation_time, cc_slope_after_addition, cc_intercept_after_addition):
+    return reaction_initiation_time * cc_slope_after_addition + cc_intercept_after_addition
+
+
+@vectorized
+def final_temp_check(final_temperature, true_final_temperature):
+    return np.abs(final_temperature - true_final_temperature) < 0.02
+
+
+@vectorized
+def ccal_true(oxalic_acid_mass, cctf, ccti, na_oh_mass):
+    return (663.76 * oxalic_acid_mass / (cctf - ccti)) - 4.04 * oxalic_acid_mass + na_oh_mass
+
+
+@vectorized
+def ccal_check(calorimeter_constant, ccal_true):
+    return np.abs(calorimeter_constant - ccal_true) < 1.2
+
+
+@vectorized
+def molar_mg_enthalpy_equation(magnesium_mass, mg_hci_mass, ccal_true, mgtf, mgti):
+    return -0.024305 * ((magnesium_mass + mg_hci_mass) * 3.68 + ccal_true) * mgtf - mgti / magnesium_mass
+
+
+@vectorized
+def enthalpy_check(mg_molar_enthalpy, mgenthalpy):
+    return np.abs(mg_molar_enthalpy - mgenthalpy) < 2
+
+
+@vectorized
+def mgo_enthalpy(mgo_mass, mgo_hcl_mass, ccal_true, mgotf, mgoti):
+    return -0.040304 * ((mgo_mass + mgo_hcl_mass) * 3.86 + ccal_true) * (mgotf - mgoti) / mgo_mass
+
+
+@vectorized
+def enthalpy_check_mgo(mgo_molar_enthalpy, mgoenthalpy):
+    return np.abs(mgo_molar_enthalpy - mgoenthalpy) < 1
+
+
+@vectorized
+def true_wavelength_equation(distance_along_white_board, distance_to_white_board):
+    return 833.333 * distance_along_white_board / np.sqrt(distance_to_white_board * distance_to_white_board +
+                                                          distance_along_white_board * distance_along_white_board)
+
+
+@vectorized
+def wave_length_check(calculated_wavelength, true_wavelength):
+    return np.abs(calculated_wavelength - true_wavelength) < 0.6
+
+
+@vectorized
+def true_photon_energy(wavelength):
+    return 0.0000000000000001986449 / wavelength
+
+
+@vectorized
+def energy_check(energy, true_energy):
+    return np.abs(energy - true_energy) < 0.00000000000000000002
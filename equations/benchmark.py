@@ -0,0 +1,62 @@
+"""
+Compares the scalar lab equations with their batch variants.
+
+Run with:
+
+    python -m equations.benchmark [rows ...]
+
+Each equation is evaluated over randomly generated columns, once row by row
+through equations.equations and once through equations.batch, and the timings
+and speedup are printed for every row count.
+"""
+import sys
+import time
+
+import numpy as np
+
+from equations import batch, equations
+
+
+# equation name and number of parameters
+BENCHMARKS = (
+    ('true_ph', 3),
+    ('true_moles', 4),
+    ('true_avag', 3),
+    ('ccal_true', 4),
+    ('mgo_enthalpy', 5),
+    ('true_wavelength_equation', 2),
+    ('wave_length_check', 2),
+)
+
+
+def best_of(repeat, func, *args):
+    """
+    Returns the fastest of repeat timings of func(*args) in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scalar_loop(func, columns):
+    return [func(*row) for row in zip(*columns)]
+
+
+def run(row_counts):
+    random = np.random.RandomState(450)
+    print('{:<28}{:>10}{:>14}{:>14}{:>10}'.format('equation', 'rows', 'scalar (s)', 'batch (s)', 'speedup'))
+    for rows in row_counts:
+        for name, parameters in BENCHMARKS:
+            columns = [random.uniform(1.0, 100.0, rows) for _ in range(parameters)]
+            # the scalar functions are fed plain floats, as they would be outside of numpy
+            scalar_columns = [column.tolist() for column in columns]
+            scalar = best_of(1 if rows > 100000 else 3, scalar_loop, getattr(equations, name), scalar_columns)
+            vector = best_of(3, getattr(batch, name), *columns)
+            print('{:<28}{:>10}{:>14.4f}{:>14.4f}{:>9.0f}x'.format(name, rows, scalar, vector, scalar / vector))
+
+
+if __name__ == '__main__':
+    run([int(rows) for rows in sys.argv[1:]] or [10000, 1000000])
@@ -132,7 +132,7 @@ def enthalpy_check_mgo(mgo_molar_enthalpy,mgoenthalpy):
     return False
 
 def true_wavelength_equation(distance_along_white_board,distance_to_white_board):
-    return(833.333*distance_along_white_board/(math.sqrt(distance_to_white_board**2+distance_along_white_board**2)))
+    return(833.333*distance_along_white_board/(math.sqrt(distance_to_white_board*distance_to_white_board+distance_along_white_board*distance_along_white_board)))
 
 def wave_length_check(calculated_wavelength,true_wavelength):
     if(abs(calculated_wavelength-true_wavelength)<0.6):
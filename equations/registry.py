@@ -0,0 +1,220 @@
+"""
+A declarative registry of the lab equations.
+
+Every equation is registered with the names of the values it reads and the
+name of the value it produces, which links the equations into a dependency
+graph. A caller supplies the raw lab measurements and student answers once
+and gets back every value that can be derived from them, including the result
+of every check. Each value is computed at most once per evaluation, so an
+intermediate such as ccal_true is shared by every equation that needs it.
+"""
+from collections import OrderedDict
+
+from equations import batch, equations
+
+
+class Node:
+    """
+    An equation or check in the registry.
+
+    :param name: string - the name of the value the node produces
+    :param func: function - the scalar equation
+    :param inputs: tuple - the value names passed positionally to func, None for unused parameters
+    :param batch_func: function - the batch variant of func
+    :param answer: string - for checks, the name of the student's answer
+    :param expected: string - for checks, the name of the value the answer is compared to
+    """
+    def __init__(self, name, func, inputs, batch_func=None, answer=None, expected=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.batch_func = batch_func
+        self.answer = answer
+        self.expected = expected
+
+    @property
+    def is_check(self):
+        return self.answer is not None
+
+    @property
+    def dependencies(self):
+        return [value for value in self.inputs if value is not None]
+
+
+class Registry:
+    """
+    A dependency graph of equations.
+    """
+    def __init__(self):
+        self.nodes = OrderedDict()
+        self._order = None
+
+    def register(self, name, func, inputs, batch_func=None, answer=None, expected=None):
+        """
+        Adds an equation to the registry.
+        """
+        if name in self.nodes:
+            raise ValueError('{} is already registered'.format(name))
+        self.nodes[name] = Node(name, func, inputs, batch_func, answer, expected)
+        self._order = None
+        return self.nodes[name]
+
+    def check(self, name, func, inputs, answer, expected, batch_func=None):
+        """
+        Adds a check comparing a student's answer to an expected value to the registry.
+        """
+        return self.register(name, func, inputs, batch_func, answer, expected)
+
+    @property
+    def checks(self):
+        return [node for node in self.nodes.values() if node.is_check]
+
+    @property
+    def names(self):
+        """
+        Returns the name of every value the registry reads or produces.
+        """
+        names = set(self.nodes)
+        for node in self.nodes.values():
+            names.update(node.dependencies)
+        return names
+
+    @property
+    def inputs(self):
+        """
+        Returns the name of every value the registry reads without producing
+        it, the measurements and answers a student supplies.
+        """
+        return self.names - set(self.nodes)
+
+    def order(self):
+        """
+        Returns the nodes sorted so every node comes after the nodes it depends on.
+        """
+        if self._order is None:
+            order = []
+            state = {}
+
+            def visit(node, path):
+                if state.get(node.name) == 'done':
+                    return
+                if state.get(node.name) == 'visiting':
+                    raise ValueError('equations form a cycle: {}'.format(' -> '.join(path + [node.name])))
+                state[node.name] = 'visiting'
+                for dependency in node.dependencies:
+                    if dependency in self.nodes:
+                        visit(self.nodes[dependency], path + [node.name])
+                state[node.name] = 'done'
+                order.append(node)
+
+            for node in self.nodes.values():
+                visit(node, [])
+            self._order = order
+        return self._order
+
+    def requirements(self, name):
+        """
+        Returns the names of the supplied values that a value is derived from.
+        """
+        if name not in self.nodes:
+            return {name}
+        required = set()
+        for dependency in self.nodes[name].dependencies:
+            required |= self.requirements(dependency)
+        return required
+
+    def ancestors(self, names):
+        """
+        Returns the names of the nodes needed to compute the given values, including the values themselves.
+        """
+        needed = set()
+        pending = [name for name in names if name in self.nodes]
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            pending.extend(dependency for dependency in self.nodes[name].dependencies if dependency in self.nodes)
+        return needed
+
+    def evaluate(self, values, targets=None, batch=False):
+        """
+        Computes every value that can be derived from the supplied values.
+
+        Supplied values are never overwritten, and nodes missing one of their
+        inputs are skipped along with everything downstream of them.
+
+        :param values: dict - the raw measurements and answers by name
+        :param targets: iterable - only compute what these values need, defaults to everything
+        :param batch: boolean - the values are columns and the batch variants are used
+        :return: dict - the supplied values along with every derived value
+        """
+        results = dict(values)
+        needed = self.ancestors(targets) if targets is not None else None
+        for node in self.order():
+            if node.name in results or (needed is not None and node.name not in needed):
+                continue
+            if any(dependency not in results for dependency in node.dependencies):
+                continue
+            func = node.batch_func if batch else node.func
+            if func is None:
+                raise ValueError('{} has no batch variant'.format(node.name))
+            results[node.name] = func(*[results[value] if value is not None else None for value in node.inputs])
+        return results
+
+
+registry = Registry()
+
+# hydrogen gas lab
+registry.register('true_ph', equations.true_ph,
+                  ('barometric_pressure', 'water_vapor_pressure', 'height_of_liquid_column'),
+                  batch.true_ph)
+registry.check('ph_check', equations.ph_check, (None, 'hydrogen_pressure', 'true_ph'),
+               'hydrogen_pressure', 'true_ph', batch.ph_check)
+registry.register('true_moles', equations.true_moles,
+                  ('true_ph', 'initial_meniscus_level', 'final_meniscus_level', 'room_temperature'),
+                  batch.true_moles)
+registry.check('mole_check', equations.mole_check, ('moles_hydrogen', 'true_moles'),
+               'moles_hydrogen', 'true_moles', batch.mole_check)
+registry.register('true_avag', equations.true_avag, ('average_current', 'total_time', 'true_moles'),
+                  batch.true_avag)
+registry.check('avag_check', equations.avag_check, (None, 'true_avag', 'electrons_per_mole'),
+               'electrons_per_mole', 'true_avag', batch.avag_check)
+
+# equilibrium constant lab
+registry.register('true_ka', equations.true_ka, ('a_acid', 'a_buffer', 'a_base'), batch.true_ka)
+registry.check('ka_check', equations.ka_check, ('ka', 'true_ka'), 'ka', 'true_ka', batch.ka_check)
+
+# MgO enthalpy lab
+registry.register('mgti', equations.mgTi,
+                  ('mg_reaction_initiation_time', 'mg_slope_before_addition', 'mg_intercept_before_addition'),
+                  batch.mgTi)
+registry.register('cctf', equations.calorimeter_constant_lab,
+                  ('reaction_initiation_time', 'cc_slope_after_addition', 'cc_intercept_after_addition'),
+                  batch.calorimeter_constant_lab)
+registry.check('final_temp_check', equations.final_temp_check, ('final_temperature', 'cctf'),
+               'final_temperature', 'cctf', batch.final_temp_check)
+registry.register('ccal_true', equations.ccal_true, ('oxalic_acid_mass', 'cctf', 'ccti', 'na_oh_mass'),
+                  batch.ccal_true)
+registry.check('ccal_check', equations.ccal_check, ('calorimeter_constant', 'ccal_true'),
+               'calorimeter_constant', 'ccal_true', batch.ccal_check)
+registry.register('mg_enthalpy', equations.molar_mg_enthalpy_equation,
+                  ('magnesium_mass', 'mg_hcl_mass', 'ccal_true', 'mgtf', 'mgti'),
+                  batch.molar_mg_enthalpy_equation)
+registry.check('enthalpy_check', equations.enthalpy_check, ('mg_molar_enthalpy', 'mg_enthalpy'),
+               'mg_molar_enthalpy', 'mg_enthalpy', batch.enthalpy_check)
+registry.register('mgo_enthalpy', equations.mgo_enthalpy,
+                  ('mgo_mass', 'mgo_hcl_mass', 'ccal_true', 'mgotf', 'mgoti'),
+                  batch.mgo_enthalpy)
+registry.check('enthalpy_check_mgo', equations.enthalpy_check_mgo, ('mgo_molar_enthalpy', 'mgo_enthalpy'),
+               'mgo_molar_enthalpy', 'mgo_enthalpy', batch.enthalpy_check_mgo)
+
+# atomic spectra lab
+registry.register('true_wavelength', equations.true_wavelength_equation,
+                  ('distance_along_white_board', 'distance_to_white_board'),
+                  batch.true_wavelength_equation)
+registry.check('wave_length_check', equations.wave_length_check, ('calculated_wavelength', 'true_wavelength'),
+               'calculated_wavelength', 'true_wavelength', batch.wave_length_check)
+registry.register('true_energy', equations.true_photon_energy, ('true_wavelength',), batch.true_photon_energy)
+registry.check('energy_check', equations.energy_check, ('energy', 'true_energy'),
+               'energy', 'true_energy', batch.energy_check)
@@ -0,0 +1,201 @@
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from equations import batch, equations, registry
+
+
+class BatchEquationTest(SimpleTestCase):
+    """
+    Test cases for the batch variants of the lab equations.
+    """
+
+    def setUp(self):
+        self.rows = 1000
+        self.random = np.random.RandomState(450)
+
+    def columns(self, count, low=0.5, high=100.0):
+        return [self.random.uniform(low, high, self.rows) for _ in range(count)]
+
+    def assertMatchesScalar(self, name, columns):
+        """
+        Asserts that the batch variant of an equation returns exactly what the scalar equation returns for every row.
+        """
+        expected = [getattr(equations, name)(*row) for row in zip(*[column.tolist() for column in columns])]
+        result = getattr(batch, name)(*columns)
+        self.assertEqual(result.shape, (self.rows,))
+        self.assertTrue(np.array_equal(result, np.array(expected)), name)
+
+    def test_equations_match_scalar(self):
+        """
+        Tests that every batch equation matches its scalar equation.
+        """
+        for name, parameters in (('true_ph', 3),
+                                 ('true_moles', 4),
+                                 ('true_avag', 3),
+                                 ('true_ka', 3),
+                                 ('mgTi', 3),
+                                 ('calorimeter_constant_lab', 3),
+                                 ('molar_mg_enthalpy_equation', 5),
+                                 ('mgo_enthalpy', 5),
+                                 ('true_wavelength_equation', 2),
+                                 ('true_photon_energy', 1)):
+            self.assertMatchesScalar(name, self.columns(parameters))
+
+    def test_ccal_true_matches_scalar(self):
+        """
+        Tests that the batch calorimeter constant matches the scalar equation.
+        """
+        oxalic_acid_mass, na_oh_mass = self.columns(2)
+        ccti = self.random.uniform(20.0, 25.0, self.rows)
+        cctf = self.random.uniform(26.0, 30.0, self.rows)
+        self.assertMatchesScalar('ccal_true', [oxalic_acid_mass, cctf, ccti, na_oh_mass])
+
+    def test_checks_match_scalar(self):
+        """
+        Tests that every batch check matches its scalar check on both sides of its tolerance.
+        """
+        for name, tolerance, parameters in (('ph_check', 0.24, 3),
+                                            ('mole_check', 0.0000022, 2),
+                                            ('ka_check', 0.00002, 2),
+                                            ('final_temp_check', 0.02, 2),
+                                            ('ccal_check', 1.2, 2),
+                                            ('enthalpy_check', 2, 2),
+                                            ('enthalpy_check_mgo', 1, 2),
+                                            ('wave_length_check', 0.6, 2),
+                                            ('energy_check', 0.00000000000000000002, 2),
+                                            ('avag_check', 4500000000000000000000, 3)):
+            columns = self.columns(parameters)
+            # move the last column to within two tolerances of the one before it
+            columns[-1] = columns[-2] + self.random.uniform(-2, 2, self.rows) * tolerance
+            self.assertMatchesScalar(name, columns)
+
+    def test_scalar_arguments(self):
+        """
+        Tests that scalars are broadcast against the columns.
+        """
+        heights = np.array([0.0, 13.6, 27.2])
+        self.assertTrue(np.array_equal(batch.true_ph(700, 20, heights),
+                                       [equations.true_ph(700, 20, height) for height in heights.tolist()]))
+
+    def test_division_by_zero(self):
+        """
+        Tests that rows dividing by zero do not raise and fail their checks.
+        """
+        result = batch.true_avag([1.0, 1.0], [1.0, 1.0], [0.0, 2.0])
+        self.assertTrue(np.isinf(result[0]))
+        self.assertEqual(result[1], equations.true_avag(1.0, 1.0, 2.0))
+        self.assertFalse(batch.avag_check(0, [float('nan')], [1.0])[0])
+
+
+class RegistryTest(SimpleTestCase):
+    """
+    Test cases for evaluating the equation registry.
+    """
+
+    def setUp(self):
+        self.measurements = {
+            'oxalic_acid_mass': 1.5,
+            'reaction_initiation_time': 120.0,
+            'cc_slope_after_addition': -0.002,
+            'cc_intercept_after_addition': 29.1,
+            'ccti': 22.4,
+            'na_oh_mass': 50.2,
+            'magnesium_mass': 0.25,
+            'mg_hcl_mass': 100.1,
+            'mgtf': 30.5,
+            'mg_reaction_initiation_time': 60.0,
+            'mg_slope_before_addition': 0.001,
+            'mg_intercept_before_addition': 22.0,
+            'mgo_mass': 0.5,
+            'mgo_hcl_mass': 100.2,
+            'mgotf': 27.3,
+            'mgoti': 22.1,
+        }
+
+    def test_evaluate_chain(self):
+        """
+        Tests that every value derivable from the measurements is computed.
+        """
+        results = registry.registry.evaluate(self.measurements)
+        cctf = equations.calorimeter_constant_lab(120.0, -0.002, 29.1)
+        ccal_true = equations.ccal_true(1.5, cctf, 22.4, 50.2)
+        self.assertEqual(results['cctf'], cctf)
+        self.assertEqual(results['ccal_true'], ccal_true)
+        self.assertEqual(results['mgti'], equations.mgTi(60.0, 0.001, 22.0))
+        self.assertEqual(results['mg_enthalpy'],
+                         equations.molar_mg_enthalpy_equation(0.25, 100.1, ccal_true, 30.5, results['mgti']))
+        self.assertEqual(results['mgo_enthalpy'], equations.mgo_enthalpy(0.5, 100.2, ccal_true, 27.3, 22.1))
+        # nothing is computed without its measurements
+        self.assertNotIn('true_ph', results)
+        self.assertNotIn('ccal_check', results)
+
+    def test_evaluate_checks(self):
+        """
+        Tests that checks compare the student's answers to the derived values.
+        """
+        results = registry.registry.evaluate(dict(self.measurements, calorimeter_constant=0.0))
+        self.assertFalse(results['ccal_check'])
+        results = registry.registry.evaluate(dict(self.measurements, calorimeter_constant=results['ccal_true'] + 1))
+        self.assertTrue(results['ccal_check'])
+
+    def test_evaluate_targets(self):
+        """
+        Tests that only the values needed for the targets are computed.
+        """
+        results = registry.registry.evaluate(self.measurements, targets=['ccal_true'])
+        self.assertIn('ccal_true', results)
+        self.assertIn('cctf', results)
+        self.assertNotIn('mgti', results)
+        self.assertNotIn('mgo_enthalpy', results)
+
+    def test_inputs(self):
+        """
+        Tests that the inputs are the values supplied by a student and never the values the equations derive.
+        """
+        inputs = registry.registry.inputs
+        self.assertTrue(set(self.measurements) <= inputs)
+        self.assertIn('calorimeter_constant', inputs)
+        self.assertNotIn('cctf', inputs)
+        self.assertNotIn('ccal_check', inputs)
+
+    def test_evaluate_batch(self):
+        """
+        Tests that a batch evaluation matches evaluating every row on its own.
+        """
+        random = np.random.RandomState(450)
+        columns = {name: value + random.uniform(-0.01, 0.01, 50) for name, value in self.measurements.items()}
+        results = registry.registry.evaluate(columns, batch=True)
+        for row in range(50):
+            expected = registry.registry.evaluate({name: column[row] for name, column in columns.items()})
+            for name in ('cctf', 'ccal_true', 'mgti', 'mg_enthalpy', 'mgo_enthalpy'):
+                self.assertEqual(results[name][row], expected[name])
+
+    def test_shared_values_computed_once(self):
+        """
+        Tests that a value shared by several equations is computed once per evaluation.
+        """
+        calls = []
+
+        def shared(a):
+            calls.append(a)
+            return a * 2
+
+        graph = registry.Registry()
+        graph.register('left', lambda value: value + 1, ('shared',))
+        graph.register('right', lambda value: value - 1, ('shared',))
+        graph.register('shared', shared, ('a',))
+        results = graph.evaluate({'a': 3})
+        self.assertEqual(calls, [3])
+        self.assertEqual((results['left'], results['right']), (7, 5))
+        self.assertEqual(graph.requirements('left'), {'a'})
+
+    def test_cycle(self):
+        """
+        Tests that equations depending on each other are rejected.
+        """
+        graph = registry.Registry()
+        graph.register('a', lambda b: b, ('b',))
+        graph.register('b', lambda a: a, ('a',))
+        with self.assertRaises(ValueError):
+            graph.evaluate({})
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from concurrent.futures import ProcessPoolExecutor
+import django
+
+from register.serializers import BulkUserSerializer, username_for
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hashes passwords in parallel across a pool of processes.
+
+    Each hash pays the full cost of the password hasher, so spreading them
+    over every CPU is what makes registering a whole class at once fast.
+
+    :param passwords: list - the raw passwords
+    :param workers: integer - the number of processes, defaults to PASSWORD_HASH_WORKERS
+    :return: list - the hashed passwords in the same order
+    """
+    workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+    if workers <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    # every process loads the settings so it hashes with the configured hashers
+    with ProcessPoolExecutor(max_workers=min(workers, len(passwords)), initializer=django.setup) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def register_users(rows, workers=None):
+    """
+    Creates a user for every row of a bulk registration.
+
+    Every row is validated before anything is written, and no user is
+    created unless all of them are valid. Whether the emails and usernames
+    are taken is checked with a single query, passwords are hashed in
+    parallel, and the users are created with a single insert.
+
+    :param rows: list - a dictionary with an email, password, first_name, and last_name for every user
+    :param workers: integer - the number of processes hashing passwords
+    :return: tuple - the created users and a list of row errors
+    """
+    # validate every row
+    errors = []
+    valid_rows = []
+    for row_num, row in enumerate(rows, 1):
+        serializer = BulkUserSerializer(data=row)
+        if serializer.is_valid():
+            valid_rows.append((row_num, serializer.validated_data))
+        else:
+            errors.append({'row': row_num, 'errors': serializer.errors})
+    # check every email and username at once
+    emails = {User.objects.normalize_email(data['email']) for row_num, data in valid_rows}
+    usernames = {username_for(email) for email in emails}
+    taken = set()
+    for email, username in User.objects.filter(Q(email__in=emails) | Q(username__in=usernames)) \
+            .values_list('email', 'username'):
+        taken.update((email, username))
+    users = []
+    for row_num, data in valid_rows:
+        email = User.objects.normalize_email(data['email'])
+        username = User.normalize_username(username_for(email))
+        if email in taken or username in taken:
+            errors.append({'row': row_num, 'errors': {'email': ['email is already in use']}})
+            continue
+        taken.update((email, username))
+        users.append(User(username=username,
+                          email=email,
+                          password=data['password'],
+                          first_name=data.get('first_name', ''),
+                          last_name=data.get('last_name', '')))
+    if errors:
+        return [], sorted(errors, key=lambda error: error['row'])
+    for user, password in zip(users, hash_passwords([user.password for user in users], workers)):
+        user.password = password
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+    return users, []
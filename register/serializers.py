@@ -4,6 +4,24 @@ from django.core.exceptions import ValidationError
 from rest_framework import serializers
 
 
+def username_for(email):
+    """
+    Returns the username of the user with an email address.
+    """
+    return email.split('@')[0]
+
+
+def password_errors(data):
+    """
+    Returns the reasons a password is too weak, keyed by 'password', or nothing if it is strong enough.
+    """
+    try:
+        validate_password(password=data.get('password'), user=User(**data))
+    except ValidationError as e:
+        return {'password': list(e.messages)}
+    return {}
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.ReadOnlyField()
     email = serializers.RegexField(r'^[^@]+@wallawalla\.edu$', allow_blank=False)
@@ -19,20 +37,28 @@ class UserSerializer(serializers.ModelSerializer):
         # extra_kwargs = {'password': {'write_only': True}}
 
     def validate(self, data):
-        user = User(**data)
         errors = {}
         # validate email
         if User.objects.filter(email=data.get('email')).exists():
             errors['email'] = 'email is already in use'
         # validate password
-        try:
-            validate_password(password=data.get('password'), user=user)
-        except ValidationError as e:
-            errors['password'] = list(e.messages)
+        errors.update(password_errors(data))
         if errors:
             raise serializers.ValidationError(errors)
         return super(UserSerializer, self).validate(data)
 
     def create(self, validated_data):
-        validated_data['username'] = validated_data['email'].split('@')[0]
+        validated_data['username'] = username_for(validated_data['email'])
         return User.objects.create_user(**validated_data)
+
+
+class BulkUserSerializer(UserSerializer):
+    """
+    The serializer for one user of a bulk registration, whose email is
+    checked against the database together with every other user's.
+    """
+    def validate(self, data):
+        errors = password_errors(data)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
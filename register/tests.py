@@ -1,10 +1,15 @@
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.reverse import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 import json
 
+from api.models import Instructor
+from register import bulk
+
 
 class RegisterTest(APITestCase):
     def setUp(self):
@@ -66,3 +71,78 @@ class RegisterTest(APITestCase):
         self.assertFalse(User.objects.filter(email=request_body['email'],
                                              first_name=request_body['first_name'],
                                              last_name=request_body['last_name']).exists())
+
+
+class RegisterBulkTest(APITestCase):
+    def setUp(self):
+        self.password = 'test'
+        self.instructor_user = User.objects.create_user(username='instructor', password=self.password)
+        Instructor(user=self.instructor_user, wwuid='1234567').save()
+        self.client.login(username=self.instructor_user.username, password=self.password)
+        self.users = [{
+            'password': 'SeCure-passw0rD58{}'.format(u),
+            'email': 'student.{}@wallawalla.edu'.format(u),
+            'first_name': 'Student',
+            'last_name': str(u),
+        } for u in range(0, 4)]
+        self.view_name = 'register:register-bulk'
+
+    def test_register_bulk(self):
+        # request, emails are checked with one query and users are created with one insert
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse(self.view_name), json.dumps({'users': self.users}),
+                                        content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([user['username'] for user in response_body['users']],
+                         ['student.{}'.format(u) for u in range(0, 4)])
+        self.assertTrue(all('password' not in user.keys() for user in response_body['users']))
+        # test database
+        for user in self.users:
+            self.assertTrue(self.client.login(username=user['email'].split('@')[0], password=user['password']))
+
+    def test_register_bulk_csv(self):
+        lines = ['email,password,first_name,last_name'] + \
+                ['{email},{password},{first_name},{last_name}'.format(**user) for user in self.users]
+        users_file = SimpleUploadedFile('users.csv', '\r\n'.join(lines).encode('utf-8'), content_type='text/csv')
+        # request
+        response = self.client.post(reverse(self.view_name), {'users': users_file})
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # test database
+        self.assertEqual(User.objects.filter(email__endswith='@wallawalla.edu').count(), 4)
+
+    def test_register_bulk_row_errors(self):
+        User.objects.create_user(username='student.0', email=self.users[0]['email'], password='password')
+        self.users[1]['email'] = 'bad.email@other.com'
+        self.users[2]['password'] = 'password'
+        self.users[3]['email'] = self.users[2]['email']
+        self.users.append(dict(self.users[3], email='new.student@wallawalla.edu'))
+        self.users.append(dict(self.users[4]))
+        # request
+        response = self.client.post(reverse(self.view_name), json.dumps(self.users), content_type='application/json')
+        response_body = json.loads(response.content.decode('utf-8'))
+        # test response
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response_body['errors']], [1, 2, 3, 6])
+        self.assertIn('email', response_body['errors'][1]['errors'])
+        self.assertIn('password', response_body['errors'][2]['errors'])
+        # test database
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_register_bulk_not_instructor(self):
+        self.client.logout()
+        # request
+        response = self.client.post(reverse(self.view_name), json.dumps(self.users), content_type='application/json')
+        # test response
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        # test database
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_hash_passwords_pool(self):
+        passwords = [user['password'] for user in self.users]
+        hashes = bulk.hash_passwords(passwords, workers=2)
+        self.assertEqual(len(hashes), len(passwords))
+        for password, hashed in zip(passwords, hashes):
+            self.assertTrue(check_password(password, hashed))
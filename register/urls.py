@@ -4,4 +4,5 @@ from register import views
 
 urlpatterns = [
     url(r'^register$', views.RegisterView.as_view(), name='register'),
+    url(r'^register/bulk$', views.RegisterBulkView.as_view(), name='register-bulk'),
 ]
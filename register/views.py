@@ -1,8 +1,16 @@
+from rest_framework import status
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from api.permissions import IsInstructor
+from register import bulk
 from register.serializers import UserSerializer
 
+import csv
+import io
+
 
 class RegisterView(CreateAPIView):
     authentication_classes = ()
@@ -11,3 +19,30 @@ class RegisterView(CreateAPIView):
 
     def get_serializer_class(self):
         return UserSerializer
+
+
+class RegisterBulkView(APIView):
+    """
+    The POST view for instructors registering many users at once.
+    """
+    permission_classes = (IsInstructor,)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Register the users uploaded as a CSV file or as a JSON list.
+        """
+        if 'users' in request.FILES:
+            try:
+                rows = list(csv.DictReader(io.TextIOWrapper(request.FILES['users'], encoding='utf-8-sig')))
+            except (UnicodeDecodeError, ValueError):
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            rows = request.data.get('users')
+        if not isinstance(rows, list):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        users, errors = bulk.register_users(rows)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'users': UserSerializer(users, many=True).data}, status=status.HTTP_201_CREATED)